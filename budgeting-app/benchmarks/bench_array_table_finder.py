@@ -0,0 +1,86 @@
+"""Table finding time of `IncrementalTableFinder` (pdfplumber's merging and intersecting of edges)
+and `ArrayTableFinder` (the same in NumPy) on a page ruled with many short segments, as statements
+drawn with dashed lines are.
+
+Usage:
+    python benchmarks/bench_array_table_finder.py [--columns 12] [--rows 60] [--segments 200] [--dash 0.8] [--repeat 3]
+
+With dashes shorter than the gaps between them (e.g. `--segments 60 --dash 0.4`) nothing is
+joined and the intersections of thousands of edges take most of the time.
+"""
+import argparse
+from pathlib import Path
+import time
+
+import pdfplumber
+
+from budgeting_app.pdf_table_reader.core.entities.array_table_finder import ArrayTableFinder
+from budgeting_app.pdf_table_reader.core.entities.table_finder import IncrementalTableFinder
+from budgeting_app.pdf_table_reader.core.usecases.table_detector_workspace import DEFAULT_TABLE_SETTINGS
+
+SAMPLE_PDF = Path(__file__).resolve().parent.parent / 'budgeting_app' / 'pdf_table_reader' / 'tests' / 'data' / 'single_page_sample.pdf'
+
+
+def dashed_ruling(bbox: tuple[float, float, float, float], columns: int, rows: int, segments: int, dash: float) -> dict:
+    """Explicit lines of a grid over the bbox, each line made of `segments` dashes (covering
+    `dash` of the line) slightly off the line (within the snapping tolerance) so that they have to
+    be snapped and joined.
+    """
+    x0, top, x1, bottom = bbox
+    col_width, row_height = (x1 - x0) / columns, (bottom - top) / rows
+    v_dash, h_dash = (bottom - top) / segments, (x1 - x0) / segments
+
+    vertical = [
+        {'x0': x, 'x1': x, 'top': top + i * v_dash, 'bottom': top + (i + dash) * v_dash, 'width': 0, 'height': dash * v_dash, 'object_type': 'line'}
+        for c in range(columns + 1)
+        for i in range(segments)
+        for x in [x0 + c * col_width + (i % 3) * 0.5]
+    ]
+    horizontal = [
+        {'x0': x0 + i * h_dash, 'x1': x0 + (i + dash) * h_dash, 'top': y, 'bottom': y, 'width': dash * h_dash, 'height': 0, 'object_type': 'line'}
+        for r in range(rows + 1)
+        for i in range(segments)
+        for y in [top + r * row_height - (i % 2) * 0.5]
+    ]
+    return {
+        **DEFAULT_TABLE_SETTINGS,
+        'vertical_strategy': 'explicit',
+        'horizontal_strategy': 'explicit',
+        'explicit_vertical_lines': vertical,
+        'explicit_horizontal_lines': horizontal
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--columns', type=int, default=12)
+    parser.add_argument('--rows', type=int, default=60)
+    parser.add_argument('--segments', type=int, default=200, help='dashes each line is made of')
+    parser.add_argument('--dash', type=float, default=0.8, help='fraction of each line the dashes cover')
+    parser.add_argument('--repeat', type=int, default=3, help='best of that many runs is reported')
+    args = parser.parse_args()
+
+    with pdfplumber.open(SAMPLE_PDF) as pdf:
+        _page = pdf.pages[0]
+        x0, top, x1, bottom = _page.bbox
+        settings = dashed_ruling((x0 + 20, top + 20, x1 - 20, bottom - 20), args.columns, args.rows, args.segments, args.dash)
+        segment_count = len(settings['explicit_vertical_lines']) + len(settings['explicit_horizontal_lines'])
+        print(f'{segment_count} segments, {args.columns} x {args.rows} cells')
+
+        baseline, cells = None, None
+        print(f'{"finder":<26}{"time [s]":>12}{"speedup":>10}')
+        for finder_class in [IncrementalTableFinder, ArrayTableFinder]:
+            seconds = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                finder = finder_class(_page, settings)
+                seconds.append(time.perf_counter() - start)
+            cells = cells or finder.cells
+            assert finder.cells == cells, f'{finder_class.__name__} found different cells'
+
+            baseline = baseline or min(seconds)
+            print(f'{finder_class.__name__:<26}{min(seconds):>12.3f}{baseline / min(seconds):>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
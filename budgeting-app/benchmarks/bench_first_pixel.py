@@ -0,0 +1,61 @@
+"""Time to first pixel of a long document - opening it and rendering the thumbnail of the current
+page - compared with rendering the current page in full, and the time of the whole thumbnail pass
+the navigator strip waits for.
+
+Usage:
+    python benchmarks/bench_first_pixel.py [--pages 100]
+"""
+import argparse
+from pathlib import Path
+import tempfile
+import time
+
+from bench_pdf_reader import make_synthetic_pdf
+
+from budgeting_app.pdf_table_reader.core.entities.models import RAW_IMAGE_FORMAT
+from budgeting_app.pdf_table_reader.core.usecases.pdf_reader import PDFReader
+from budgeting_app.pdf_table_reader.core.usecases.table_detector_workspace import TableDetectorWorkspace
+
+
+def open_workspace(path: Path) -> TableDetectorWorkspace:
+    # as `TableExtractor.set_table_detector_workspace` does
+    workspace = TableDetectorWorkspace(PDFReader.open(str(path)))
+    workspace.set_pdf_file_image(overlay=True, lazy=True, _format=RAW_IMAGE_FORMAT)
+    return workspace
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=100, help='pages of the synthetic document')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = make_synthetic_pdf(args.pages, Path(tmp) / 'synthetic.pdf')
+
+        start = time.perf_counter()
+        workspace = open_workspace(path)
+        opened = time.perf_counter()
+        workspace.get_page_thumbnail(0)
+        first_thumbnail = time.perf_counter()
+        for page_index in range(1, args.pages):
+            workspace.get_page_thumbnail(page_index)
+        all_thumbnails = time.perf_counter()
+        workspace.close()
+
+        start_full = time.perf_counter()
+        workspace = open_workspace(path)
+        workspace.get_page_image(0)
+        first_page = time.perf_counter()
+        workspace.close()
+
+    for label, seconds in (
+        ('open', opened - start),
+        ('first pixel (thumbnail)', first_thumbnail - start),
+        ('first pixel (full render)', first_page - start_full),
+        (f'all {args.pages} thumbnails', all_thumbnails - start)
+    ):
+        print(f'{label + ":":<28}{seconds:8.3f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Refresh latency of a page image - rendering it with the tables found after a settings change and
+turning it into a `QImage` for the `Canvas` - with the image handed over as PNG and as raw pixels.
+
+Usage:
+    python benchmarks/bench_image_transport.py [--repeat 5]
+"""
+import argparse
+import statistics
+import time
+
+from PyQt6 import QtGui
+
+from bench_pdf_reader import SAMPLE_PDF
+
+from budgeting_app.gui.services.table_extractor.image_viewer import to_qimage
+from budgeting_app.pdf_table_reader.core.entities.models import RAW_IMAGE_FORMAT
+from budgeting_app.pdf_table_reader.core.usecases.pdf_reader import PDFReader
+from budgeting_app.pdf_table_reader.core.usecases.render_cache import RenderCache
+from budgeting_app.pdf_table_reader.core.usecases.table_detector_workspace import TableDetectorWorkspace
+
+
+def refresh_times(_format: str, repeat: int) -> tuple[list[float], list[float]]:
+    """
+    Returns:
+        tuple[list[float], list[float]]: times [ms] of rendering and of the hand-off to `QImage`
+    """
+    # nothing cached, every refresh renders
+    workspace = TableDetectorWorkspace(PDFReader.open(str(SAMPLE_PDF)), render_cache=RenderCache(max_bytes=0))
+    workspace.set_pdf_file_image(lazy=True, _format=_format)
+
+    render_times, hand_off_times = [], []
+    for r in range(repeat):
+        for page_index in range(len(workspace.pdf_file.pages)):
+            workspace.set_table_settings_val(page_index, 'snap_tolerance', 3 + r % 2)
+
+            start = time.perf_counter()
+            image = workspace.get_page_image(page_index)
+            rendered = time.perf_counter()
+            qimage = to_qimage(image)
+            # scaled as the Canvas does, which touches every pixel
+            qimage.scaled(qimage.size() / 2)
+            done = time.perf_counter()
+
+            render_times.append(1000 * (rendered - start))
+            hand_off_times.append(1000 * (done - rendered))
+
+    workspace.close()
+    return render_times, hand_off_times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help='refreshes of each page')
+    args = parser.parse_args()
+
+    # QImage scaling needs the image plugins
+    app = QtGui.QGuiApplication([])
+
+    print(f'{"path":<8}{"render [ms]":>14}{"hand-off [ms]":>16}{"total [ms]":>13}')
+    for _format in ('PNG', RAW_IMAGE_FORMAT):
+        render_times, hand_off_times = refresh_times(_format, args.repeat)
+        render, hand_off = statistics.median(render_times), statistics.median(hand_off_times)
+        print(f'{_format:<8}{render:>14.1f}{hand_off:>16.1f}{render + hand_off:>13.1f}')
+
+    app.quit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""Table extraction time of `ParallelTableExtractor` for an increasing number of workers on a
+synthetic multi-page PDF.
+
+Usage:
+    python benchmarks/bench_parallel_table_extractor.py [--pages 48] [--workers 1 2 4 8]
+"""
+import argparse
+import os
+from pathlib import Path
+import tempfile
+import time
+
+from bench_pdf_reader import make_synthetic_pdf
+
+from budgeting_app.pdf_table_reader.core.usecases.parallel_table_extractor import ParallelTableExtractor
+from budgeting_app.pdf_table_reader.core.usecases.table_detector_workspace import DEFAULT_TABLE_SETTINGS
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=48, help='page count of the synthetic PDF')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filepath = str(make_synthetic_pdf(args.pages, Path(tmp) / f'synthetic_{args.pages}_pages.pdf'))
+
+        baseline = None
+        print(f'{"workers":<10}{"time [s]":>12}{"speedup":>10}')
+        for workers in sorted(set(args.workers)):
+            start = time.perf_counter()
+            ParallelTableExtractor(workers).extract_tables(filepath, [*range(args.pages)], DEFAULT_TABLE_SETTINGS)
+            seconds = time.perf_counter() - start
+            baseline = baseline or seconds
+            print(f'{workers:<10}{seconds:>12.3f}{baseline / seconds:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Open time and peak RSS of `PDFReader.open` compared with the previous behaviour, i.e. wrapping
+every page of `pdf.pages` and rasterising it to read `base_size`.
+
+Each measurement runs in a fresh process so that peak RSS of one does not leak into the other.
+
+Usage:
+    python benchmarks/bench_pdf_reader.py [--pages 120] [--repeat 3]
+"""
+import argparse
+import multiprocessing
+from pathlib import Path
+import resource
+import sys
+import tempfile
+import time
+
+from PyPDF2 import PdfReader, PdfWriter
+
+import pdfplumber
+
+from budgeting_app.pdf_table_reader.core.entities.models import BASE_IMAGE_RESOLUTION
+from budgeting_app.pdf_table_reader.core.usecases.pdf_reader import PDFReader
+
+
+DATA_PATH = Path(__file__).resolve().parent.parent / 'budgeting_app' / 'pdf_table_reader' / 'tests' / 'data'
+SAMPLE_PDF = DATA_PATH / 'multiple_pages_sample.pdf'
+
+
+def make_synthetic_pdf(page_count: int, target: Path) -> Path:
+    """Repeat pages of the bundled sample until the document has `page_count` pages."""
+    reader = PdfReader(SAMPLE_PDF)
+    writer = PdfWriter()
+    for i in range(page_count):
+        writer.add_page(reader.pages[i % len(reader.pages)])
+    with open(target, 'wb') as f:
+        writer.write(f)
+    return target
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+def _open_eager(filepath: str) -> int:
+    pdf = pdfplumber.open(filepath)
+    sizes = [p.to_image(BASE_IMAGE_RESOLUTION).original.size for p in pdf.pages]
+    return len(sizes)
+
+
+def _open_lazy(filepath: str) -> int:
+    return len(PDFReader.open(filepath).pages)
+
+
+def _measure(func_name: str, filepath: str, queue: multiprocessing.Queue) -> None:
+    func = globals()[func_name]
+    start = time.perf_counter()
+    func(filepath)
+    queue.put((time.perf_counter() - start, _peak_rss_mb()))
+
+
+def measure(func_name: str, filepath: str, repeat: int) -> tuple[float, float]:
+    """Best time (s) and peak RSS (MB) out of `repeat` runs, each in a new process."""
+    ctx = multiprocessing.get_context('spawn')
+    results = []
+    for _ in range(repeat):
+        queue = ctx.Queue()
+        process = ctx.Process(target=_measure, args=(func_name, filepath, queue))
+        process.start()
+        results.append(queue.get())
+        process.join()
+    return min(r[0] for r in results), min(r[1] for r in results)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=120, help='page count of the synthetic PDF')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = [
+            SAMPLE_PDF,
+            make_synthetic_pdf(args.pages, Path(tmp) / f'synthetic_{args.pages}_pages.pdf')
+        ]
+        print(f'{"file":<32}{"mode":<8}{"time [s]":>12}{"peak RSS [MB]":>16}')
+        for f in files:
+            for label, func_name in [('eager', '_open_eager'), ('lazy', '_open_lazy')]:
+                seconds, rss = measure(func_name, str(f), args.repeat)
+                print(f'{f.name:<32}{label:<8}{seconds:>12.4f}{rss:>16.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""Extract tables from PDF files without the GUI and write their rows to CSV, JSON Lines or Parquet.
+
+Usage:
+    python -m budgeting_app.extract statements/ 'archive/**/*.pdf' -o rows.csv [--workers 4]
+        [--settings '{"vertical_strategy": "text"}' | --template natwest | --template auto]
+        [--min-table-score [0.2]] [--layout-cache [DIR]] [--report report.json]
+
+Exit code is 0 when all files have been processed, 1 when some of them failed and 2 when none
+could be processed (or the arguments are wrong).
+"""
+import argparse
+import json
+import os
+from pathlib import Path
+import sys
+import time
+
+from budgeting_app.utils.logging import set_up_logging
+from budgeting_app.pdf_table_reader.core.usecases.table_detector_workspace import DEFAULT_TABLE_SETTINGS
+from budgeting_app.pdf_table_reader.core.usecases.table_prescan import DEFAULT_TABLE_SCORE_THRESHOLD
+from budgeting_app.pdf_table_reader.core.usecases.page_layout_cache import DEFAULT_LAYOUT_CACHE_DIR
+from budgeting_app.pdf_table_reader.core.usecases.extraction_template import (
+    ExtractionTemplate,
+    TemplateLibrary,
+    DEFAULT_TEMPLATE_DIR
+)
+from budgeting_app.extract.batch import BatchExtractor, ROW_WRITERS, FORMAT_SUFFIXES, expand_inputs
+
+
+EXIT_OK = 0
+EXIT_SOME_FAILED = 1
+EXIT_FAILED = 2
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m budgeting_app.extract',
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('inputs', nargs='+', help='PDF files, globs or directories (searched recursively)')
+    parser.add_argument('-o', '--output', required=True, help='file to write the rows to')
+    parser.add_argument('-f', '--format', choices=sorted(ROW_WRITERS), help='format of the output; guessed from its suffix if not given')
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1, help='number of processes')
+    parser.add_argument('-s', '--settings', help='table settings as JSON or a path to a JSON file; merged into the defaults')
+    parser.add_argument('-t', '--template', help="name of a template in --template-dir, path to a template file or 'auto' to pick the matching one for each file")
+    parser.add_argument('--template-dir', default=str(DEFAULT_TEMPLATE_DIR), help='where the templates are kept')
+    parser.add_argument('--password', help='password to the files')
+    parser.add_argument('--table-finder', choices=['python', 'numpy'], default='python', help="'numpy' is faster on pages ruled with many short lines; requires NumPy")
+    parser.add_argument(
+        '--min-table-score', type=float, nargs='?', const=DEFAULT_TABLE_SCORE_THRESHOLD,
+        help=f'skip pages unlikely to contain a table (scoring below, {DEFAULT_TABLE_SCORE_THRESHOLD} if no value is given); all pages are extracted by default'
+    )
+    parser.add_argument(
+        '--layout-cache', nargs='?', const=str(DEFAULT_LAYOUT_CACHE_DIR), metavar='DIR',
+        help=f'keep parsed page layouts in DIR ({DEFAULT_LAYOUT_CACHE_DIR} if not given), so that files extracted again are not parsed from scratch'
+    )
+    parser.add_argument('--report', help='file to write the per-file report to (JSON)')
+    parser.add_argument('--log-level', default='WARNING', help='DEBUG, INFO, WARNING...')
+    return parser.parse_args(argv)
+
+
+def load_json_arg(value: str) -> dict:
+    return json.loads(Path(value).read_text() if os.path.isfile(value) else value)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    set_up_logging(global_level=args.log_level)
+
+    _format = args.format or FORMAT_SUFFIXES.get(Path(args.output).suffix.lower())
+    if _format is None:
+        print(f'Unknown output format of {args.output}, use --format.', file=sys.stderr)
+        return EXIT_FAILED
+
+    try:
+        table_settings = {**DEFAULT_TABLE_SETTINGS, **load_json_arg(args.settings)} if args.settings else None
+
+        template, template_dir, column_schema = None, None, None
+        if args.template == 'auto':
+            template_dir = args.template_dir
+        elif args.template is not None and os.path.isfile(args.template):
+            template = ExtractionTemplate.from_dict(load_json_arg(args.template))
+        elif args.template is not None:
+            template = TemplateLibrary(args.template_dir).load(args.template)
+        if template is not None:
+            column_schema = template.column_schema
+
+        writer = ROW_WRITERS[_format](args.output, column_schema)
+    except ImportError as e:
+        print(f'{_format} output is not available ({e}).', file=sys.stderr)
+        return EXIT_FAILED
+    except (OSError, ValueError, KeyError) as e:
+        print(f'{type(e).__name__}: {e}', file=sys.stderr)
+        return EXIT_FAILED
+
+    filepaths = expand_inputs(args.inputs)
+    if not filepaths:
+        writer.close()
+        print('No files to extract tables from.', file=sys.stderr)
+        return EXIT_FAILED
+
+    start = time.perf_counter()
+    extractor = BatchExtractor(
+        args.workers,
+        table_settings=table_settings,
+        template=template,
+        template_dir=template_dir,
+        password=args.password,
+        table_finder_backend=args.table_finder,
+        table_score_threshold=args.min_table_score,
+        layout_cache_dir=args.layout_cache
+    )
+    try:
+        reports = extractor.run(filepaths, writer)
+    finally:
+        writer.close()
+    seconds = time.perf_counter() - start
+
+    for r in reports:
+        if r.failed:
+            print(f'FAILED {r.filepath}: {"; ".join(r.errors)}', file=sys.stderr)
+        else:
+            skipped = f' ({len(r.skipped_pages)} skipped)' if r.skipped_pages else ''
+            print(f'{r.filepath}: {r.page_count} pages{skipped}, {r.row_count} rows in {r.seconds:.2f}s', file=sys.stderr)
+    failed = [r for r in reports if r.failed]
+    print(f'{len(reports) - len(failed)} of {len(reports)} files extracted in {seconds:.2f}s.', file=sys.stderr)
+
+    if args.report is not None:
+        with open(args.report, 'w') as f:
+            json.dump({
+                'seconds': seconds,
+                'files': [{**vars(r), 'failed': r.failed} for r in reports]
+            }, f, indent=2)
+
+    if not failed:
+        return EXIT_OK
+    return EXIT_SOME_FAILED if len(failed) < len(reports) else EXIT_FAILED
+
+
+if __name__ == '__main__':
+    sys.exit(main())
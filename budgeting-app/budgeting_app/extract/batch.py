@@ -0,0 +1,388 @@
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import csv
+from dataclasses import dataclass, field
+import glob
+import json
+import logging
+import os
+import time
+import traceback
+from typing import Any, Iterable, Literal, TextIO
+
+from budgeting_app.utils.logging import CustomLoggerAdapter
+from budgeting_app.pdf_table_reader.core.entities.models import T_table_finder_backend
+from budgeting_app.pdf_table_reader.core.usecases.pdf_reader import PDFReader
+from budgeting_app.pdf_table_reader.core.usecases.page_layout_cache import PageLayoutCache
+from budgeting_app.pdf_table_reader.core.usecases.table_detector_workspace import TableDetectorWorkspace, DEFAULT_TABLE_SETTINGS
+from budgeting_app.pdf_table_reader.core.usecases.extraction_template import ExtractionTemplate, TemplateLibrary
+
+
+# pages of a file are split into tasks of at most that many pages, so that rows of large files
+# come out as their pages finish and the files are spread over the workers
+PAGES_PER_TASK = 8
+
+# page index, table index (within the page), row index and cells of the row
+T_row = tuple[int, int, int, list[str | None]]
+
+T_format = Literal['csv', 'jsonl', 'parquet']
+FORMAT_SUFFIXES: dict[str, T_format] = {'.csv': 'csv', '.jsonl': 'jsonl', '.json': 'jsonl', '.parquet': 'parquet'}
+
+
+def expand_inputs(inputs: Iterable[str]) -> list[str]:
+    """Paths of the PDF files given as paths, globs or directories (searched recursively), in the
+    order given and without duplicates.
+    """
+    paths = []
+    for i in inputs:
+        if os.path.isdir(i):
+            matches = sorted(glob.glob(os.path.join(i, '**', '*.pdf'), recursive=True))
+        elif glob.has_magic(i):
+            matches = sorted(glob.glob(i, recursive=True))
+        else:
+            matches = [i]
+        paths += [m for m in matches if m not in paths]
+    return paths
+
+
+####################################
+#           WORKER PROCESS         #
+####################################
+
+@dataclass
+class ChunkResult:
+    """
+        - filepath: `str` - the file the pages come from
+        - rows: `list[T_row]` - rows of the tables found on the pages
+        - page_count: `int` - number of pages processed
+        - seconds: `float` - time spent on the pages
+        - template: `str | None` - name of the template applied
+        - column_schema: `list[str] | None` - column schema of the template applied
+        - skipped_pages: `list[int]` - pages scoring below the table score threshold
+        - error: `str | None` - why the pages could not be processed
+    """
+    filepath: str
+    rows: list[T_row] = field(default_factory=list)
+    page_count: int = 0
+    seconds: float = 0.0
+    template: str | None = None
+    column_schema: list[str] | None = None
+    skipped_pages: list[int] = field(default_factory=list)
+    error: str | None = None
+
+
+def extract_chunk(
+    filepath: str,
+    page_indices: list[int],
+    table_settings: dict[str, Any] | None,
+    template: ExtractionTemplate | None,
+    password: str | None,
+    table_finder_backend: T_table_finder_backend = 'python',
+    table_score_threshold: float | None = None,
+    layout_cache_dir: str | None = None
+) -> ChunkResult:
+    """Runs in a worker process. Extract rows of tables on the given pages of the file - with the
+    template if given (only pages matching it; none is fine) or the table settings otherwise.
+    Pages scoring below `table_score_threshold` are skipped (see `table_prescan.prescan_page`).
+    Layouts of the pages are kept in the `PageLayoutCache` in `layout_cache_dir` if given - the
+    cache is opened in each worker, it can't be passed between processes. Nothing is rendered.
+    """
+    start = time.perf_counter()
+    result = ChunkResult(filepath)
+    try:
+        layout_cache = None if layout_cache_dir is None else PageLayoutCache(layout_cache_dir)
+        pdf_file = PDFReader.open(filepath, password, pages=page_indices, layout_cache=layout_cache)
+        if pdf_file is None:
+            raise ValueError('not a valid path to a PDF file')
+
+        workspace = TableDetectorWorkspace(
+            pdf_file,
+            table_settings if table_settings is not None else DEFAULT_TABLE_SETTINGS,
+            table_score_threshold=table_score_threshold,
+            table_finder_backend=table_finder_backend
+        )
+        try:
+            if template is None:
+                workspace_page_indices = [*range(len(pdf_file.pages))]
+            else:
+                workspace_page_indices = template.apply(workspace)
+                result.template, result.column_schema = template.name, template.column_schema
+
+            for i in workspace_page_indices:
+                page_number = pdf_file.pages[i].page_number
+                if not workspace.is_table_page(i):
+                    result.skipped_pages.append(page_number)
+                    continue
+                for table_index, _table in enumerate(workspace.get_tables_text([i])):
+                    result.rows += [(page_number, table_index, row_index, row) for row_index, row in enumerate(_table)]
+            result.page_count = len(pdf_file.pages)
+        finally:
+            workspace.close()
+    except Exception as e:
+        result.error = f'{type(e).__name__}: {e}'
+        CustomLoggerAdapter.getLogger('app', className='extract').debug(traceback.format_exc())
+
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+####################################
+#              WRITERS             #
+####################################
+
+class RowWriter(ABC):
+    """Writes rows as they come. Each row is the file, page index, table index (within the page),
+    row index and the cells of the row. Column schema given to `write` (of the template applied to
+    the file) takes precedence over the one given to the writer.
+    """
+    column_schema: list[str] | None
+
+    def __init__(self, path: str, column_schema: list[str] | None = None) -> None:
+        self.path = path
+        self.column_schema = column_schema
+
+    @abstractmethod
+    def write(self, filepath: str, rows: list[T_row], column_schema: list[str] | None = None) -> None:
+        ...
+
+    @abstractmethod
+    def close(self) -> None:
+        ...
+
+
+class CSVRowWriter(RowWriter):
+    """Header is `file,page,table,row` followed by the column schema - the writer's or, if it
+    has none, the one given with the first rows (e.g. of the template matched to the first file);
+    cells follow the first four values however many there are.
+    """
+    _file: TextIO
+    _header_written: bool
+
+    def __init__(self, path: str, column_schema: list[str] | None = None) -> None:
+        super().__init__(path, column_schema)
+        self._file = open(path, 'w', newline='')
+        self._writer = csv.writer(self._file)
+        self._header_written = False
+
+    def _write_header(self, column_schema: list[str] | None) -> None:
+        if not self._header_written:
+            self._writer.writerow(['file', 'page', 'table', 'row', *(self.column_schema or column_schema or [])])
+            self._header_written = True
+
+    def write(self, filepath: str, rows: list[T_row], column_schema: list[str] | None = None) -> None:
+        self._write_header(column_schema)
+        self._writer.writerows([filepath, *row[:3], *('' if c is None else c for c in row[3])] for row in rows)
+        self._file.flush()
+
+    def close(self) -> None:
+        self._write_header(None)
+        self._file.close()
+
+
+class JSONLinesRowWriter(RowWriter):
+    """One JSON object per row; when the row has as many cells as the column schema, the cells are
+    also given by the schema's names under `record`.
+    """
+    _file: TextIO
+
+    def __init__(self, path: str, column_schema: list[str] | None = None) -> None:
+        super().__init__(path, column_schema)
+        self._file = open(path, 'w')
+
+    def write(self, filepath: str, rows: list[T_row], column_schema: list[str] | None = None) -> None:
+        schema = column_schema or self.column_schema
+        for page, _table, row, cells in rows:
+            obj = {'file': filepath, 'page': page, 'table': _table, 'row': row, 'cells': cells}
+            if schema is not None and len(schema) == len(cells):
+                obj['record'] = dict(zip(schema, cells))
+            self._file.write(json.dumps(obj) + '\n')
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ParquetRowWriter(RowWriter):
+    """Rows of each batch go into a row group as they come. Requires pyarrow."""
+
+    def __init__(self, path: str, column_schema: list[str] | None = None) -> None:
+        super().__init__(path, column_schema)
+        import pyarrow
+        import pyarrow.parquet
+
+        self._pa = pyarrow
+        self._schema = pyarrow.schema([
+            ('file', pyarrow.string()),
+            ('page', pyarrow.int32()),
+            ('table', pyarrow.int32()),
+            ('row', pyarrow.int32()),
+            ('cells', pyarrow.list_(pyarrow.string()))
+        ])
+        self._writer = pyarrow.parquet.ParquetWriter(path, self._schema)
+
+    def write(self, filepath: str, rows: list[T_row], column_schema: list[str] | None = None) -> None:
+        if not rows:
+            return
+        self._writer.write_table(self._pa.table({
+            'file': [filepath] * len(rows),
+            'page': [r[0] for r in rows],
+            'table': [r[1] for r in rows],
+            'row': [r[2] for r in rows],
+            'cells': [r[3] for r in rows]
+        }, schema=self._schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+ROW_WRITERS: dict[str, type[RowWriter]] = {
+    'csv': CSVRowWriter,
+    'jsonl': JSONLinesRowWriter,
+    'parquet': ParquetRowWriter
+}
+
+
+####################################
+#               BATCH              #
+####################################
+
+@dataclass
+class FileReport:
+    """
+        - filepath: `str` - path of the file
+        - page_count: `int` - number of pages processed
+        - row_count: `int` - number of rows written
+        - seconds: `float` - time spent on the file's pages (summed over workers)
+        - templates: `list[str]` - names of the templates applied
+        - skipped_pages: `list[int]` - pages scoring below the table score threshold
+        - errors: `list[str]` - why (some of) the pages could not be processed
+    """
+    filepath: str
+    page_count: int = 0
+    row_count: int = 0
+    seconds: float = 0.0
+    templates: list[str] = field(default_factory=list)
+    skipped_pages: list[int] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def failed(self) -> bool:
+        return bool(self.errors)
+
+
+class BatchExtractor:
+    """Extract tables from many PDF files without the GUI. Pages of the files are split into tasks
+    of `PAGES_PER_TASK` pages handed over to a pool of processes; rows are written as the tasks
+    finish, so the output grows while the batch runs. A file that fails does not stop the others.
+
+    Example:
+        ```
+        writer = CSVRowWriter('out.csv')
+        reports = BatchExtractor(workers=4).run(expand_inputs(['statements/']), writer)
+        writer.close()
+        ```
+    """
+    workers: int
+    table_settings: dict[str, Any] | None
+    template: ExtractionTemplate | None
+    template_dir: str | None
+    password: str | None
+    table_finder_backend: T_table_finder_backend
+    # pages scoring below are skipped, None to extract tables from all pages
+    table_score_threshold: float | None
+    # directory of the `PageLayoutCache` shared by the workers, None to parse all pages from scratch
+    layout_cache_dir: str | None
+    logger: logging.LoggerAdapter
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        *,
+        table_settings: dict[str, Any] | None = None,
+        template: ExtractionTemplate | None = None,
+        template_dir: str | None = None,
+        password: str | None = None,
+        table_finder_backend: T_table_finder_backend = 'python',
+        table_score_threshold: float | None = None,
+        layout_cache_dir: str | None = None
+    ) -> None:
+        self.logger = CustomLoggerAdapter.getLogger('app', className='BatchExtractor')
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.table_settings = table_settings
+        self.template = template
+        self.template_dir = template_dir
+        self.password = password
+        self.table_finder_backend = table_finder_backend
+        self.table_score_threshold = table_score_threshold
+        self.layout_cache_dir = layout_cache_dir
+
+    def _tasks(self, filepath: str, report: FileReport) -> list[tuple]:
+        """Arguments of `extract_chunk` for page ranges of the file; none if it can't be opened or
+        no template in `template_dir` matches it. The template is picked once, from all pages of
+        the file, so that all of its chunks are extracted with the same one.
+        """
+        template = self.template
+        try:
+            pdf_file = PDFReader.open(filepath, self.password)
+            if pdf_file is None:
+                raise ValueError('not a valid path to a PDF file')
+            try:
+                page_count = len(pdf_file.pages)
+                if template is None and self.template_dir is not None:
+                    template = TemplateLibrary(self.template_dir).find(pdf_file)
+                    if template is None:
+                        raise ValueError(f'no template in {self.template_dir} matches the file')
+            finally:
+                pdf_file.close()
+        except Exception as e:
+            report.errors.append(f'{type(e).__name__}: {e}')
+            return []
+
+        return [
+            (filepath, [*range(i, min(i + PAGES_PER_TASK, page_count))], self.table_settings, template, self.password, self.table_finder_backend, self.table_score_threshold, self.layout_cache_dir)
+            for i in range(0, page_count, PAGES_PER_TASK)
+        ]
+
+    def _collect(self, result: ChunkResult, report: FileReport, writer: RowWriter) -> None:
+        report.seconds += result.seconds
+        if result.error is not None:
+            report.errors.append(result.error)
+            return
+
+        writer.write(result.filepath, result.rows, result.column_schema)
+        report.page_count += result.page_count
+        report.row_count += len(result.rows)
+        report.skipped_pages = sorted(report.skipped_pages + result.skipped_pages)
+        if result.template is not None and result.template not in report.templates:
+            report.templates.append(result.template)
+
+    def run(self, filepaths: list[str], writer: RowWriter) -> list[FileReport]:
+        """Extract rows of tables from the files and pass them to the writer.
+
+        Returns:
+            list[FileReport]: one report for each of the files, in the same order
+        """
+        reports = {filepath: FileReport(filepath) for filepath in filepaths}
+        tasks = [task for filepath in filepaths for task in self._tasks(filepath, reports[filepath])]
+        self.logger.info(f'Extracting tables from {len(filepaths)} files ({len(tasks)} tasks) with {self.workers} workers.')
+
+        if self.workers <= 1 or len(tasks) <= 1:
+            for task in tasks:
+                result = extract_chunk(*task)
+                self._collect(result, reports[result.filepath], writer)
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(tasks))) as executor:
+                # future -> file of its task
+                futures: dict[Future, str] = {executor.submit(extract_chunk, *task): task[0] for task in tasks}
+                for future in as_completed(futures):
+                    try:
+                        result = future.result()
+                    except BrokenProcessPool as e:
+                        # a worker died (e.g. killed for memory) - tasks not finished by then fail
+                        self.logger.error(f'Extracting tables from {futures[future]} failed: {type(e).__name__}: {e}')
+                        reports[futures[future]].errors.append(f'{type(e).__name__}: {e}')
+                        continue
+                    self._collect(result, reports[result.filepath], writer)
+
+        return [reports[filepath] for filepath in filepaths]
@@ -0,0 +1,159 @@
+from contextlib import redirect_stderr
+import csv
+import importlib.util
+import io
+import json
+import os
+from pathlib import Path
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from budgeting_app.pdf_table_reader.core.usecases.pdf_reader import PDFReader
+from budgeting_app.pdf_table_reader.core.usecases.table_detector_workspace import TableDetectorWorkspace
+from budgeting_app.pdf_table_reader.core.usecases.extraction_template import ExtractionTemplate, TemplateLibrary
+from budgeting_app.extract.__main__ import main, EXIT_OK, EXIT_SOME_FAILED, EXIT_FAILED
+
+
+def crash(*args) -> None:
+    os._exit(1)
+
+
+class TestExtract(unittest.TestCase):
+    def setUp(self) -> None:
+        test_data_path = Path(__file__).resolve().parent.parent.parent / 'pdf_table_reader' / 'tests' / 'data'
+        self.multiple_pages_sample_pdf_filepath = str(test_data_path / 'multiple_pages_sample.pdf')
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self.tmp.name)
+        self.inputs_path = self.tmp_path / 'statements'
+        self.inputs_path.mkdir()
+        for name in ['1_table_1_page.pdf', '2_tables_1_page.pdf', '3_tables_2_pages.pdf']:
+            shutil.copy(test_data_path / name, self.inputs_path / name)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def run_main(self, *args: str) -> int:
+        with redirect_stderr(io.StringIO()):
+            return main([*args, '--log-level', 'CRITICAL'])
+
+    def test_csv(self) -> None:
+        output = self.tmp_path / 'rows.csv'
+        exit_code = self.run_main(str(self.inputs_path), '-o', str(output), '--workers', '2')
+
+        self.assertEqual(EXIT_OK, exit_code)
+        lines = output.read_text().splitlines()
+        self.assertEqual('file,page,table,row', lines[0])
+        self.assertEqual(1 + 3 + 6 + 9, len(lines))
+        self.assertIn(f'{self.inputs_path / "3_tables_2_pages.pdf"},1,1,2,X7,X8,X9', lines)
+
+    def test_min_table_score(self) -> None:
+        output, report = self.tmp_path / 'rows.csv', self.tmp_path / 'report.json'
+        # the last page scores 0.88
+        exit_code = self.run_main(self.multiple_pages_sample_pdf_filepath, '-o', str(output), '--workers', '1', '--min-table-score', '0.9', '--report', str(report))
+
+        self.assertEqual(EXIT_OK, exit_code)
+        [file_report] = json.loads(report.read_text())['files']
+        self.assertEqual([3], file_report['skipped_pages'])
+        self.assertEqual(4, file_report['page_count'])
+        self.assertNotIn(3, {int(row['page']) for row in csv.DictReader(output.open())})
+
+        # off by default
+        exit_code = self.run_main(self.multiple_pages_sample_pdf_filepath, '-o', str(output), '--workers', '1', '--report', str(report))
+        self.assertEqual([], json.loads(report.read_text())['files'][0]['skipped_pages'])
+        self.assertIn(3, {int(row['page']) for row in csv.DictReader(output.open())})
+
+    def test_layout_cache(self) -> None:
+        output, layout_cache_path = self.tmp_path / 'rows.csv', self.tmp_path / 'layouts'
+
+        exit_code = self.run_main(str(self.inputs_path), '-o', str(output), '--workers', '2', '--layout-cache', str(layout_cache_path))
+        self.assertEqual(EXIT_OK, exit_code)
+        # one entry for each of the 4 pages
+        self.assertEqual(4, len(list(layout_cache_path.glob('*.layout'))))
+        rows = output.read_text()
+
+        with mock.patch('budgeting_app.pdf_table_reader.core.usecases.page_layout_cache.PageLayoutCache.store') as store:
+            exit_code = self.run_main(str(self.inputs_path), '-o', str(output), '--workers', '1', '--layout-cache', str(layout_cache_path))
+        self.assertEqual(EXIT_OK, exit_code)
+        store.assert_not_called()
+        self.assertEqual(rows, output.read_text())
+
+    def test_failure_report(self) -> None:
+        (self.inputs_path / 'broken.pdf').write_text('not a pdf')
+        output, report = self.tmp_path / 'rows.jsonl', self.tmp_path / 'report.json'
+
+        exit_code = self.run_main(str(self.inputs_path / '*.pdf'), '-o', str(output), '--workers', '1', '--report', str(report))
+
+        self.assertEqual(EXIT_SOME_FAILED, exit_code)
+        files = {Path(f['filepath']).name: f for f in json.loads(report.read_text())['files']}
+        self.assertTrue(files['broken.pdf']['failed'])
+        self.assertEqual(2, files['3_tables_2_pages.pdf']['page_count'])
+        self.assertEqual(18, len(output.read_text().splitlines()))
+
+        self.assertEqual(EXIT_FAILED, self.run_main(str(self.inputs_path / 'broken.pdf'), '-o', str(output)))
+        self.assertEqual(EXIT_FAILED, self.run_main(str(self.inputs_path / 'missing*.pdf'), '-o', str(output)))
+
+    def test_auto_template(self) -> None:
+        library = TemplateLibrary(self.tmp_path / 'templates')
+        workspace = TableDetectorWorkspace(PDFReader.open(str(self.inputs_path / '2_tables_1_page.pdf')))
+        workspace.set_pdf_file_image(lazy=True)
+        workspace.add_table((318, 435), (530, 605), [394.15, 457.9], [490.03, 547.03], 0)
+        library.save(ExtractionTemplate.from_workspace(workspace, 'drawn table', ['a', 'b', 'c']))
+        workspace.close()
+
+        output = self.tmp_path / 'rows.jsonl'
+        exit_code = self.run_main(
+            str(self.inputs_path / '2_tables_1_page.pdf'),
+            '-o', str(output),
+            '--template', 'auto',
+            '--template-dir', str(library.directory)
+        )
+
+        self.assertEqual(EXIT_OK, exit_code)
+        rows = [json.loads(line) for line in output.read_text().splitlines()]
+        self.assertEqual([{'a': '1', 'b': '2', 'c': '3'}, {'a': '4', 'b': '5', 'c': '6'}, {'a': '7', 'b': '8', 'c': '9'}], [r['record'] for r in rows])
+
+    def test_auto_template_picked_once_per_file(self) -> None:
+        library = TemplateLibrary(self.tmp_path / 'templates')
+        workspace = TableDetectorWorkspace(PDFReader.open(self.multiple_pages_sample_pdf_filepath))
+        workspace.set_table_settings_val(1, 'vertical_strategy', 'text')
+        library.save(ExtractionTemplate.from_workspace(workspace, 'statement', ['date', 'description'], [1]))
+        workspace.close()
+
+        # the first page (summary) does not match the template - its chunk has no rows
+        output = self.tmp_path / 'rows.csv'
+        with mock.patch('budgeting_app.extract.batch.PAGES_PER_TASK', 1), \
+                mock.patch.object(TemplateLibrary, 'find', autospec=True, side_effect=TemplateLibrary.find) as find:
+            exit_code = self.run_main(
+                self.multiple_pages_sample_pdf_filepath,
+                '-o', str(output),
+                '--workers', '1',
+                '--template', 'auto',
+                '--template-dir', str(library.directory)
+            )
+
+        self.assertEqual(EXIT_OK, exit_code)
+        self.assertEqual(1, find.call_count)
+        header, *rows = list(csv.reader(output.open()))
+        self.assertEqual(['file', 'page', 'table', 'row', 'date', 'description'], header)
+        self.assertTrue(rows)
+        self.assertNotIn('0', {r[1] for r in rows})
+
+    def test_worker_crash(self) -> None:
+        output, report = self.tmp_path / 'rows.csv', self.tmp_path / 'report.json'
+        with mock.patch('budgeting_app.extract.batch.extract_chunk', crash):
+            exit_code = self.run_main(str(self.inputs_path), '-o', str(output), '--workers', '2', '--report', str(report))
+
+        self.assertEqual(EXIT_FAILED, exit_code)
+        files = json.loads(report.read_text())['files']
+        self.assertTrue(all(f['failed'] and 'BrokenProcessPool' in f['errors'][0] for f in files))
+
+    @unittest.skipIf(importlib.util.find_spec('pyarrow') is not None, 'pyarrow is installed')
+    def test_parquet_not_available(self) -> None:
+        self.assertEqual(EXIT_FAILED, self.run_main(str(self.inputs_path), '-o', str(self.tmp_path / 'rows.parquet')))
+
+
+if __name__ == "__main__":
+    unittest.main()
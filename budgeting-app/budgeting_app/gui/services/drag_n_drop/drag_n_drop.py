@@ -1,4 +1,7 @@
+from collections import deque
+import os
 import sys
+import threading
 from typing import Any
 import logging
 
@@ -16,10 +19,12 @@ from PyQt6.QtGui import (
     QDragEnterEvent,
     QDropEvent
 )
-from PyQt6.QtCore import Qt, QPoint
+from PyQt6.QtCore import Qt, QPoint, QThread, pyqtSignal
 
 from budgeting_app.gui.services.base import MainWindow, ServiceManager
+from budgeting_app.pdf_table_reader.core.entities.models import PDFFileWrapper
 from budgeting_app.pdf_table_reader.core.usecases.pdf_reader import PDFReader
+from budgeting_app.pdf_table_reader.core.usecases.page_layout_cache import PageLayoutCache
 from budgeting_app.utils.logging import CustomLoggerAdapter
 
 
@@ -34,6 +39,21 @@ DEFAULT_FONT_FAMILY = 'Arial'
 RECOGNISED_FILETYPES = ('.pdf', '.csv', '.json')
 
 
+def dropped_pdf_files(paths: list[str]) -> list[str]:
+    """PDF files among the dropped paths, directories searched recursively. Extensions are
+    matched regardless of case.
+    """
+    pdf_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs.sort()
+                pdf_files += [os.path.join(root, n) for n in sorted(names) if n.lower().endswith('.pdf')]
+        elif path.lower().endswith('.pdf'):
+            pdf_files.append(path)
+    return pdf_files
+
+
 class DragNDropLabel(QWidget):
     border_pen: QPen | None
     border_radius: int | None
@@ -105,16 +125,64 @@ class DragNDropLabel(QWidget):
         painter.drawRoundedRect(border, self.border_radius, self.border_radius)
 
 
+class PDFIngestWorker(QThread):
+    """Opens dropped PDF files in the background (see `PDFReader.open_many`) and hands them over
+    to the GUI thread one at a time. The next file is taken from `open_many` only once the previous
+    one has been taken by the table extractor (see `request_next`), so that pages parsed ahead stay
+    within its `max_inflight_pages`. Layouts of the pages are kept in `layout_cache`, so that files
+    dropped again are not parsed from scratch.
+    """
+    fileOpened = pyqtSignal(object)
+    
+    filepaths: list[str]
+    layout_cache: PageLayoutCache
+    logger: logging.LoggerAdapter
+    
+    def __init__(self, filepaths: list[str], parent: Any | None = None):
+        super().__init__(parent)
+        self.logger = CustomLoggerAdapter.getLogger('gui', className='PDFIngestWorker')
+        self.filepaths = filepaths
+        self.layout_cache = PageLayoutCache()
+        self._next_requested = threading.Semaphore(0)
+        
+    def request_next(self) -> None:
+        """Let the worker hand over the next file."""
+        self._next_requested.release()
+        
+    def run(self) -> None:
+        pdf_files = PDFReader.open_many(self.filepaths, layout_cache=self.layout_cache)
+        try:
+            for pdf_file_wrapper in pdf_files:
+                if self.isInterruptionRequested():
+                    break
+                self.fileOpened.emit(pdf_file_wrapper)
+                
+                while not self._next_requested.acquire(timeout=0.1):
+                    if self.isInterruptionRequested():
+                        return
+        finally:
+            # stops parsing the files not handed over
+            pdf_files.close()
+            self.logger.debug(f'Done with {len(self.filepaths)} files.')
+
+
 class AddDataFromFile(MainWindow):
     logger: logging.LoggerAdapter
     main_widget: QWidget
     main_layout: QVBoxLayout
     drag_n_drop_label: DragNDropLabel
     
+    # opened PDF files waiting for the table extractor, along with the worker that opened them
+    pdf_file_queue: deque[tuple[PDFFileWrapper, PDFIngestWorker]]
+    pdf_ingest_workers: list[PDFIngestWorker]
+    
     def __init__(self, parent: Any | None = None):
         super().__init__(parent)
         self.logger = CustomLoggerAdapter.getLogger('gui', className='AddDataFromFile')
         
+        self.pdf_file_queue = deque()
+        self.pdf_ingest_workers = []
+        
         self.setWindowTitle("Budgeting App - Add Data From File")
         
         self.window_width, self.window_height = 500, 400
@@ -142,7 +210,10 @@ class AddDataFromFile(MainWindow):
         self.logger.debug(f'Got event.mimeData.urls={event.mimeData().urls()}')
         
         if event.mimeData().hasUrls():
-            if [qurl.toLocalFile() for qurl in event.mimeData().urls()][0].endswith(RECOGNISED_FILETYPES):
+            if any(
+                qurl.toLocalFile().lower().endswith(RECOGNISED_FILETYPES) or os.path.isdir(qurl.toLocalFile())
+                for qurl in event.mimeData().urls()
+            ):
                 
                 event.accept()
                 self.logger.debug('QDragEnterEvent accepted.')
@@ -157,33 +228,68 @@ class AddDataFromFile(MainWindow):
         
         files = [u.toLocalFile() for u in event.mimeData().urls()]
         
-        # take only the first one
+        # all dropped PDF files (also in dropped directories) are queued, otherwise take only the
+        # first file
+        pdf_files = dropped_pdf_files(files)
+        if pdf_files:
+            self.logger.info(f'Got {len(pdf_files)} PDF files.')
+            self.queue_pdf_files(pdf_files)
+            event.accept()
+            return None
+        
         filepath = files[0]
         self.logger.info(f'Got file: \'{filepath.split("/")[-1]}\'')
-        
-        if filepath.endswith('.pdf'):
-            
-            pdf_file_wrapper = PDFReader.open(filepath=filepath)
                 
-            if pdf_file_wrapper is not None:
-                
-                ServiceManager.service_attr(ServiceManager.ServiceName.TABLE_EXTRACTOR, 'set_table_detector_workspace', pdf_file_wrapper=pdf_file_wrapper)
-                ServiceManager.run(ServiceManager.ServiceName.TABLE_EXTRACTOR)
-                event.accept()
-                
-            else:
-                self.logger.warning(f'pdf_file_wrapper is None.')
-                
-        elif filepath.endswith('.csv'):
+        if filepath.lower().endswith('.csv'):
             ServiceManager.service_attr(ServiceManager.ServiceName.CSV_TABLE_EXTRACTOR, 'add_data_from_file', filepath=filepath)
             ServiceManager.run(ServiceManager.ServiceName.CSV_TABLE_EXTRACTOR)
             event.accept()
-        elif filepath.endswith('.json'):
+        elif filepath.lower().endswith('.json'):
             ServiceManager.service_attr(ServiceManager.ServiceName.JSON_TABLE_EXTRACTOR, 'add_data_from_file', filepath=filepath)
             ServiceManager.run(ServiceManager.ServiceName.JSON_TABLE_EXTRACTOR)
             event.accept()
         else:
             event.ignore()
+            
+    def queue_pdf_files(self, filepaths: list[str]) -> None:
+        """Open the files in the background. The first one that gets opened goes straight to the
+        table extractor, the next one waits in `pdf_file_queue` (see `open_next_pdf_file`).
+        """
+        worker = PDFIngestWorker(filepaths, self)
+        worker.fileOpened.connect(lambda pdf_file_wrapper: self.__pdf_file_opened(pdf_file_wrapper, worker))
+        worker.finished.connect(lambda: self.pdf_ingest_workers.remove(worker))
+        self.pdf_ingest_workers.append(worker)
+        worker.start()
+        
+    def __pdf_file_opened(self, pdf_file_wrapper: PDFFileWrapper, worker: PDFIngestWorker) -> None:
+        self.pdf_file_queue.append((pdf_file_wrapper, worker))
+        self.logger.debug(f'{len(self.pdf_file_queue)} PDF files in the queue.')
+        
+        if not ServiceManager.service_is_active(ServiceManager.ServiceName.TABLE_EXTRACTOR):
+            self.open_next_pdf_file()
+            
+    def open_next_pdf_file(self) -> bool:
+        """Pass the next queued file to the table extractor and let its worker open the one after.
+
+        Returns:
+            bool: False if the queue is empty
+        """
+        if not self.pdf_file_queue:
+            self.logger.info('No more PDF files in the queue.')
+            return False
+        
+        pdf_file_wrapper, worker = self.pdf_file_queue.popleft()
+        ServiceManager.service_attr(
+            ServiceManager.ServiceName.TABLE_EXTRACTOR,
+            'set_table_detector_workspace',
+            pdf_file_wrapper=pdf_file_wrapper
+        )
+        ServiceManager.run(ServiceManager.ServiceName.TABLE_EXTRACTOR)
+        worker.request_next()
+        return True
+    
+    def queued_pdf_files_count(self) -> int:
+        return len(self.pdf_file_queue)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -10,9 +10,16 @@ from budgeting_app.utils.tools import (
     distance_from_line,
     is_all_not_none
 )
+from budgeting_app.pdf_table_reader.core.entities.models import TableOverlay
 
 DEFAULT_PEN = QtGui.QPen(QtGui.QColor(QtCore.Qt.GlobalColor.red))
 DEFAULT_HANDLES_PEN = QtGui.QPen(QtGui.QColor(QtCore.Qt.GlobalColor.cyan))
+# same colours pdfplumber uses in PageImage.debug_tablefinder
+OVERLAY_EDGE_PEN = QtGui.QPen(QtGui.QColor(255, 0, 0))
+OVERLAY_CELL_PEN = QtGui.QPen(QtGui.QColor(255, 0, 0, 200))
+OVERLAY_CELL_BRUSH = QtGui.QBrush(QtGui.QColor(0, 0, 255, 50))
+OVERLAY_INTERSECTION_PEN = QtGui.QPen(QtGui.QColor(0, 0, 255, 200))
+OVERLAY_INTERSECTION_RADIUS = 3
 DEFAULT_ZOOM_FACTOR = 1.1
 
 SELECTION_HANDLE_RADIUS = 5
@@ -109,10 +116,18 @@ class ImageData:
         image origin position
         - current_origin_pos: `QtCore.QPointF` - position of the top-left corner of the image with respect to
         the 'camera' view
+        - current_size: `QtCore.QSize` - size of the image as displayed; the same as the size of
+        `current_scaled_image` unless the image is painted from tiles (see `Canvas.tiles`), in which case
+        the scaled image is not kept up to date
     """
     original_image: QtGui.QImage
     current_scaled_image: QtGui.QImage
     current_origin_pos: QtCore.QPointF
+    current_size: QtCore.QSize = field(default=None)
+    
+    def __post_init__(self) -> None:
+        if self.current_size is None:
+            self.current_size = self.current_scaled_image.size()
 
 class TableDrawingTool:
 
@@ -756,14 +771,14 @@ class TableDrawingTool:
         scaled_tables: list[QTableF] = []
         
         # relative (to the previus one) ratio of the rescaled image's size to the original size
-        ratio_x = image_data.current_scaled_image.size().width() / image_data.original_image.size().width()
-        ratio_y = image_data.current_scaled_image.size().height() / image_data.original_image.size().height()
+        ratio_x = image_data.current_size.width() / image_data.original_image.size().width()
+        ratio_y = image_data.current_size.height() / image_data.original_image.size().height()
         abs_ratio = (ratio_x + ratio_y) / 2
         rel_ratio = abs_ratio / previous_ratio
         
         # x and y coordinate of the centre of the image
-        img_centre_x = image_data.current_origin_pos.x() + image_data.current_scaled_image.size().width() / 2
-        img_centre_y = image_data.current_origin_pos.y() + image_data.current_scaled_image.size().height() / 2
+        img_centre_x = image_data.current_origin_pos.x() + image_data.current_size.width() / 2
+        img_centre_y = image_data.current_origin_pos.y() + image_data.current_size.height() / 2
         
         for table in tables:
             
@@ -1021,3 +1036,48 @@ class TableDrawingTool:
             QTableF: updated table
         """
         return cls._update_division_count(table, 'y', row_count, add_row_mode)
+
+
+class TableOverlayDrawingTool:
+
+    @classmethod
+    def draw(cls, painter: QtGui.QPainter, overlay: TableOverlay, image_data: ImageData) -> None:
+        """Draw the table finder's geometry over the page image, wherever it is and however scaled.
+
+        Args:
+            painter (QtGui.QPainter): painter object to be used
+            overlay (TableOverlay): geometry in PDF points
+            image_data (ImageData): the page image the overlay belongs to
+        """
+        # the image starts at the page origin, not at (0, 0) of the PDF coordinates
+        page_x0, page_top = overlay.page_origin
+        scale = image_data.current_size.width() / overlay.page_size[0]
+        origin = image_data.current_origin_pos - QtCore.QPointF(page_x0 * scale, page_top * scale)
+
+        def to_rect(bbox: tuple[float, float, float, float]) -> QtCore.QRectF:
+            x0, top, x1, bottom = bbox
+            return QtCore.QRectF(origin.x() + x0 * scale, origin.y() + top * scale, (x1 - x0) * scale, (bottom - top) * scale)
+
+        painter.save()
+
+        painter.setPen(OVERLAY_CELL_PEN)
+        painter.setBrush(OVERLAY_CELL_BRUSH)
+        for cell in overlay.cells:
+            painter.drawRect(to_rect(cell))
+
+        painter.setBrush(QtCore.Qt.BrushStyle.NoBrush)
+        painter.setPen(OVERLAY_EDGE_PEN)
+        painter.drawLines([
+            QtCore.QLineF(origin.x() + x0 * scale, origin.y() + top * scale, origin.x() + x1 * scale, origin.y() + bottom * scale)
+            for x0, top, x1, bottom in overlay.edges
+        ])
+
+        painter.setPen(OVERLAY_INTERSECTION_PEN)
+        for x, top in overlay.intersections:
+            painter.drawEllipse(
+                QtCore.QPointF(origin.x() + x * scale, origin.y() + top * scale),
+                OVERLAY_INTERSECTION_RADIUS,
+                OVERLAY_INTERSECTION_RADIUS
+            )
+
+        painter.restore()
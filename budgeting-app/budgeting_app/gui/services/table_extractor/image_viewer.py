@@ -1,4 +1,6 @@
+from collections import deque
 import logging
+import threading
 from typing import Any
 from PyQt6 import QtWidgets, QtCore, QtGui
 
@@ -9,12 +11,99 @@ from budgeting_app.gui.services.table_extractor.image_tools import (
     DrawingSettings,
     ImageData,
     TableDrawingTool,
-    SelectedTable
+    SelectedTable,
+    TableOverlayDrawingTool
 )
+from budgeting_app.pdf_table_reader.core.entities.models import RawImage, TableOverlay
+from budgeting_app.pdf_table_reader.core.usecases.page_tiles import PageTiles, T_tile
 from budgeting_app.utils.logging import CustomLoggerAdapter
 from budgeting_app.utils.tools import is_all_not_none
 
 
+PLACEHOLDER_COLOR = QtGui.QColor('#f0f0f0')
+NAVIGATOR_ICON_SIZE = QtCore.QSize(96, 128)
+# how often an idle TileRenderWorker checks whether it's been interrupted
+TILE_WORKER_POLL_S = 0.1
+
+
+def to_qimage(image: bytes | RawImage | QtGui.QImage) -> QtGui.QImage:
+    """Decode the image bytes. Raw image is wrapped as it is, without copying the pixels, so the
+    `RawImage` must outlive the `QImage`.
+    """
+    if isinstance(image, QtGui.QImage):
+        return image
+    if isinstance(image, RawImage):
+        return QtGui.QImage(image.data, *image.size, image.stride, QtGui.QImage.Format.Format_RGB888)
+    return QtGui.QImage().fromData(QtCore.QByteArray(image))
+
+
+def get_placeholder_image(size: tuple[int, int]) -> QtGui.QImage:
+    """Blank image shown in a tab until the page is rendered."""
+    img = QtGui.QImage(*size, QtGui.QImage.Format.Format_RGB32)
+    img.fill(PLACEHOLDER_COLOR)
+    return img
+
+
+class TileRenderWorker(QtCore.QThread):
+    """Renders tiles of page pyramids in the background, emitting the tiles of each page as they
+    are done, so that painting never waits for pdfium. Only the tiles of the latest request are
+    rendered - the ones that were in view before (e.g. at another zoom) are dropped.
+    """
+    tileRendered = QtCore.pyqtSignal(object)
+    """
+    Args:\n
+        `page_tiles (PageTiles)` - pyramid a tile of which is in its cache now\n
+    """
+    
+    logger: logging.LoggerAdapter
+    
+    def __init__(self, parent: Any | None = None):
+        super().__init__(parent)
+        self.logger = CustomLoggerAdapter.getLogger('gui', className='TileRenderWorker')
+        self._pending: deque[tuple[PageTiles, int, int, int]] = deque()
+        self._pending_lock = threading.Lock()
+        self._wake = threading.Event()
+    
+    def request(self, page_tiles: PageTiles, resolution: int, tiles: list[T_tile]) -> None:
+        """Render the tiles of the level (instead of those requested before)."""
+        with self._pending_lock:
+            self._pending = deque((page_tiles, resolution, col, row) for col, row in tiles)
+            self._wake.set()
+    
+    def clear(self) -> None:
+        with self._pending_lock:
+            self._pending.clear()
+    
+    def stop(self) -> None:
+        """Cancel rendering and wait for the tile being rendered, so that the file can be closed."""
+        self.requestInterruption()
+        self._wake.set()
+        self.wait()
+    
+    def run(self) -> None:
+        while not self.isInterruptionRequested():
+            with self._pending_lock:
+                if not self._pending:
+                    self._wake.clear()
+                    task = None
+                else:
+                    task = self._pending.popleft()
+            
+            if task is None:
+                self._wake.wait(TILE_WORKER_POLL_S)
+                continue
+            
+            page_tiles, resolution, col, row = task
+            if page_tiles.cached_tile(resolution, col, row) is not None:
+                continue
+            try:
+                page_tiles.get_tile(resolution, col, row)
+            except Exception as e:
+                self.logger.warning(f'Failed to render tile {(resolution, col, row)} of page {page_tiles.page_id}: {e}')
+                continue
+            self.tileRendered.emit(page_tiles)
+
+
 class Canvas(QtWidgets.QWidget):
     drawing_enabled: bool
     image_data: ImageData
@@ -30,6 +119,16 @@ class Canvas(QtWidgets.QWidget):
     tables: list[QTableF]
     table_info: TableInfo
     
+    # pixels the original image is wrapped around, if it was given as such
+    raw_image: RawImage | None
+    
+    # tables found by pdfplumber, drawn over the image
+    table_overlay: TableOverlay | None
+    # pyramid of the page the image is painted from when zoomed (instead of scaling the image)
+    page_tiles: PageTiles | None
+    # renders the tiles missing in view, the canvas is repainted as they come
+    tile_render_worker: TileRenderWorker | None
+    
     logger: logging.LoggerAdapter
 
     newTable = QtCore.pyqtSignal(QTableF)
@@ -59,7 +158,7 @@ class Canvas(QtWidgets.QWidget):
     
     tableDeselected = QtCore.pyqtSignal()
 
-    def __init__(self, image_bytes: bytes, is_drawing_enabled: bool, parent: QtWidgets.QWidget | None = None):
+    def __init__(self, image_bytes: bytes | RawImage | QtGui.QImage, is_drawing_enabled: bool, parent: QtWidgets.QWidget | None = None):
         self.logger = CustomLoggerAdapter.getLogger('gui', className='Canvas')
         self.logger.debug('Initializing Canvas with image_bytes=....')
         
@@ -71,6 +170,9 @@ class Canvas(QtWidgets.QWidget):
         self.start_pos = None
         self.end_pos = None
         self.tables = []
+        self.table_overlay = None
+        self.page_tiles = None
+        self.tile_render_worker = None
         self.most_recent_scale_ratio = 1.0
         
         self.__set_image(image_bytes)
@@ -79,7 +181,7 @@ class Canvas(QtWidgets.QWidget):
     def image_bytes(self) -> bytes | None:
         if self.image_data is not None:
             img_bytes = QtCore.QByteArray()
-            device = QtCore.QIODevice(img_bytes)
+            device = QtCore.QBuffer(img_bytes)
             device.open(QtCore.QIODevice.OpenModeFlag.WriteOnly)
             self.image_data.original_image.save(device, format='PNG')
             return img_bytes.data()
@@ -104,10 +206,47 @@ class Canvas(QtWidgets.QWidget):
     def table_row_count(self) -> int:
         return self.table_info.table_drawing_settings.row_count
     
+    @property
+    def overlay(self) -> TableOverlay | None:
+        return self.table_overlay
+    
+    @property
+    def tiles(self) -> PageTiles | None:
+        return self.page_tiles
+    
+    @property
+    def tile_worker(self) -> TileRenderWorker | None:
+        return self.tile_render_worker
+    
     @image_bytes.setter
-    def image_bytes(self, val: bytes) -> None:
+    def image_bytes(self, val: bytes | RawImage) -> None:
         self.__set_image(val)
     
+    @overlay.setter
+    def overlay(self, val: TableOverlay | None) -> None:
+        self.table_overlay = val
+        self.update()
+    
+    @tiles.setter
+    def tiles(self, val: PageTiles | None) -> None:
+        self.page_tiles = val
+        if val is None:
+            # scaled image hasn't been kept up to date
+            self.image_data.current_scaled_image = self.image_data.original_image.scaled(self.image_data.current_size)
+        self.update()
+    
+    @tile_worker.setter
+    def tile_worker(self, val: TileRenderWorker | None) -> None:
+        if self.tile_render_worker is not None:
+            self.tile_render_worker.tileRendered.disconnect(self.__tile_rendered)
+        self.tile_render_worker = val
+        if val is not None:
+            val.tileRendered.connect(self.__tile_rendered)
+    
+    def __tile_rendered(self, page_tiles: PageTiles) -> None:
+        if page_tiles is self.page_tiles:
+            self.update()
+    
     @drawing_enabled.setter
     def drawing_enabled(self, val: bool) -> None:
         self.is_drawing_enabled = val
@@ -150,11 +289,13 @@ class Canvas(QtWidgets.QWidget):
             )
             self.update()
     
-    def __set_image(self, img_bytes: bytes) -> None:
+    def __set_image(self, img_bytes: bytes | RawImage | QtGui.QImage) -> None:
         self.logger.debug('Setting image from img_bytes.')
         
-        # Get PIL.Image object from bytes
-        img = QtGui.QImage().fromData(QtCore.QByteArray(img_bytes))
+        # Get QImage object from bytes (decoded already e.g. for placeholders); keep the raw pixels
+        # alive, they are not copied
+        img = to_qimage(img_bytes)
+        self.raw_image = img_bytes if isinstance(img_bytes, RawImage) else None
         
         if getattr(self, 'image_data', None) is None:
             self.logger.debug(f'image_data doesn\'t exist. Creating new image_data with {img} and current_origin_pos={QtCore.QPointF(0.0, 0.0)}')
@@ -172,8 +313,9 @@ class Canvas(QtWidgets.QWidget):
             # Update image content but keep the scale and origin position the same
             self.logger.debug('Updating image_data.original_image value.')
             self.image_data.original_image = img
-            self.logger.debug(f'resizing {img} with image_data.current_scaled_image={self.image_data.current_scaled_image.size()} and updating image_data.current_scaled_image.')
-            self.image_data.current_scaled_image = img.scaled(self.image_data.current_scaled_image.size())
+            if self.page_tiles is None:
+                self.logger.debug(f'resizing {img} with image_data.current_size={self.image_data.current_size} and updating image_data.current_scaled_image.')
+                self.image_data.current_scaled_image = img.scaled(self.image_data.current_size)
             
         self.update()
             
@@ -183,8 +325,8 @@ class Canvas(QtWidgets.QWidget):
             tuple[float, float]: Image origin displacement `(dx, dy)`
         """
         # New postion of the image origin
-        x = (self.width() - self.image_data.current_scaled_image.width()) / 2 + self.offset_x
-        y = (self.height() - self.image_data.current_scaled_image.height()) / 2 + self.offset_y
+        x = (self.width() - self.image_data.current_size.width()) / 2 + self.offset_x
+        y = (self.height() - self.image_data.current_size.height()) / 2 + self.offset_y
         
         # Image origin displacement
         dx = x - self.image_data.current_origin_pos.x()
@@ -201,16 +343,21 @@ class Canvas(QtWidgets.QWidget):
         
         self.logger.debug(f'Got QtGui.QWheelEvent with angle delta y = {event.angleDelta().y()}')
         
-        current_image_size = self.image_data.current_scaled_image.size()
+        current_image_size = QtCore.QSize(self.image_data.current_size)
         if event.angleDelta().y() > 0:
             current_image_size *= 1.1
         else:
             current_image_size /= 1.1
             
-        self.logger.debug(f'Updating image size from {self.image_data.current_scaled_image.size()} to {current_image_size}')
+        self.logger.debug(f'Updating image size from {self.image_data.current_size} to {current_image_size}')
         
-        # Update image from the 
-        self.image_data.current_scaled_image = self.image_data.original_image.scaled(current_image_size, QtCore.Qt.AspectRatioMode.KeepAspectRatio)
+        if self.page_tiles is None:
+            # Update image from the original one
+            self.image_data.current_scaled_image = self.image_data.original_image.scaled(current_image_size, QtCore.Qt.AspectRatioMode.KeepAspectRatio)
+            self.image_data.current_size = self.image_data.current_scaled_image.size()
+        else:
+            # painted from tiles, only the size changes
+            self.image_data.current_size = self.image_data.original_image.size().scaled(current_image_size, QtCore.Qt.AspectRatioMode.KeepAspectRatio)
         self.update_image_origin_pos()
         self.tables, self.most_recent_scale_ratio = TableDrawingTool.update_tables_scale(self.tables, self.image_data, self.most_recent_scale_ratio)
         
@@ -307,10 +454,66 @@ class Canvas(QtWidgets.QWidget):
             
             self.update()
 
+    def __paint_tiles(self, painter: QtGui.QPainter) -> None:
+        """Paint tiles of the pyramid level closest to the current zoom that are in view. Tiles that are not
+        rendered yet are requested from `tile_render_worker` (the canvas is repainted as they come), the
+        original image is shown underneath in the meantime.
+        """
+        origin = self.image_data.current_origin_pos
+        image_rect = QtCore.QRectF(origin, QtCore.QSizeF(self.image_data.current_size))
+        
+        dpi = self.image_data.current_size.width() / self.page_tiles.page_size[0] * 72
+        resolution = self.page_tiles.level(dpi)
+        level_width, _ = self.page_tiles.level_size(resolution)
+        
+        if level_width == self.image_data.original_image.width():
+            # the original image is that level
+            painter.drawImage(image_rect, self.image_data.original_image)
+            return
+        
+        # display pixels per pixel of the level
+        k = self.image_data.current_size.width() / level_width
+        
+        visible = QtCore.QRectF(self.rect()).intersected(image_rect)
+        visible_level_rect = (
+            (visible.left() - origin.x()) / k,
+            (visible.top() - origin.y()) / k,
+            (visible.right() - origin.x()) / k,
+            (visible.bottom() - origin.y()) / k
+        )
+        
+        tiles_to_draw = []
+        missing = []
+        for col, row in self.page_tiles.tiles_in_rect(resolution, visible_level_rect):
+            tile = self.page_tiles.cached_tile(resolution, col, row)
+            if tile is None:
+                missing.append((col, row))
+                continue
+            
+            x0, top, x1, bottom = self.page_tiles.tile_rect(resolution, col, row)
+            tiles_to_draw.append((
+                QtCore.QRectF(origin.x() + x0 * k, origin.y() + top * k, (x1 - x0) * k, (bottom - top) * k),
+                tile
+            ))
+        
+        if missing:
+            painter.drawImage(image_rect, self.image_data.original_image)
+            if self.tile_render_worker is not None:
+                self.tile_render_worker.request(self.page_tiles, resolution, missing)
+        
+        for target, tile in tiles_to_draw:
+            painter.drawImage(target, to_qimage(tile))
+    
     def paintEvent(self, _: QtGui.QPaintEvent):
             
         painter = QtGui.QPainter(self)
-        painter.drawImage(self.image_data.current_origin_pos, self.image_data.current_scaled_image)
+        if self.page_tiles is None:
+            painter.drawImage(self.image_data.current_origin_pos, self.image_data.current_scaled_image)
+        else:
+            self.__paint_tiles(painter)
+        
+        if self.table_overlay is not None:
+            TableOverlayDrawingTool.draw(painter, self.table_overlay, self.image_data)
 
         if self.is_drawing_enabled:
             # drawing is enabled
@@ -334,10 +537,16 @@ class Canvas(QtWidgets.QWidget):
             
             
 class ImageViewer(QtWidgets.QWidget):
-    tab_layout: QtWidgets.QVBoxLayout
+    tab_layout: QtWidgets.QHBoxLayout
     tab_widget: QtWidgets.QTabWidget
     tabs: list[Canvas]
     
+    # thumbnails of the pages next to the tabs
+    navigator: QtWidgets.QListWidget
+    # tabs which image is a placeholder (until `update_image`) and thumbnails to preview them with
+    placeholder_tabs: set[int]
+    thumbnails: dict[int, RawImage]
+    
     logger: logging.LoggerAdapter
     
     newTable = QtCore.pyqtSignal(QTableF)
@@ -374,12 +583,20 @@ class ImageViewer(QtWidgets.QWidget):
         
         super(QtWidgets.QWidget, self).__init__(parent)
         
-        self.tab_layout = QtWidgets.QVBoxLayout(self)
+        self.tab_layout = QtWidgets.QHBoxLayout(self)
         
         # Initialize tab screen
         self.tab_widget = QtWidgets.QTabWidget()
+        
+        # Initialize page navigator
+        self.navigator = QtWidgets.QListWidget()
+        self.navigator.setIconSize(NAVIGATOR_ICON_SIZE)
+        self.navigator.setFixedWidth(NAVIGATOR_ICON_SIZE.width() + 40)
+        self.navigator.currentRowChanged.connect(self.tab_widget.setCurrentIndex)
+        self.tab_widget.currentChanged.connect(self.__current_tab_changed)
   
-        # Add tabs to widget
+        # Add navigator and tabs to widget
+        self.tab_layout.addWidget(self.navigator)
         self.tab_layout.addWidget(self.tab_widget)
         self.setLayout(self.tab_layout)
         
@@ -387,6 +604,8 @@ class ImageViewer(QtWidgets.QWidget):
         self.canvas_attrs = [attr for attr in dir(Canvas) if isinstance(getattr(Canvas, attr, None), property)]
         
         self.tabs = []
+        self.placeholder_tabs = set()
+        self.thumbnails = {}
         
     @property
     def current_tab(self) -> int:
@@ -396,7 +615,7 @@ class ImageViewer(QtWidgets.QWidget):
     def current_tab(self, val: int) -> None:
         self.tab_widget.setCurrentIndex(val)
         
-    def set_images(self, image_bytes_list: list[bytes], is_drawing_enabled: bool) -> None:
+    def set_images(self, image_bytes_list: list[bytes | RawImage | QtGui.QImage], is_drawing_enabled: bool) -> None:
         
         self.logger.debug(f'Zipping image_bytes_list (len={len(image_bytes_list)}) and self.tabs (len={len(self.tabs)})')
         zipped = [
@@ -431,19 +650,72 @@ class ImageViewer(QtWidgets.QWidget):
                 # tab exists already but the image bytes is not given -> remove tab
                 self.logger.debug(f'{i}: {__zipped[i]} -> Remove tab.')
                 
-                self.tab_widget.removeTab(i)
-                self.tabs.pop(i)
+                # tabs before it have been kept, so it's always the first one past the images
+                self.tab_widget.removeTab(len(image_bytes_list))
+                self.tabs.pop(len(image_bytes_list))
                 
             else:
                 # tab exists and the image_bytes has been given, update the image in the tab
                 self.logger.debug(f'{i}: {__zipped[i]} -> Update tab image.')
                 
                 self.tabs[i].image_bytes = img_bytes
+        
+        self.placeholder_tabs.clear()
+        self.thumbnails.clear()
+        self.__set_navigator_items()
+    
+    def __set_navigator_items(self) -> None:
+        """One item per tab, without an icon until `update_thumbnail`."""
+        while self.navigator.count() > len(self.tabs):
+            self.navigator.takeItem(self.navigator.count() - 1)
+        while self.navigator.count() < len(self.tabs):
+            self.navigator.addItem(QtWidgets.QListWidgetItem(str(self.navigator.count())))
+        for i in range(self.navigator.count()):
+            self.navigator.item(i).setIcon(QtGui.QIcon())
+        self.navigator.setCurrentRow(self.current_tab)
+    
+    def __current_tab_changed(self, tab_index: int) -> None:
+        self.navigator.setCurrentRow(tab_index)
+        self.__preview_placeholder(tab_index)
+    
+    def __preview_placeholder(self, tab_index: int) -> None:
+        """Show the thumbnail, scaled up, in the current tab until the page is rendered."""
+        if tab_index == self.current_tab and tab_index in self.placeholder_tabs and tab_index in self.thumbnails:
+            size = self.tabs[tab_index].image_data.original_image.size()
+            self.tabs[tab_index].image_bytes = to_qimage(self.thumbnails[tab_index]).scaled(size)
                 
                 
-    def update_image(self, tab_index: int, image_bytes: bytes) -> None:
-        print(f'ImageViewer.update_image: tab_index={tab_index}, image_bytes=...')
+    def set_placeholders(self, sizes: list[tuple[int, int]], is_drawing_enabled: bool) -> None:
+        """Set up tabs with blank images of the given sizes to be filled in with `update_image` as
+        the pages get rendered.
+        """
+        self.logger.debug(f'Setting {len(sizes)} placeholder images.')
+        
+        # QImage is implicitly shared - one per size is enough
+        placeholders = {size: get_placeholder_image(size) for size in set(sizes)}
+        self.set_images([placeholders[size] for size in sizes], is_drawing_enabled)
+        for tab in self.tabs:
+            tab.overlay = None
+            tab.tiles = None
+        self.placeholder_tabs = set(range(len(self.tabs)))
+    
+    def update_thumbnail(self, tab_index: int, thumbnail: RawImage) -> None:
+        self.thumbnails[tab_index] = thumbnail
+        pixmap = QtGui.QPixmap.fromImage(to_qimage(thumbnail)).scaled(
+            NAVIGATOR_ICON_SIZE,
+            QtCore.Qt.AspectRatioMode.KeepAspectRatio,
+            QtCore.Qt.TransformationMode.SmoothTransformation
+        )
+        self.navigator.item(tab_index).setIcon(QtGui.QIcon(pixmap))
+        self.__preview_placeholder(tab_index)
+    
+    def update_image(self, tab_index: int, image_bytes: bytes | RawImage) -> None:
+        self.logger.debug(f'Updating image of tab {tab_index}.')
         self.tabs[tab_index].image_bytes = image_bytes
+        self.placeholder_tabs.discard(tab_index)
+    
+    def update_overlay(self, tab_index: int, overlay: TableOverlay | None) -> None:
+        self.tabs[tab_index].overlay = overlay
             
     def set_tab_attr(self, tab_index: int, attr_name: str, attr_value: Any) -> None:
         if attr_name in self.canvas_attrs:
@@ -1,4 +1,6 @@
+from collections import deque
 import sys
+import threading
 from typing import Any, Callable
 import logging
 
@@ -11,10 +13,12 @@ from budgeting_app.gui.utils.tools import (
     ExpandableSpinBoxList
 )
 from budgeting_app.gui.services.table_extractor.image_tools import QTableF, Tools, PythonicTableData
-from budgeting_app.gui.services.table_extractor.image_viewer import ImageViewer
-from budgeting_app.gui.services.base import MainWindow, ServiceRequirement
-from budgeting_app.pdf_table_reader.core.entities.models import ExplicitLineData, PDFFileWrapper
+from budgeting_app.gui.services.table_extractor.image_viewer import ImageViewer, TileRenderWorker
+from budgeting_app.gui.services.base import MainWindow, ServiceManager, ServiceRequirement
+from budgeting_app.pdf_table_reader.core.entities.models import ExplicitLineData, PDFFileWrapper, RawImage, TableOverlay, RAW_IMAGE_FORMAT
 from budgeting_app.pdf_table_reader.core.usecases.table_detector_workspace import TableDetectorWorkspace, DEFAULT_TABLE_SETTINGS
+from budgeting_app.pdf_table_reader.core.usecases.disk_render_cache import DiskRenderCache
+from budgeting_app.pdf_table_reader.core.usecases.page_tiles import PageTiles
 from budgeting_app.utils.tools import is_all_not_none
 from budgeting_app.utils.logging import CustomLoggerAdapter
 
@@ -27,6 +31,9 @@ class TableSettingsWidgets:
     
     strategy_allowed_values: list[str] = ["lines", "lines_strict", "text", "explicit"]
     
+    # widgets' signals are connected once, the workspace may be replaced afterwards
+    signals_connected: bool = False
+    
     # container widgets
     vertical_strategy_widget: QtWidgets.QWidget
     horizontal_strategy_widget: QtWidgets.QWidget
@@ -130,6 +137,10 @@ class TableSettingsWidgets:
         self._get_table_settings = lambda: table_detector_workspace.pdf_file.pages[self._get_current_page_index()].table_settings
         self._get_explicit_lines = lambda: table_detector_workspace.pdf_file.pages[self._get_current_page_index()].explicit_lines
         
+        if self.signals_connected:
+            return
+        self.signals_connected = True
+        
         self.__vertical_strategy_connect()
         self.__horizontal_strategy_connect()
         self.__explicit_vertical_lines_connect()
@@ -509,6 +520,77 @@ class TableSettingsWidgets:
         )
 
 
+def neighbours_first(page_indices: list[int], page_index: int) -> list[int]:
+    """Order pages by their distance from the given one, i.e. the page, the next one, the previous one,
+    the one after the next one and so on.
+    """
+    return sorted(page_indices, key=lambda i: (abs(i - page_index), i < page_index))
+
+
+class PageRenderWorker(QtCore.QThread):
+    """Renders pages of the workspace and finds tables on them in the background, emitting each page
+    as it's done. Thumbnails of all pages are rendered first, they take a fraction of the time. Then
+    the pages, one at a time (pypdfium2 is not thread-safe), starting with the current one and its
+    neighbours (see `prioritise`).
+    """
+    thumbnailRendered = QtCore.pyqtSignal(int, object)
+    """
+    Args:\n
+        `page_index (int)` - index of the page in the workspace\n
+        `thumbnail (RawImage)` - small image of the page\n
+    """
+    
+    pageRendered = QtCore.pyqtSignal(int, object, object, object)
+    """
+    Args:\n
+        `page_index (int)` - index of the page in the workspace\n
+        `image_bytes (bytes | RawImage)` - image of the page\n
+        `overlay (TableOverlay)` - tables found on the page\n
+        `tiles (PageTiles)` - tile pyramid of the page, to display it sharp at any zoom\n
+    """
+    
+    table_detector_workspace: TableDetectorWorkspace
+    logger: logging.LoggerAdapter
+    
+    def __init__(
+        self,
+        table_detector_workspace: TableDetectorWorkspace,
+        page_indices: list[int],
+        current_page_index: int = 0,
+        parent: Any | None = None
+    ):
+        super().__init__(parent)
+        self.logger = CustomLoggerAdapter.getLogger('gui', className='PageRenderWorker')
+        self.table_detector_workspace = table_detector_workspace
+        self._pending_thumbnails = deque(page_indices)
+        self._pending = deque(neighbours_first(page_indices, current_page_index))
+        self._pending_lock = threading.Lock()
+        
+    def prioritise(self, page_index: int) -> None:
+        """Render the page and then its neighbours next (except those rendered already)."""
+        with self._pending_lock:
+            self._pending = deque(neighbours_first(list(self._pending), page_index))
+    
+    def run(self) -> None:
+        while self._pending_thumbnails and not self.isInterruptionRequested():
+            page_index = self._pending_thumbnails.popleft()
+            self.thumbnailRendered.emit(page_index, self.table_detector_workspace.get_page_thumbnail(page_index))
+        
+        while not self.isInterruptionRequested():
+            with self._pending_lock:
+                if not self._pending:
+                    break
+                page_index = self._pending.popleft()
+            
+            image_bytes = self.table_detector_workspace.get_page_image(page_index)
+            overlay = self.table_detector_workspace.get_page_overlay(page_index)
+            # looked up here, the slot must not wait on `pages_lock` in the GUI thread
+            tiles = self.table_detector_workspace.get_page_tiles(page_index)
+            self.pageRendered.emit(page_index, image_bytes, overlay, tiles)
+        
+        self.logger.debug(f'Stopped with {len(self._pending)} pages left.')
+
+
 class TableExtractor(MainWindow):
 
     # editing_tools_widget hosts tool buttons and optionally table_size_widget
@@ -516,6 +598,7 @@ class TableExtractor(MainWindow):
     editing_tools_layout: QtWidgets.QVBoxLayout
     
     find_tables_button: QtWidgets.QPushButton
+    next_file_button: QtWidgets.QPushButton
     
     # tool buttons residing in editing_tools_widget
     table_drawing_tool_button: QtWidgets.QPushButton
@@ -538,6 +621,12 @@ class TableExtractor(MainWindow):
     image_viewer: ImageViewer
     # table detector workspace
     table_detector_workspace: TableDetectorWorkspace
+    # renders pages of the workspace in the background
+    page_render_worker: PageRenderWorker | None
+    # renders tiles of the pages zoomed in, see `Canvas.tile_worker`
+    tile_render_worker: TileRenderWorker | None
+    # page images of the files opened in the previous sessions
+    disk_render_cache: DiskRenderCache
     
     logger: logging.LoggerAdapter
 
@@ -550,6 +639,9 @@ class TableExtractor(MainWindow):
         self.logger.info('Initialising TableExtractor.')
 
         self.tables = []
+        self.page_render_worker = None
+        self.tile_render_worker = None
+        self.disk_render_cache = DiskRenderCache()
         self.service_requirements = [
             ServiceRequirement(
                 attr_name='set_table_detector_workspace',
@@ -588,16 +680,32 @@ class TableExtractor(MainWindow):
         and set the image wrapper object for it. Also, set the image for the image_viewer.
         """
         
+        # stop rendering the previous file and release it
+        self._stop_page_render_worker()
+        if getattr(self, 'table_detector_workspace', None) is not None:
+            self.table_detector_workspace.close()
+        
         # set up TableDetectorWorkspace with given PDFFileWrapper
         self.logger.debug('Setting up TableDetectorWorkspace with pdf_file_wrapper=....')
-        self.table_detector_workspace = TableDetectorWorkspace(pdf_file_wrapper)
-        
-        # set images for ImageViewer tabs
-        self.logger.debug('Setting images for ImageViewer tabs.')
-        self.image_viewer.set_images(
-            self.table_detector_workspace.set_pdf_file_image().image_bytes,
+        # no pages are skipped by their table score - the user looks at every one of them and would
+        # not know why tables found on a page are missing in the table widget
+        self.table_detector_workspace = TableDetectorWorkspace(
+            pdf_file_wrapper,
+            disk_render_cache=self.disk_render_cache
+        )
+        
+        # set placeholders for ImageViewer tabs, the pages are rendered in the background; page images
+        # do not change with the settings, tables found are drawn over them; the images are handed
+        # over as raw pixels - there's no need to encode them just to display them
+        self.logger.debug('Setting placeholder images for ImageViewer tabs.')
+        self.table_detector_workspace.set_pdf_file_image(overlay=True, lazy=True, _format=RAW_IMAGE_FORMAT)
+        self.image_viewer.set_placeholders(
+            [p.base_size for p in self.table_detector_workspace.pdf_file.pages],
             self.table_drawing_tool_button.isChecked()
         )
+        self.tile_render_worker = TileRenderWorker(self)
+        self.image_viewer.set_all_tabs_attr('tile_worker', self.tile_render_worker)
+        self.tile_render_worker.start()
 
         # connect appropriate TableDetectorWorkspace methods to TableSettingsWidgets' widgets signals
         self.logger.debug('Connecting TableDetectorWorkspace to TableSettingsWidgets.')
@@ -605,10 +713,24 @@ class TableExtractor(MainWindow):
         
         # pull data from the table settings and update values in the toolbox accordingly when the tab is changed
         self.logger.debug('Connecting TableSettingsWidgets.from_table_settings method to ImageViewer.tab_widget.currentChanged signal.')
+        try:
+            # connected already if this is not the first file
+            self.image_viewer.tab_widget.currentChanged.disconnect(self.table_settings_widgets.from_table_settings)
+        except TypeError:
+            pass
         self.image_viewer.tab_widget.currentChanged.connect(self.table_settings_widgets.from_table_settings)
         
-        # update table widget automatically when the pages are loaded
-        self._update_table_widget()
+        # current tab and its neighbours first, table widget is updated once all pages are rendered
+        self.page_render_worker = PageRenderWorker(
+            self.table_detector_workspace,
+            [*range(len(self.table_detector_workspace.pdf_file.pages))],
+            max(self.image_viewer.current_tab, 0),
+            self
+        )
+        self.page_render_worker.thumbnailRendered.connect(self.__thumbnail_rendered)
+        self.page_render_worker.pageRendered.connect(self.__page_rendered)
+        self.page_render_worker.finished.connect(self.__page_render_worker_finished)
+        self.page_render_worker.start()
         
         # connect an observer function, ImageViewer.update_image, to each relevant
         # page's settings dictionary (it will not be triggered for the default settings)
@@ -618,6 +740,40 @@ class TableExtractor(MainWindow):
             self.logger.debug(f'TableExtractor.set_table_detector_workspace: tab_index={tab_index}, page_index={page_index}')
             self.table_detector_workspace.pdf_file.pages[page_index].table_settings.add_callback(self.__table_settings_updated)
             
+    def _stop_page_render_worker(self) -> None:
+        """Cancel rendering and wait for the page (or tile) being rendered, so that the file can be closed."""
+        if self.page_render_worker is not None:
+            self.page_render_worker.requestInterruption()
+            self.page_render_worker.wait()
+            self.page_render_worker = None
+        if self.tile_render_worker is not None:
+            self.image_viewer.set_all_tabs_attr('tile_worker', None)
+            self.tile_render_worker.stop()
+            self.tile_render_worker = None
+    
+    def __thumbnail_rendered(self, page_index: int, thumbnail: RawImage) -> None:
+        if self.sender() is self.page_render_worker:
+            self.image_viewer.update_thumbnail(page_index, thumbnail)
+    
+    def __page_rendered(self, page_index: int, image_bytes: bytes | RawImage, overlay: TableOverlay, tiles: PageTiles) -> None:
+        if self.sender() is not self.page_render_worker:
+            # queued before the worker of the previous file was stopped
+            return
+        self.image_viewer.update_image(page_index, image_bytes)
+        self.image_viewer.update_overlay(page_index, overlay)
+        # sharp at any zoom
+        self.image_viewer.set_tab_attr(page_index, 'tiles', tiles)
+    
+    def __page_render_worker_finished(self) -> None:
+        if self.sender() is not self.page_render_worker or self.page_render_worker.isInterruptionRequested():
+            return
+        # update table widget automatically when the pages are loaded
+        self._update_table_widget()
+    
+    def __current_tab_changed(self, tab_index: int) -> None:
+        if self.page_render_worker is not None:
+            self.page_render_worker.prioritise(tab_index)
+    
     def __table_settings_updated(self, key: str | None = None, val: Any | None = None) -> None:
         if not self.find_tables_button.isEnabled():
             self.find_tables_button.setEnabled(True)
@@ -632,13 +788,17 @@ class TableExtractor(MainWindow):
             toolbar.addWidget(w)
 
     def __find_tables_button_clicked(self) -> None:
-        self.image_viewer.update_image(
+        self.image_viewer.update_overlay(
             self.image_viewer.current_tab,
-            self.table_detector_workspace.image_bytes[self.image_viewer.current_tab]
+            self.table_detector_workspace.get_page_overlay(self.image_viewer.current_tab)
         )
         self._update_table_widget()
         self.find_tables_button.setEnabled(False)
 
+    def __next_file_button_clicked(self) -> None:
+        # files dropped together are queued by the drag'n'drop service
+        ServiceManager.service_attr(ServiceManager.ServiceName.ADD_DATA_FROM_FILE, 'open_next_pdf_file')
+
     def __table_drawing_tool_button_clicked(self) -> None:
         if not self.table_drawing_tool_button.isChecked():
             # Prevent unchecking the button
@@ -716,6 +876,10 @@ class TableExtractor(MainWindow):
         self.find_tables_button.clicked.connect(self.__find_tables_button_clicked)
         self.editing_tools_layout.addWidget(self.find_tables_button)
 
+        self.next_file_button = QtWidgets.QPushButton("Next File")
+        self.next_file_button.clicked.connect(self.__next_file_button_clicked)
+        self.editing_tools_layout.addWidget(self.next_file_button)
+
         self.table_drawing_tool_button = QtWidgets.QPushButton("Table Creator")
         self.table_drawing_tool_button.setCheckable(True)
         self.table_drawing_tool_button.setChecked(False)
@@ -736,6 +900,7 @@ class TableExtractor(MainWindow):
         self.image_viewer.tableDeleted.connect(self.__table_deleted)
         self.image_viewer.tableSelected.connect(self.__table_selected)
         self.image_viewer.tableDeselected.connect(self.__table_deselected)
+        self.image_viewer.tab_widget.currentChanged.connect(self.__current_tab_changed)
         
     def _update_table_widget(self) -> None:
         """Update the table widget with text from all tables found across all pages. The data are
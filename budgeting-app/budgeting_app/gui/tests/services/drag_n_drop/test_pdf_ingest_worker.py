@@ -0,0 +1,74 @@
+from pathlib import Path
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from PyQt6.QtCore import Qt
+
+from budgeting_app.gui.services.drag_n_drop.drag_n_drop import PDFIngestWorker, dropped_pdf_files
+
+
+class TestPDFIngestWorker(unittest.TestCase):
+    def setUp(self) -> None:
+        self.taken = []
+        self.opened = []
+        self.layout_caches = []
+        
+        def open_many(filepaths, layout_cache=None):
+            self.layout_caches.append(layout_cache)
+            for filepath in filepaths:
+                self.taken.append(filepath)
+                yield filepath
+        
+        patcher = mock.patch('budgeting_app.gui.services.drag_n_drop.drag_n_drop.PDFReader.open_many', side_effect=open_many)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        
+        self.worker = PDFIngestWorker(['a.pdf', 'b.pdf', 'c.pdf'])
+        # emitted from the thread the worker runs in, there is no event loop here
+        self.worker.fileOpened.connect(self.opened.append, Qt.ConnectionType.DirectConnection)
+        
+    def wait_for(self, count: int) -> None:
+        deadline = time.monotonic() + 5
+        while len(self.opened) < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+        
+    def test_next_file_taken_on_request(self) -> None:
+        thread = threading.Thread(target=self.worker.run, daemon=True)
+        thread.start()
+        
+        self.wait_for(1)
+        time.sleep(0.2)
+        self.assertEqual(['a.pdf'], self.opened)
+        self.assertEqual(['a.pdf'], self.taken)
+        
+        self.worker.request_next()
+        self.wait_for(2)
+        self.assertEqual(['a.pdf', 'b.pdf'], self.taken)
+        
+        self.worker.request_next()
+        self.worker.request_next()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(['a.pdf', 'b.pdf', 'c.pdf'], self.opened)
+        self.assertEqual([self.worker.layout_cache], self.layout_caches)
+        
+    def test_dropped_pdf_files(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / 'statements' / '2023').mkdir(parents=True)
+            for name in ['statements/b.PDF', 'statements/a.pdf', 'statements/notes.txt', 'statements/2023/c.Pdf', 'd.pdf']:
+                (root / name).touch()
+            
+            actual = dropped_pdf_files([str(root / 'statements'), str(root / 'd.pdf'), str(root / 'statements' / 'notes.txt')])
+            
+        self.assertEqual(
+            [str(root / p) for p in ['statements/a.pdf', 'statements/b.PDF', 'statements/2023/c.Pdf', 'd.pdf']],
+            actual
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,9 @@
 import unittest
 from dataclasses import asdict
 
-from PyQt6 import QtCore
+from unittest import mock
+
+from PyQt6 import QtCore, QtGui
 
 from budgeting_app.gui.services.table_extractor.image_tools import (
     DrawingSettings,
@@ -11,10 +13,13 @@ from budgeting_app.gui.services.table_extractor.image_tools import (
     SelectedElement,
     SelectedTable,
     TableDrawingTool,
+    TableOverlayDrawingTool,
+    ImageData,
     MIN_COLUMN_WIDTH,
     MIN_ROW_HEIGHT,
 )
 from budgeting_app.gui.utils.tools import PyQtAssert
+from budgeting_app.pdf_table_reader.core.entities.models import TableOverlay
 
 class TestImageTools(unittest.TestCase):
     def setUp(self) -> None:
@@ -1380,7 +1385,25 @@ class TestImageTools(unittest.TestCase):
         actual = TableDrawingTool.update_row_count(self.table_4c4r, 4, AddMode.APPEND)
         PyQtAssert.equalTables(asdict(expected), asdict(actual))
 
-    
+    def test_draw_overlay_page_origin(self) -> None:
+        # page cropped at (100, 200), shown twice its size in points at (10, 20)
+        image = QtGui.QImage(400, 600, QtGui.QImage.Format.Format_RGB32)
+        image_data = ImageData(original_image=image, current_scaled_image=image, current_origin_pos=QtCore.QPointF(10, 20))
+        overlay = TableOverlay(
+            page_size=(200.0, 300.0),
+            page_origin=(100.0, 200.0),
+            edges=[(100.0, 200.0, 300.0, 200.0)],
+            intersections=[(100.0, 200.0)],
+            cells=[(110.0, 210.0, 150.0, 230.0)]
+        )
+        painter = mock.Mock()
+        
+        TableOverlayDrawingTool.draw(painter, overlay, image_data)
+        
+        painter.drawRect.assert_called_once_with(QtCore.QRectF(30, 40, 80, 40))
+        painter.drawLines.assert_called_once_with([QtCore.QLineF(10, 20, 410, 20)])
+        self.assertEqual(QtCore.QPointF(10, 20), painter.drawEllipse.call_args.args[0])
+
 
 
 if __name__ == '__main__':
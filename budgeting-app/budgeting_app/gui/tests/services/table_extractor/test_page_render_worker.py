@@ -0,0 +1,58 @@
+from pathlib import Path
+import unittest
+from unittest import mock
+
+from budgeting_app.gui.services.table_extractor.table_extractor import PageRenderWorker, neighbours_first
+from budgeting_app.pdf_table_reader.core.usecases.pdf_reader import PDFReader
+from budgeting_app.pdf_table_reader.core.usecases.table_detector_workspace import TableDetectorWorkspace
+
+
+class TestPageRenderWorker(unittest.TestCase):
+    def setUp(self) -> None:
+        test_data_path = Path(__file__).resolve().parents[4] / 'pdf_table_reader' / 'tests' / 'data'
+        self.table_detector_workspace = TableDetectorWorkspace(PDFReader.open(str(test_data_path / 'multiple_pages_sample.pdf')))
+        self.table_detector_workspace.set_pdf_file_image(overlay=True, lazy=True)
+        
+        self.rendered = []
+        self.thumbnails = []
+        self.worker = PageRenderWorker(self.table_detector_workspace, [0, 1, 2, 3])
+        self.worker.thumbnailRendered.connect(lambda page_index, thumbnail: self.thumbnails.append((page_index, thumbnail)))
+        self.worker.pageRendered.connect(lambda page_index, image_bytes, overlay, tiles: self.rendered.append((page_index, image_bytes, overlay, tiles)))
+        
+    def tearDown(self) -> None:
+        self.table_detector_workspace.close()
+        
+    def test_neighbours_first(self) -> None:
+        self.assertEqual([3, 4, 2, 5, 1, 0], neighbours_first([0, 1, 2, 3, 4, 5], 3))
+        self.assertEqual([0, 1, 2], neighbours_first([0, 1, 2], 0))
+        
+    def test_prioritised_page_first(self) -> None:
+        self.worker.prioritise(2)
+        self.worker.run()
+        
+        self.assertEqual([2, 3, 1, 0], [page_index for page_index, _, _, _ in self.rendered])
+        for page_index, image_bytes, overlay, tiles in self.rendered:
+            self.assertEqual(self.table_detector_workspace.get_page_image(page_index), image_bytes)
+            self.assertEqual(self.table_detector_workspace.get_page_overlay(page_index), overlay)
+            self.assertIs(self.table_detector_workspace.get_page_tiles(page_index), tiles)
+            
+    def test_thumbnails_before_pages(self) -> None:
+        thumbnails_before_page = []
+        self.worker.pageRendered.connect(lambda *args: thumbnails_before_page.append(len(self.thumbnails)))
+        self.worker.run()
+        
+        self.assertEqual([4, 4, 4, 4], thumbnails_before_page)
+        self.assertEqual([0, 1, 2, 3], [page_index for page_index, _ in self.thumbnails])
+        for page_index, thumbnail in self.thumbnails:
+            self.assertEqual(self.table_detector_workspace.get_page_tiles(page_index).level_size(30), thumbnail.size)
+            
+    def test_interruption(self) -> None:
+        # interrupted while the first page was being rendered, after all thumbnails
+        with mock.patch.object(self.worker, 'isInterruptionRequested', side_effect=[False] * 5 + [True]):
+            self.worker.run()
+        self.assertEqual(4, len(self.thumbnails))
+        self.assertEqual([0], [page_index for page_index, _, _, _ in self.rendered])
+
+
+if __name__ == "__main__":
+    unittest.main()
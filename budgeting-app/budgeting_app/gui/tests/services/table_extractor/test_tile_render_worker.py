@@ -0,0 +1,53 @@
+from pathlib import Path
+import threading
+import unittest
+
+from PyQt6 import QtCore
+
+from budgeting_app.gui.services.table_extractor.image_viewer import TileRenderWorker
+from budgeting_app.pdf_table_reader.core.usecases.pdf_reader import PDFReader
+from budgeting_app.pdf_table_reader.core.usecases.table_detector_workspace import TableDetectorWorkspace
+
+
+class TestTileRenderWorker(unittest.TestCase):
+    def setUp(self) -> None:
+        test_data_path = Path(__file__).resolve().parents[4] / 'pdf_table_reader' / 'tests' / 'data'
+        self.table_detector_workspace = TableDetectorWorkspace(PDFReader.open(str(test_data_path / 'multiple_pages_sample.pdf')))
+        self.page_tiles = self.table_detector_workspace.get_page_tiles(1)
+        
+        self.rendered = []
+        self.all_rendered = threading.Event()
+        self.worker = TileRenderWorker()
+        # emitted from the worker thread, there's no event loop to deliver it
+        self.worker.tileRendered.connect(self.tile_rendered, QtCore.Qt.ConnectionType.DirectConnection)
+        
+    def tearDown(self) -> None:
+        self.worker.stop()
+        self.table_detector_workspace.close()
+        
+    def tile_rendered(self, page_tiles) -> None:
+        self.rendered.append(page_tiles)
+        if len(self.rendered) == 2:
+            self.all_rendered.set()
+        
+    def test_renders_requested_tiles(self) -> None:
+        self.worker.start()
+        self.worker.request(self.page_tiles, 200, [(0, 0), (1, 0)])
+        
+        self.assertTrue(self.all_rendered.wait(30))
+        self.assertEqual([self.page_tiles] * 2, self.rendered)
+        self.assertIsNotNone(self.page_tiles.cached_tile(200, 0, 0))
+        self.assertIsNotNone(self.page_tiles.cached_tile(200, 1, 0))
+        
+    def test_latest_request_replaces_pending(self) -> None:
+        self.worker.request(self.page_tiles, 200, [(0, 0), (1, 0)])
+        self.worker.request(self.page_tiles, 100, [(0, 0), (1, 0)])
+        self.worker.start()
+        
+        self.assertTrue(self.all_rendered.wait(30))
+        self.assertIsNone(self.page_tiles.cached_tile(200, 0, 0))
+        self.assertIsNotNone(self.page_tiles.cached_tile(100, 1, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -47,7 +47,7 @@ def step_impl(context: _context, direction: str, widget_name: str) -> None:
             # Get Canvas object from current tab 
             widget: QtWidgets.QMainWindow = context.current_service_window_obj.image_viewer.tabs[tab_idx]
             # Record the image size from the Canvas
-            context.previous_image_size = widget.image_data.current_scaled_image.size()
+            context.previous_image_size = QtCore.QSize(widget.image_data.current_size)
         else:
             raise NotImplementedError
             
@@ -316,7 +316,7 @@ def step_impl(context: _context, image_behavior: str) -> None:
         
         # find current size of the image as is displayed
         current_tab_idx = context.current_service_window_obj.image_viewer.current_tab
-        current_img_size: QtCore.QSize = context.current_service_window_obj.image_viewer.tabs[current_tab_idx].image_data.current_scaled_image.size()
+        current_img_size: QtCore.QSize = context.current_service_window_obj.image_viewer.tabs[current_tab_idx].image_data.current_size
         
         if image_behavior in ['becomes bigger', 'becomes larger']:
             
@@ -0,0 +1,185 @@
+import numpy as np
+
+from pdfplumber import table
+
+from budgeting_app.pdf_table_reader.core.entities.table_finder import IncrementalTableFinder, T_obj
+
+
+# intersections are looked for between blocks of that many vertical edges and all horizontal ones
+# at a time, so that the comparison matrices stay small
+INTERSECTION_BLOCK_SIZE = 512
+
+
+def cluster_ids(values: np.ndarray, tolerance: float) -> np.ndarray:
+    """Index of the cluster of each value, as `utils.cluster_list` makes them - distinct values
+    sorted and a cluster goes on while the next one is within tolerance of the previous one.
+    """
+    unique = np.unique(values)
+    breaks = np.zeros(len(unique), dtype=np.int64)
+    breaks[1:] = unique[1:] > unique[:-1] + tolerance
+    return np.cumsum(breaks)[np.searchsorted(unique, values)]
+
+
+def snap_shifts(positions: np.ndarray, tolerance: float) -> tuple[np.ndarray, np.ndarray]:
+    """Order and shifts of edges snapped to the average position of their cluster, as
+    `utils.snap_objects` does it.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: order of the edges after snapping (by cluster, then as
+        given) and the shift of each edge (in the order given)
+    """
+    if not len(positions):
+        return np.arange(0), np.zeros(0)
+
+    ids = cluster_ids(positions, tolerance)
+    order = np.argsort(ids, kind='stable')
+
+    # sums of each cluster added up in Python, so that the averages are the same to the last bit
+    bounds = np.flatnonzero(np.diff(ids[order])) + 1
+    averages = np.array([sum(cluster) / len(cluster) for cluster in np.split(positions[order], bounds)])
+    return order, averages[ids] - positions
+
+
+class ArrayTableFinder(IncrementalTableFinder):
+    """`IncrementalTableFinder` with edges kept in NumPy arrays while they are merged and
+    intersected. Edges are snapped by sorting and clustering their positions, collinear ones are
+    joined by a running maximum over each line and intersections are found by broadcasting
+    vertical edges against horizontal ones - pdfplumber does all of it edge by edge in Python,
+    which takes most of the time on ruled pages with thousands of short segments.
+
+    The arithmetic is the same as pdfplumber's, so are the edges (their positions and lengths),
+    intersections, cells and tables. Edges are given as dicts again with their bbox, size,
+    orientation and object type only.
+
+    Example:
+        ```
+        finder = ArrayTableFinder(_page, settings)
+        tables = [t.extract() for t in finder.tables]
+        ```
+    """
+
+    def merge_edges(self, edges: list[T_obj]) -> list[T_obj]:
+        settings = self.settings
+        if not edges:
+            return []
+
+        x0 = np.array([e['x0'] for e in edges], dtype=float)
+        top = np.array([e['top'] for e in edges], dtype=float)
+        x1 = np.array([e['x1'] for e in edges], dtype=float)
+        bottom = np.array([e['bottom'] for e in edges], dtype=float)
+        width = np.array([e['width'] if 'width' in e else e['x1'] - e['x0'] for e in edges], dtype=float)
+        height = np.array([e['height'] if 'height' in e else e['bottom'] - e['top'] for e in edges], dtype=float)
+        vertical = np.array([e['orientation'] == 'v' for e in edges])
+        object_types = [e.get('object_type') for e in edges]
+
+        # snap - vertical edges by x0 followed by horizontal ones by top, see `table.snap_edges`
+        order = np.arange(len(edges))
+        if settings.snap_x_tolerance > 0 or settings.snap_y_tolerance > 0:
+            v, h = np.flatnonzero(vertical), np.flatnonzero(~vertical)
+
+            v_order, v_shifts = snap_shifts(x0[v], settings.snap_x_tolerance)
+            x0[v] += v_shifts
+            x1[v] += v_shifts
+
+            h_order, h_shifts = snap_shifts(top[h], settings.snap_y_tolerance)
+            top[h] += h_shifts
+            bottom[h] += h_shifts
+
+            order = np.concatenate([v[v_order], h[h_order]])
+
+        # positions along (lo, hi) and across (line) the edges
+        line = np.where(vertical, x0, top)
+        lo = np.where(vertical, top, x0)
+        hi = np.where(vertical, bottom, x1)
+
+        # by line (horizontal ones first) and by position along it, see `table.merge_edges`
+        order = order[np.lexsort((lo[order], line[order], vertical[order]))]
+        x0, top, x1, bottom = x0[order], top[order], x1[order], bottom[order]
+        width, height, vertical = width[order], height[order], vertical[order]
+        line, lo, hi = line[order], lo[order], hi[order]
+        object_types = [object_types[i] for i in order]
+
+        # join - an edge starts a new segment if it starts past the furthest end of the previous
+        # edges on its line (plus tolerance), see `table.join_edge_group`
+        tolerance = np.where(vertical, settings.join_y_tolerance, settings.join_x_tolerance)
+        line_starts = np.ones(len(order), dtype=bool)
+        line_starts[1:] = (line[1:] != line[:-1]) | (vertical[1:] != vertical[:-1])
+        starts = line_starts.copy()
+        furthest = hi.copy()
+        bounds = np.flatnonzero(line_starts).tolist() + [len(order)]
+        for start, end in zip(bounds, bounds[1:]):
+            if end - start > 1:
+                furthest[start:end] = np.maximum.accumulate(hi[start:end])
+                starts[start + 1:end] = lo[start + 1:end] > furthest[start:end - 1] + tolerance[start + 1:end]
+
+        segment_bounds = np.flatnonzero(starts).tolist() + [len(order)]
+        first = np.array(segment_bounds[:-1])
+        last = np.array(segment_bounds[1:]) - 1
+        end = furthest[last]
+        extended = end > hi[first]
+
+        # `utils.resize_object` - width is set from the new end, height changes by each extension
+        width = width[first]
+        height = height[first]
+        width[extended & ~vertical[first]] = (end - x0[first])[extended & ~vertical[first]]
+        for k in np.flatnonzero(extended & vertical[first]).tolist():
+            i, current = first[k], hi[first[k]]
+            for j in range(i + 1, last[k] + 1):
+                if hi[j] > current:
+                    height[k] += hi[j] - current
+                    current = hi[j]
+
+        joined_vertical = vertical[first]
+        keep = np.where(joined_vertical, height, width) >= settings.edge_min_length
+        columns = zip(
+            x0[first][keep].tolist(),
+            top[first][keep].tolist(),
+            np.where(joined_vertical, x1[first], end)[keep].tolist(),
+            np.where(joined_vertical, end, bottom[first])[keep].tolist(),
+            width[keep].tolist(),
+            height[keep].tolist(),
+            joined_vertical[keep].tolist(),
+            first[keep].tolist()
+        )
+        return [
+            {
+                'x0': _x0, 'top': _top, 'x1': _x1, 'bottom': _bottom, 'width': _width, 'height': _height,
+                'orientation': 'v' if _vertical else 'h',
+                'object_type': object_types[i]
+            }
+            for _x0, _top, _x1, _bottom, _width, _height, _vertical, i in columns
+        ]
+
+    def get_intersections(self) -> table.T_intersections:
+        x_tolerance = self.settings.intersection_x_tolerance
+        y_tolerance = self.settings.intersection_y_tolerance
+
+        v_edges = sorted((e for e in self.edges if e['orientation'] == 'v'), key=lambda e: (e['x0'], e['top']))
+        h_edges = sorted((e for e in self.edges if e['orientation'] == 'h'), key=lambda e: (e['top'], e['x0']))
+        if not v_edges or not h_edges:
+            return {}
+
+        v_x0 = np.array([e['x0'] for e in v_edges])[:, None]
+        v_top = np.array([e['top'] for e in v_edges])[:, None]
+        v_bottom = np.array([e['bottom'] for e in v_edges])[:, None]
+        h_top = np.array([e['top'] for e in h_edges])
+        h_x0 = np.array([e['x0'] for e in h_edges])
+        h_x1 = np.array([e['x1'] for e in h_edges])
+
+        intersections: table.T_intersections = {}
+        for start in range(0, len(v_edges), INTERSECTION_BLOCK_SIZE):
+            block = slice(start, start + INTERSECTION_BLOCK_SIZE)
+            touching = (v_top[block] <= h_top + y_tolerance) \
+                & (v_bottom[block] >= h_top - y_tolerance) \
+                & (v_x0[block] >= h_x0 - x_tolerance) \
+                & (v_x0[block] <= h_x1 + x_tolerance)
+
+            # vertical edges first, in the order pdfplumber visits the pairs
+            for i, j in zip(*(a.tolist() for a in np.nonzero(touching))):
+                v, h = v_edges[start + i], h_edges[j]
+                vertex = (v['x0'], h['top'])
+                if vertex not in intersections:
+                    intersections[vertex] = {'v': [], 'h': []}
+                intersections[vertex]['v'].append(v)
+                intersections[vertex]['h'].append(h)
+        return intersections
@@ -1,22 +1,212 @@
+from collections import OrderedDict
 from dataclasses import dataclass, asdict, field
+import hashlib
+import io
+import json
+import math
 import threading
-from typing import Literal
+from typing import Any, Callable, Literal
 from uuid import uuid4
+import weakref
 
-from pdfplumber import page
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdftypes import resolve1
+import pdfplumber
+from pdfplumber import page, table
+from PIL import Image
 
 from budgeting_app.utils.types import TypedObservableDict
+from budgeting_app.pdf_table_reader.core.entities.spatial_index import PageSpatialIndex
+from budgeting_app.pdf_table_reader.core.entities.table_finder import IncrementalTableFinder, base_edges_key
 
 BASE_IMAGE_RESOLUTION = 200
+DEFAULT_MAX_RESIDENT_PAGES = 32
+# `_format` of images handed over as `RawImage` instead of being encoded
+RAW_IMAGE_FORMAT = 'RAW'
+
+T_table_finder_backend = Literal['python', 'numpy']
+
+
+def table_finder_class(backend: T_table_finder_backend) -> type[IncrementalTableFinder]:
+    """Table finder of the backend - 'python' (pdfplumber's merging and intersecting) or 'numpy'
+    (`ArrayTableFinder`, same results; NumPy is imported on first use).
+    """
+    if backend == 'python':
+        return IncrementalTableFinder
+    if backend == 'numpy':
+        from budgeting_app.pdf_table_reader.core.entities.array_table_finder import ArrayTableFinder
+        return ArrayTableFinder
+    raise ValueError(f'Unknown table finder backend {backend!r}.')
+
+
+def table_settings_hash(table_settings: dict[str, Any]) -> str:
+    """Hash of the settings that does not depend on the order of keys or their container type
+    (`dict`/`TypedObservableDict`, lists/tuples).
+    """
+    canonical = json.dumps(dict(table_settings), sort_keys=True, default=str)
+    return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+
+
+def get_page_image_size(page_obj: PDFPage, resolution: int | float = BASE_IMAGE_RESOLUTION) -> tuple[int, int]:
+    """Size (in pixels) of the image pdfplumber would render for the given page without actually
+    rendering it. Mirrors pypdfium2: the rendered area is the intersection of the media box and
+    the crop box, rotated and scaled by `resolution / 72` with each side rounded up.
+
+    Args:
+        page_obj (PDFPage): pdfminer page object (available as `page.Page.page_obj` in pdfplumber)
+        resolution (int | float, optional): Defaults to BASE_IMAGE_RESOLUTION.
+
+    Returns:
+        tuple[int, int]: (width, height) of the image
+    """
+    mediabox = [resolve1(v) for v in page_obj.mediabox]
+    cropbox = [resolve1(v) for v in page_obj.cropbox]
+    
+    # normalise both boxes to (x0, y0, x1, y1) and intersect them
+    m_x0, m_y0, m_x1, m_y1 = min(mediabox[0], mediabox[2]), min(mediabox[1], mediabox[3]), max(mediabox[0], mediabox[2]), max(mediabox[1], mediabox[3])
+    c_x0, c_y0, c_x1, c_y1 = min(cropbox[0], cropbox[2]), min(cropbox[1], cropbox[3]), max(cropbox[0], cropbox[2]), max(cropbox[1], cropbox[3])
+    width = max(min(m_x1, c_x1) - max(m_x0, c_x0), 0)
+    height = max(min(m_y1, c_y1) - max(m_y0, c_y0), 0)
+    
+    if page_obj.rotate % 180 == 90:
+        width, height = height, width
+    
+    scale = resolution / 72
+    return math.ceil(width * scale), math.ceil(height * scale)
+
+
+class _LazyPage:
+    """Descriptor behind `PDFPageWrapper.page`. Returns the page object if it has been given
+    or materialises it with `PDFPageWrapper.page_loader` on first access.
+    """
+    
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.attr_name = f'_{name}'
+    
+    def __get__(self, obj: Any, objtype: type | None = None) -> page.Page | None:
+        if obj is None:
+            # dataclass asks for the default value
+            return None
+        
+        _page = obj.__dict__.get(self.attr_name)
+        if _page is None and obj.__dict__.get('page_loader') is not None:
+            _page = obj.page_loader()
+            obj.__dict__[self.attr_name] = _page
+        
+        resident_pages = obj.__dict__.get('_resident_pages')
+        if _page is not None and resident_pages is not None:
+            resident_pages.touch(obj)
+            
+        return _page
+    
+    def __set__(self, obj: Any, value: page.Page | None) -> None:
+        obj.__dict__[self.attr_name] = value
+
+
+class ResidentPages:
+    """Least recently used pages of a file. Once there are more than `max_pages` of them, the
+    oldest ones are released (see `PDFPageWrapper.release`).
+    """
+    max_pages: int | None
+    
+    def __init__(self, max_pages: int | None = DEFAULT_MAX_RESIDENT_PAGES) -> None:
+        self.max_pages = None if max_pages is None else max(1, max_pages)
+        self._pages: OrderedDict[int, 'PDFPageWrapper'] = OrderedDict()
+        self._lock = threading.Lock()
+        
+    def __len__(self) -> int:
+        return len(self._pages)
+    
+    def touch(self, page_wrapper: 'PDFPageWrapper') -> None:
+        # PDFPageWrapper is not hashable
+        key = id(page_wrapper)
+        
+        with self._lock:
+            if key in self._pages:
+                self._pages.move_to_end(key)
+                return
+            
+            self._pages[key] = page_wrapper
             
+            evicted = []
+            while self.max_pages is not None and len(self._pages) > self.max_pages:
+                evicted.append(self._pages.popitem(last=False)[1])
+                
+        for p in evicted:
+            p.release()
+            
+    def discard(self, page_wrapper: 'PDFPageWrapper') -> None:
+        with self._lock:
+            self._pages.pop(id(page_wrapper), None)
+
+
+@dataclass
+class RawImage:
+    """Uncompressed pixels of an image, so that they can be displayed without encoding and decoding
+    them on the way (the GUI wraps `data` as it is).
+        - data: `bytes | memoryview` - rows of pixels, top to bottom; a view e.g. of a memory-mapped file
+        (see `DiskRenderCache`)
+        - size: `tuple[int, int]` - width and height in pixels
+        - stride: `int` - number of bytes per row
+        - mode: `str` - PIL mode of the pixels
+    """
+    data: bytes | memoryview
+    size: tuple[int, int]
+    stride: int
+    mode: str = field(default='RGB')
+    
+    @classmethod
+    def from_pil(cls, img: Image.Image) -> 'RawImage':
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        return cls(data=img.tobytes(), size=img.size, stride=3 * img.size[0])
+    
+    @property
+    def nbytes(self) -> int:
+        return len(self.data)
+    
+    def to_pil(self) -> Image.Image:
+        return Image.frombuffer(self.mode, self.size, self.data, 'raw', self.mode, self.stride, 1)
+    
+    def to_png(self) -> bytes:
+        """Encode the image e.g. to save it."""
+        image_bytes_io = io.BytesIO()
+        self.to_pil().save(image_bytes_io, format='PNG')
+        return image_bytes_io.getvalue()
+
 
 @dataclass
 class ImageWrapper:
-    image_bytes: list[bytes]
+    """
+        - image_bytes: `list[bytes | RawImage]` - images encoded in `_format` or raw ones if it's
+        `RAW_IMAGE_FORMAT`
+        - overlay: `bool` - images are bare page rasters and the tables found are given separately
+        as `TableOverlay` geometry; otherwise the tables are drawn onto the images
+    """
+    image_bytes: list[bytes | RawImage]
     page_indices: list[int] | Literal['all'] = field(default_factory=Literal['all'])
     resolution: int = field(default=BASE_IMAGE_RESOLUTION)
     _format: str = field(default='PNG')
     antialias: bool = field(default=False)
+    overlay: bool = field(default=False)
+
+
+@dataclass
+class TableOverlay:
+    """What pdfplumber's table finder found on the page, in PDF points (top-left origin).
+        - page_size: `tuple[float, float]` - width and height of the page
+        - page_origin: `tuple[float, float]` - (x0, top) of the page bbox; non-zero e.g. for a
+        cropped page, whose objects keep the coordinates of the page it was cropped from
+        - edges: `list[tuple[float, float, float, float]]` - (x0, top, x1, bottom) of the edges
+        - intersections: `list[tuple[float, float]]` - (x, top) of the edges' intersections
+        - cells: `list[tuple[float, float, float, float]]` - (x0, top, x1, bottom) of the cells of
+        all tables
+    """
+    page_size: tuple[float, float]
+    page_origin: tuple[float, float] = field(default=(0.0, 0.0))
+    edges: list[tuple[float, float, float, float]] = field(default_factory=list)
+    intersections: list[tuple[float, float]] = field(default_factory=list)
+    cells: list[tuple[float, float, float, float]] = field(default_factory=list)
 
 
 @dataclass
@@ -27,21 +217,221 @@ class ExplicitLineData:
     is_part_of_table: bool = field(default=False)
 
 
+@dataclass
+class ExplicitTableData:
+    """Table drawn by the user. Positions are in the units of `ExplicitLineData.value`.
+        - bbox: `tuple[float, float, float, float]` - (x0, top, x1, bottom) of the table
+        - vlines: `list[float]` - lines separating columns
+        - hlines: `list[float]` - lines separating rows
+        - line_uuids: `list[str]` - `ExplicitLineData` the table has been added to the page as
+    """
+    bbox: tuple[float, float, float, float]
+    vlines: list[float] = field(default_factory=list)
+    hlines: list[float] = field(default_factory=list)
+    line_uuids: list[str] = field(default_factory=list, compare=False)
+
+
 @dataclass
 class PDFPageWrapper:
-    page: page.Page
-    base_size: tuple[int, int] = field(init=False)
+    """
+        - page: `page.Page` - pdfplumber page; can be omitted if `page_loader` is given, in which
+        case it's created on first access
+        - base_size: `tuple[int, int]` - size of the page image at `BASE_IMAGE_RESOLUTION`; derived
+        from the page geometry when not given
+        - explicit_tables: `list[ExplicitTableData]` - tables drawn on the page; their text is
+        extracted from their area only (see `TableDetectorWorkspace.get_tables_text`)
+        - page_number: `int | None` - index of the page within its source document
+        - page_loader: `Callable[[], page.Page] | None` - creates the pdfplumber page
+        - table_score: `float | None` - table likelihood of the page once it has been pre-scanned
+        - fingerprint: `str | None` - see `PDFReader.fingerprint`
+        - image_bytes: `bytes | RawImage | None` - last rendered image of the page
+        - table_finder_backend: `T_table_finder_backend` - see `table_finder_class`; 'numpy' is
+        faster on pages with thousands of ruling segments
+        - uuid: `str` - identifies the page e.g. in caches
+        - image_dirty: `bool` - whether `table_settings` or `explicit_lines` changed since the image
+        was rendered; set through `table_settings` callbacks or by replacing either of them
+    """
+    page: 'page.Page | None' = _LazyPage()
+    base_size: tuple[int, int] | None = field(default=None, kw_only=True)
     table_settings: TypedObservableDict = field(init=False, default_factory=lambda: TypedObservableDict())
     explicit_lines: list[ExplicitLineData] = field(default_factory=lambda: [])
+    explicit_tables: list[ExplicitTableData] = field(default_factory=lambda: [], kw_only=True, compare=False)
+    page_number: int | None = field(default=None, kw_only=True)
+    page_loader: Callable[[], 'page.Page'] | None = field(default=None, kw_only=True, repr=False, compare=False)
+    table_score: float | None = field(default=None, kw_only=True, compare=False)
+    fingerprint: str | None = field(default=None, kw_only=True, compare=False)
+    image_bytes: bytes | RawImage | None = field(default=None, kw_only=True, repr=False, compare=False)
+    image_dirty: bool = field(default=True, kw_only=True, repr=False, compare=False)
+    table_finder_backend: T_table_finder_backend = field(default='python', kw_only=True, repr=False, compare=False)
+    uuid: str = field(default_factory=lambda: str(uuid4()), kw_only=True, repr=False, compare=False)
     
     def __post_init__(self) -> None:
-        self.base_size = self.page.to_image(BASE_IMAGE_RESOLUTION).original.size
+        if self.base_size is None:
+            self.base_size = get_page_image_size(self.page.page_obj)
+        
+        if self.page_number is None and self.__dict__.get('_page') is not None:
+            self.page_number = self.page.page_number - 1
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        
+        if name == 'table_finder_backend':
+            self.__dict__.pop('_table_finders', None)
+        
+        if name in ['table_settings', 'explicit_lines']:
+            self.__dict__['image_dirty'] = True
+            self.__dict__.pop('_table_finders', None)
+            
+            if isinstance(value, TypedObservableDict):
+                callback = self.__dict__.get('_mark_image_dirty')
+                if callback is None:
+                    # not a bound method - its repr (logged by TypedObservableDict) would load the page
+                    def callback(key: str, val: Any) -> None:
+                        self.__dict__['image_dirty'] = True
+                        self.__dict__.pop('_table_finders', None)
+                    self.__dict__['_mark_image_dirty'] = callback
+                    
+                if not value.has_callback(callback):
+                    value.add_callback(callback)
+    
+    @property
+    def is_loaded(self) -> bool:
+        return self.__dict__.get('_page') is not None
+    
+    @property
+    def spatial_index(self) -> PageSpatialIndex:
+        """Index of the page's chars and words for region queries, built on first access."""
+        if self.__dict__.get('_spatial_index') is None:
+            _page = self.page
+            self.__dict__['_spatial_index'] = PageSpatialIndex(_page.chars, _page.extract_words)
+        return self.__dict__['_spatial_index']
     
+    @property
+    def table_finder(self) -> table.TableFinder:
+        """Tables (along with edges and intersections) found on the page with its `table_settings`.
+        The search runs once per settings - drawing the tables and extracting their text share it.
+        Changing the settings drops it; it's keyed by their hash as well, for lists modified in place.
+        
+        Edges derived from the page are kept as long as the strategies don't change, so that moving
+        explicit lines (e.g. drawing a table) only merges and intersects the edges again (see
+        `IncrementalTableFinder`). The finder comes from `table_finder_backend`.
+        """
+        settings_hash = table_settings_hash(self.table_settings)
+        table_finders = self.__dict__.setdefault('_table_finders', {})
+        if settings_hash not in table_finders:
+            settings = table.TableSettings.resolve(self.table_settings)
+            key = base_edges_key(settings)
+            base_edges = self.__dict__.setdefault('_base_edges', {})
+            
+            finder = table_finder_class(self.table_finder_backend)(self.page, settings, base_edges.get(key))
+            base_edges[key] = finder.base_edges
+            table_finders[settings_hash] = finder
+        return table_finders[settings_hash]
+    
+    def extract_tables(self) -> list[list[list[str | None]]]:
+        """Text of the tables of `table_finder`, as `page.Page.extract_tables` gives it."""
+        finder = self.table_finder
+        return [t.extract(**(finder.settings.text_settings or {})) for t in finder.tables]
+    
+    def release(self) -> None:
+        """Flush layout objects cached by the pdfplumber page. If the page can be re-created with
+        `page_loader`, the page object itself is dropped as well.
+        """
+        self.__dict__.pop('_spatial_index', None)
+        self.__dict__.pop('_table_finders', None)
+        self.__dict__.pop('_base_edges', None)
+        
+        _page = self.__dict__.get('_page')
+        if _page is not None:
+            _page.flush_cache()
+            _page.get_textmap.cache_clear()
+            
+            if self.page_loader is not None:
+                self.__dict__['_page'] = None
+        
+        resident_pages = self.__dict__.get('_resident_pages')
+        if resident_pages is not None:
+            resident_pages.discard(self)
     
+    
+# number of `PDFFileWrapper`s holding each source document
+_source_users: 'weakref.WeakKeyDictionary[pdfplumber.PDF, int]' = weakref.WeakKeyDictionary()
+_source_users_lock = threading.Lock()
+
+
+def _acquire_sources(sources: list[pdfplumber.PDF]) -> None:
+    with _source_users_lock:
+        for pdf in sources:
+            _source_users[pdf] = _source_users.get(pdf, 0) + 1
+
+
+def _release_sources(sources: list[pdfplumber.PDF]) -> None:
+    """Close the documents no file holds anymore."""
+    with _source_users_lock:
+        unused = []
+        for pdf in sources:
+            _source_users[pdf] = _source_users.get(pdf, 1) - 1
+            if _source_users[pdf] <= 0:
+                del _source_users[pdf]
+                unused.append(pdf)
+    for pdf in unused:
+        pdf.close()
+
+
 @dataclass
 class PDFFileWrapper:
+    """
+        - pages: `list[PDFPageWrapper]`
+        - image: `ImageWrapper | None`
+        - max_resident_pages: `int | None` - number of pages kept parsed; the least recently
+        accessed ones are released beyond that. No limit if None
+        - sources: `list[pdfplumber.PDF]` - documents the pages come from; they can be shared
+        with other files (e.g. pages added from another file), so `close()` closes only those no
+        other open file holds
+        
+    Example:
+        ```
+        with PDFReader.open(filepath) as pdf_file:
+            text = pdf_file.pages[0].page.extract_text()
+        ```
+    """
     pages: list[PDFPageWrapper]
     image: ImageWrapper | None = field(default=None)
+    max_resident_pages: int | None = field(default=DEFAULT_MAX_RESIDENT_PAGES, kw_only=True)
+    sources: list[pdfplumber.PDF] = field(default_factory=lambda: [], kw_only=True, repr=False, compare=False)
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name == 'sources':
+            old = self.__dict__.get('sources', [])
+            _acquire_sources([pdf for pdf in value if pdf not in old])
+            super().__setattr__(name, value)
+            _release_sources([pdf for pdf in old if pdf not in value])
+            return
+        
+        super().__setattr__(name, value)
+        
+        if name == 'max_resident_pages':
+            super().__setattr__('resident_pages', ResidentPages(value))
+            
+        if name in ['pages', 'max_resident_pages'] and 'pages' in self.__dict__ and 'resident_pages' in self.__dict__:
+            # pages can be replaced or come from another file - let them report to this file
+            for p in self.pages:
+                p.__dict__['_resident_pages'] = self.resident_pages
+                
+    def __enter__(self) -> 'PDFFileWrapper':
+        return self
+    
+    def __exit__(self, *args) -> None:
+        self.close()
+        
+    def close(self) -> None:
+        """Release all pages and close the source documents no other file holds. Pages that are
+        not loaded cannot be accessed afterwards.
+        """
+        for p in self.pages:
+            p.release()
+        
+        self.sources = []
 
     def to_dict(self) -> dict:
         return {
@@ -0,0 +1,118 @@
+from bisect import bisect_left, bisect_right
+import math
+from typing import Any, Callable
+
+# (x0, top, x1, bottom) in PDF points, as pdfplumber has it
+T_bbox = tuple[float, float, float, float]
+T_obj = dict[str, Any]
+
+DEFAULT_BAND_HEIGHT = 8
+
+
+class BandedIndex:
+    """Objects bucketed into horizontal bands by their `top` and sorted by `x0` within a band.
+    A region query visits only the bands the region spans and bisects each of them on `x0`.
+    """
+    band_height: float
+    max_width: float
+    max_height: float
+
+    def __init__(self, objects: list[T_obj], band_height: float = DEFAULT_BAND_HEIGHT) -> None:
+        self.band_height = band_height
+        self.max_width = max((o['x1'] - o['x0'] for o in objects), default=0)
+        self.max_height = max((o['bottom'] - o['top'] for o in objects), default=0)
+
+        bands: dict[int, list[tuple[float, int, T_obj]]] = {}
+        for i, o in enumerate(objects):
+            bands.setdefault(math.floor(o['top'] / band_height), []).append((o['x0'], i, o))
+
+        # band -> (x0 of objects, (position in the input, object))
+        self._bands: dict[int, tuple[list[float], list[tuple[int, T_obj]]]] = {}
+        for band, items in bands.items():
+            items.sort(key=lambda item: (item[0], item[1]))
+            self._bands[band] = ([item[0] for item in items], [(item[1], item[2]) for item in items])
+
+    def query(self, bbox: T_bbox, *, strict: bool = True) -> list[T_obj]:
+        """Objects lying within the bbox entirely (`strict`) or with their centre inside it,
+        in the order they were given.
+        """
+        x0, top, x1, bottom = bbox
+
+        if strict:
+            x0_range, top_range = (x0, x1), (top, bottom)
+        else:
+            x0_range, top_range = (x0 - self.max_width, x1), (top - self.max_height, bottom)
+
+        found = []
+        for band in range(math.floor(top_range[0] / self.band_height), math.floor(top_range[1] / self.band_height) + 1):
+            if band not in self._bands:
+                continue
+
+            x0s, items = self._bands[band]
+            for i, o in items[bisect_left(x0s, x0_range[0]):bisect_right(x0s, x0_range[1])]:
+                if strict:
+                    inside = x0 <= o['x0'] and o['x1'] <= x1 and top <= o['top'] and o['bottom'] <= bottom
+                else:
+                    inside = x0 <= (o['x0'] + o['x1']) / 2 <= x1 and top <= (o['top'] + o['bottom']) / 2 <= bottom
+                if inside:
+                    found.append((i, o))
+
+        found.sort(key=lambda item: item[0])
+        return [o for _, o in found]
+
+
+class PageSpatialIndex:
+    """Region queries over characters and words of a page. The character index is built upfront,
+    the word one on the first word query (words are extracted with `words_factory`).
+
+    Example:
+        ```
+        index = PageSpatialIndex(_page.chars, _page.extract_words)
+        index.words_in_bbox((50, 100, 300, 120))
+        ```
+    """
+    chars: BandedIndex
+    words_factory: Callable[[], list[T_obj]]
+
+    def __init__(self, chars: list[T_obj], words_factory: Callable[[], list[T_obj]], band_height: float = DEFAULT_BAND_HEIGHT) -> None:
+        self.chars = BandedIndex(chars, band_height)
+        self.words_factory = words_factory
+        self._band_height = band_height
+        self._words: BandedIndex | None = None
+
+    @property
+    def words(self) -> BandedIndex:
+        if self._words is None:
+            self._words = BandedIndex(self.words_factory(), self._band_height)
+        return self._words
+
+    def chars_in_bbox(self, bbox: T_bbox, *, strict: bool = True) -> list[T_obj]:
+        return self.chars.query(bbox, strict=strict)
+
+    def words_in_bbox(self, bbox: T_bbox, *, strict: bool = True) -> list[T_obj]:
+        return self.words.query(bbox, strict=strict)
+
+    def text_in_bbox(self, bbox: T_bbox, *, strict: bool = False) -> str:
+        return ' '.join(w['text'] for w in self.words_in_bbox(bbox, strict=strict))
+
+    def _projection(self, bbox: T_bbox, axis: int) -> list[int]:
+        lo, hi = bbox[axis], bbox[axis + 2]
+        o_lo, o_hi = ('x0', 'x1') if axis == 0 else ('top', 'bottom')
+
+        counts = [0] * max(math.ceil(hi - lo), 0)
+        for c in self.chars_in_bbox(bbox, strict=False):
+            for i in range(max(math.floor(c[o_lo] - lo), 0), min(math.ceil(c[o_hi] - lo), len(counts))):
+                counts[i] += 1
+        return counts
+
+    def row_projection(self, bbox: T_bbox) -> list[int]:
+        """Number of characters (centred within the bbox) covering each 1pt row of the bbox.
+        Rows with 0 are gaps between lines of text.
+        """
+        return self._projection(bbox, 1)
+
+    def column_projection(self, bbox: T_bbox) -> list[int]:
+        """Number of characters (centred within the bbox) covering each 1pt column of the bbox.
+        Columns with 0 are gaps between columns of text.
+        """
+        return self._projection(bbox, 0)
@@ -0,0 +1,124 @@
+import logging
+import os
+from pathlib import Path
+import tempfile
+import threading
+
+from budgeting_app.utils.logging import CustomLoggerAdapter
+
+
+class DiskLRUCache:
+    """Directory of files, one per key, bounded by their total size. Modification time of a file
+    serves as its 'last used' time - it's bumped on every hit - and the least recently used files
+    are removed first once `max_bytes` is exceeded.
+    """
+    directory: Path
+    max_bytes: int
+    suffix: str
+    logger: logging.LoggerAdapter
+
+    def __init__(self, directory: Path | str, max_bytes: int, suffix: str = '.bin') -> None:
+        self.logger = CustomLoggerAdapter.getLogger('pdf_table_reader', className='DiskLRUCache')
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        self._total_bytes: int | None = None
+
+    def path(self, key: str) -> Path:
+        return self.directory / f'{key}{self.suffix}'
+
+    def _entries(self) -> list[Path]:
+        if not self.directory.is_dir():
+            return []
+        return [p for p in self.directory.iterdir() if p.suffix == self.suffix and p.is_file()]
+
+    @property
+    def total_bytes(self) -> int:
+        if self._total_bytes is None:
+            self._total_bytes = sum(p.stat().st_size for p in self._entries())
+        return self._total_bytes
+
+    def get(self, key: str) -> bytes | None:
+        path = self.path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        self.touch(key)
+        return data
+
+    def touch(self, key: str) -> None:
+        """Mark the entry as recently used."""
+        try:
+            os.utime(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def put(self, key: str, data: bytes) -> Path:
+        """Write the entry atomically and evict old entries if needed."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path(key)
+
+        with self._lock:
+            old_size = path.stat().st_size if path.exists() else 0
+            total_bytes = self.total_bytes
+
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+            self._total_bytes = total_bytes - old_size + len(data)
+            self._evict()
+
+        return path
+
+    def _evict(self) -> None:
+        if self.total_bytes <= self.max_bytes:
+            return
+
+        entries = []
+        for p in self._entries():
+            try:
+                stat = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, p))
+
+        # oldest first
+        entries.sort(key=lambda e: e[0])
+
+        total = sum(e[1] for e in entries)
+        evicted = 0
+        for _, size, p in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                p.unlink(missing_ok=True)
+            except PermissionError:
+                # still memory-mapped (Windows), removed on one of the next evictions
+                continue
+            total -= size
+            evicted += 1
+
+        self._total_bytes = total
+        self.logger.debug(f'Evicted {evicted} entries from {self.directory}, {total} bytes left.')
+
+    def invalidate(self, prefix: str | None = None) -> int:
+        """Remove entries whose key starts with `prefix` or all entries if it is not given.
+
+        Returns:
+            int: number of removed entries
+        """
+        removed = 0
+        with self._lock:
+            for p in self._entries():
+                if prefix is None or p.name.startswith(prefix):
+                    p.unlink(missing_ok=True)
+                    removed += 1
+            self._total_bytes = None
+        return removed
+
+    def clear(self) -> int:
+        return self.invalidate()
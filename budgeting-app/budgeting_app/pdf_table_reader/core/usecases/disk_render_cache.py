@@ -0,0 +1,148 @@
+import logging
+import mmap
+import os
+from pathlib import Path
+import struct
+from typing import Any
+
+import pdfplumber
+import pypdfium2
+
+from budgeting_app.utils.defaults import DEFAULT_CACHE_DIR
+from budgeting_app.pdf_table_reader.core.entities.models import RawImage, RAW_IMAGE_FORMAT
+from budgeting_app.pdf_table_reader.core.usecases.disk_cache import DiskLRUCache
+from budgeting_app.pdf_table_reader.core.usecases.render_cache import table_settings_hash
+from budgeting_app.utils.logging import CustomLoggerAdapter
+
+
+DEFAULT_RENDER_CACHE_DIR = DEFAULT_CACHE_DIR / 'renders'
+DEFAULT_DISK_RENDER_CACHE_SIZE = 512 * 1024 ** 2
+
+# magic, format version, width, height, stride, PIL mode; padded so that the pixels are aligned
+RAW_HEADER = struct.Struct('<4sHIII8s')
+RAW_HEADER_SIZE = 32
+RAW_MAGIC = b'BRAW'
+RAW_FORMAT_VERSION = 1
+
+# a mapped file can't be deleted on Windows (until the mapping is garbage collected), which would
+# keep the cache from evicting it - the file is read there instead
+MAP_RAW_IMAGES = os.name != 'nt'
+
+
+def encode_raw_image(image: RawImage) -> bytes:
+    header = RAW_HEADER.pack(RAW_MAGIC, RAW_FORMAT_VERSION, *image.size, image.stride, image.mode.encode())
+    return header.ljust(RAW_HEADER_SIZE, b'\0') + bytes(image.data)
+
+
+def map_raw_image(path: Path, *, copy: bool | None = None) -> RawImage | None:
+    """Map the file written by `encode_raw_image` into memory (or read it, see `MAP_RAW_IMAGES`).
+    Mapped pixels are not read - `data` is a view of the mapping, paged in as it's accessed (e.g.
+    once Qt draws the image).
+
+    Args:
+        - path (Path): file to load
+        - copy (bool | None, optional): Read the file instead of mapping it. Defaults to None, i.e.
+        unless `MAP_RAW_IMAGES`.
+
+    Returns:
+        RawImage | None: None if the file is not a raw image (of this format version)
+    """
+    if copy is None:
+        copy = not MAP_RAW_IMAGES
+
+    with open(path, 'rb') as f:
+        buffer = f.read() if copy else mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    image = None
+    try:
+        if len(buffer) < RAW_HEADER_SIZE:
+            return None
+
+        magic, version, width, height, stride, mode = RAW_HEADER.unpack_from(buffer)
+        if magic != RAW_MAGIC or version != RAW_FORMAT_VERSION or len(buffer) != RAW_HEADER_SIZE + stride * height:
+            return None
+
+        # the view keeps the mapping open as long as the image is around
+        image = RawImage(
+            data=memoryview(buffer)[RAW_HEADER_SIZE:],
+            size=(width, height),
+            stride=stride,
+            mode=mode.rstrip(b'\0').decode()
+        )
+        return image
+    finally:
+        if image is None and not copy:
+            buffer.close()
+
+
+class DiskRenderCache:
+    """Persistent cache of rendered page images kept under the profile directory, so that pages
+    of a file opened again are not rendered from scratch. Entries are keyed by SHA-256 of the file,
+    page index, resolution, antialiasing, format and table settings hash (see `table_settings_hash`);
+    the cache is bounded by size with the least recently used entries evicted first.
+
+    Raw images (`RAW_IMAGE_FORMAT`) are stored as they are and memory-mapped when loaded, encoded
+    ones (PNG...) as the encoded bytes.
+
+    Example:
+        ```
+        cache = DiskRenderCache()
+        workspace = TableDetectorWorkspace(pdf_file, disk_render_cache=cache)
+        ...
+        cache.invalidate(file_sha=file_sha)
+        ```
+    """
+    disk_cache: DiskLRUCache
+    logger: logging.LoggerAdapter
+
+    def __init__(self, directory: Path | str = DEFAULT_RENDER_CACHE_DIR, max_bytes: int = DEFAULT_DISK_RENDER_CACHE_SIZE) -> None:
+        self.logger = CustomLoggerAdapter.getLogger('pdf_table_reader', className='DiskRenderCache')
+        self.disk_cache = DiskLRUCache(directory, max_bytes, suffix='.raster')
+
+    @classmethod
+    def key(
+        cls,
+        file_sha: str,
+        page_index: int,
+        resolution: int,
+        antialias: bool,
+        _format: str,
+        table_settings: dict[str, Any] | None
+    ) -> str:
+        """`table_settings` are None for a bare page raster (no tables drawn). Versions of the
+        renderers are part of the key as the images may differ between them.
+        """
+        settings_hash = 'bare' if table_settings is None else table_settings_hash(table_settings)
+        return f'{file_sha}_{page_index}_{resolution}_{int(antialias)}_{_format.upper()}_{settings_hash}_' \
+            f'{pdfplumber.__version__}_{pypdfium2.version.PDFIUM_INFO}'
+
+    def load(self, key: str, _format: str) -> bytes | RawImage | None:
+        path = self.disk_cache.path(key)
+        try:
+            if _format.upper() == RAW_IMAGE_FORMAT:
+                image = map_raw_image(path)
+            else:
+                image = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, struct.error) as e:
+            self.logger.warning(f'Could not load cached image {path.name} ({e}).')
+            return None
+
+        if image is not None:
+            self.disk_cache.touch(key)
+        return image
+
+    def store(self, key: str, image: bytes | RawImage) -> None:
+        self.disk_cache.put(key, encode_raw_image(image) if isinstance(image, RawImage) else image)
+
+    def invalidate(self, *, file_sha: str | None = None) -> int:
+        """Remove cached images of the given file (by SHA-256) or all images if it is not given.
+
+        Returns:
+            int: number of removed entries
+        """
+        return self.disk_cache.invalidate(None if file_sha is None else f'{file_sha}_')
+
+    def clear(self) -> int:
+        return self.disk_cache.clear()
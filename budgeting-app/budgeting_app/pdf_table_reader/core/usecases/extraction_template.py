@@ -0,0 +1,323 @@
+from dataclasses import asdict, dataclass, field
+import json
+import logging
+import os
+from pathlib import Path
+import re
+import tempfile
+from typing import Any
+
+from budgeting_app.utils.defaults import DEFAULT_PROFILE_DIR
+from budgeting_app.utils.logging import CustomLoggerAdapter
+from budgeting_app.utils.types import T_pdf_file_path
+from budgeting_app.pdf_table_reader.core.entities.models import (
+    ExplicitLineData,
+    ExplicitTableData,
+    PDFFileWrapper,
+    PDFPageWrapper
+)
+from budgeting_app.pdf_table_reader.core.usecases.pdf_reader import PDFReader
+from budgeting_app.pdf_table_reader.core.usecases.table_detector_workspace import TableDetectorWorkspace
+
+
+DEFAULT_TEMPLATE_DIR = DEFAULT_PROFILE_DIR / 'templates'
+TEMPLATE_FORMAT_VERSION = 1
+
+# pages less similar to any page of a template (see `PDFReader.layout_similarity`) don't match it
+DEFAULT_MATCH_THRESHOLD = 0.4
+
+EXPLICIT_LINES_KEYS = {'vertical': 'explicit_vertical_lines', 'horizontal': 'explicit_horizontal_lines'}
+
+
+@dataclass
+class PageTemplate:
+    """Everything drawn and set on one page, with positions given as a fraction of the page's
+    width (vertical lines, x) or height (horizontal lines, y) from the page's origin - the top left
+    corner of its bbox, which is not (0, 0) on cropped pages.
+        - layout: `list[str]` - layout fingerprint of the page (see `PDFReader.layout_fingerprint`)
+        - table_settings: `dict[str, Any]` - settings of the page; explicit lines are normalised too
+        - explicit_lines: `list[tuple[float, str, bool]]` - value, orientation and whether the line
+        is part of a table
+        - explicit_tables: `list[dict[str, Any]]` - bbox, vlines and hlines of the drawn tables
+    """
+    layout: list[str]
+    table_settings: dict[str, Any]
+    explicit_lines: list[tuple[float, str, bool]] = field(default_factory=list)
+    explicit_tables: list[dict[str, Any]] = field(default_factory=list)
+
+    @classmethod
+    def from_page(cls, page_wrapper: PDFPageWrapper) -> 'PageTemplate':
+        width, height = page_wrapper.page.width, page_wrapper.page.height
+        x0, top = page_wrapper.page.bbox[:2]
+        size = {'vertical': width, 'horizontal': height}
+        origin = {'vertical': x0, 'horizontal': top}
+
+        table_settings = dict(page_wrapper.table_settings)
+        for orientation, key in EXPLICIT_LINES_KEYS.items():
+            table_settings[key] = [(v - origin[orientation]) / size[orientation] for v in table_settings.get(key, [])]
+
+        return cls(
+            layout=PDFReader.layout_fingerprint(page_wrapper),
+            table_settings=table_settings,
+            explicit_lines=[
+                ((line.value - origin[line.orientation]) / size[line.orientation], line.orientation, line.is_part_of_table)
+                for line in page_wrapper.explicit_lines
+            ],
+            explicit_tables=[
+                {
+                    'bbox': [(t.bbox[0] - x0) / width, (t.bbox[1] - top) / height, (t.bbox[2] - x0) / width, (t.bbox[3] - top) / height],
+                    'vlines': [(v - x0) / width for v in t.vlines],
+                    'hlines': [(h - top) / height for h in t.hlines]
+                }
+                for t in page_wrapper.explicit_tables
+            ]
+        )
+
+    def apply(self, page_wrapper: PDFPageWrapper) -> None:
+        """Set the settings, lines and tables on the page, scaled to its size and offset by its
+        origin. The page's own lines and tables are replaced.
+        """
+        width, height = page_wrapper.page.width, page_wrapper.page.height
+        x0, top = page_wrapper.page.bbox[:2]
+        size = {'vertical': width, 'horizontal': height}
+        origin = {'vertical': x0, 'horizontal': top}
+
+        explicit_lines = []
+        for value, orientation, is_part_of_table in self.explicit_lines:
+            explicit_lines.append(ExplicitLineData(value * size[orientation] + origin[orientation], orientation, is_part_of_table))
+        page_wrapper.explicit_lines = explicit_lines
+
+        page_wrapper.explicit_tables = [
+            ExplicitTableData(
+                bbox=(t['bbox'][0] * width + x0, t['bbox'][1] * height + top, t['bbox'][2] * width + x0, t['bbox'][3] * height + top),
+                vlines=[v * width + x0 for v in t['vlines']],
+                hlines=[h * height + top for h in t['hlines']]
+            )
+            for t in self.explicit_tables
+        ]
+
+        # key by key, so that observers of the settings are notified
+        ts = page_wrapper.table_settings
+        explicit_keys = {key: orientation for orientation, key in EXPLICIT_LINES_KEYS.items()}
+        for key, val in self.table_settings.items():
+            if key in explicit_keys:
+                val = [v * size[explicit_keys[key]] + origin[explicit_keys[key]] for v in val]
+            if ts.get(key) != val:
+                ts[key] = val
+
+
+@dataclass
+class ExtractionTemplate:
+    """Per-bank template - what has been drawn and set on pages of one statement, so that it can be
+    applied to statements of the same layout without redrawing tables and retuning the settings.
+    Each page of a new file gets the settings and lines of the most similar page of the template
+    (see `match_page`); pages not similar to any (e.g. summaries) are left out.
+
+    Example:
+        ```
+        template = ExtractionTemplate.from_workspace(workspace, 'natwest', ['date', 'description', 'paid_in', 'paid_out', 'balance_after_transaction'], [1])
+        TemplateLibrary().save(template)
+        ...
+        result = extract_with_template(filepath, library=TemplateLibrary())
+        ```
+
+        - name: `str` - name of the template, e.g. of the bank
+        - column_schema: `list[str]` - names of the tables' columns (see `RawDataConverter`)
+        - pages: `list[PageTemplate]` - pages the template has been made of
+    """
+    name: str
+    column_schema: list[str]
+    pages: list[PageTemplate] = field(default_factory=list)
+
+    @classmethod
+    def from_workspace(
+        cls,
+        workspace: TableDetectorWorkspace,
+        name: str,
+        column_schema: list[str],
+        page_numbers: list[int] | None = None
+    ) -> 'ExtractionTemplate':
+        """Make a template of the given pages of the workspace (all pages if not given)."""
+        if page_numbers is None:
+            page_numbers = [*range(len(workspace.pdf_file.pages))]
+
+        with workspace.pages_lock:
+            pages = [PageTemplate.from_page(workspace.pdf_file.pages[i]) for i in page_numbers]
+        return cls(name=name, column_schema=list(column_schema), pages=pages)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {'version': TEMPLATE_FORMAT_VERSION, **asdict(self)}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> 'ExtractionTemplate':
+        if data.get('version') != TEMPLATE_FORMAT_VERSION:
+            raise ValueError(f'Unknown template format version {data.get("version")}.')
+        return cls(
+            name=data['name'],
+            column_schema=data['column_schema'],
+            pages=[
+                PageTemplate(
+                    layout=p['layout'],
+                    table_settings=p['table_settings'],
+                    explicit_lines=[tuple(line) for line in p['explicit_lines']],
+                    explicit_tables=p['explicit_tables']
+                )
+                for p in data['pages']
+            ]
+        )
+
+    def match_page(self, page_wrapper: PDFPageWrapper, threshold: float = DEFAULT_MATCH_THRESHOLD) -> tuple[PageTemplate | None, float]:
+        """The page of the template most similar to the given one and their similarity; None if
+        it's below the threshold.
+        """
+        layout = PDFReader.layout_fingerprint(page_wrapper)
+        best, best_similarity = None, 0.0
+        for page_template in self.pages:
+            similarity = PDFReader.layout_similarity(layout, page_template.layout)
+            if similarity > best_similarity:
+                best, best_similarity = page_template, similarity
+        return (best, best_similarity) if best_similarity >= threshold else (None, best_similarity)
+
+    def apply(
+        self,
+        workspace: TableDetectorWorkspace,
+        page_numbers: list[int] | None = None,
+        threshold: float = DEFAULT_MATCH_THRESHOLD
+    ) -> list[int]:
+        """Apply the template to the pages of the workspace that match it. Nothing is rendered.
+
+        Returns:
+            list[int]: indices of the pages the template has been applied to
+        """
+        if page_numbers is None:
+            page_numbers = [*range(len(workspace.pdf_file.pages))]
+
+        applied = []
+        with workspace.pages_lock:
+            for i in page_numbers:
+                page_wrapper = workspace.pdf_file.pages[i]
+                page_template, _ = self.match_page(page_wrapper, threshold)
+                if page_template is not None:
+                    page_template.apply(page_wrapper)
+                    applied.append(i)
+        return applied
+
+
+class TemplateLibrary:
+    """Templates saved under the profile directory, one JSON file per template. Picks the template
+    matching a file by the layout of its pages (see `find`).
+    """
+    directory: Path
+    logger: logging.LoggerAdapter
+
+    def __init__(self, directory: Path | str = DEFAULT_TEMPLATE_DIR) -> None:
+        self.logger = CustomLoggerAdapter.getLogger('pdf_table_reader', className='TemplateLibrary')
+        self.directory = Path(directory)
+
+    def path(self, name: str) -> Path:
+        return self.directory / (re.sub(r'[^\w-]+', '_', name) + '.json')
+
+    def save(self, template: ExtractionTemplate) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(template.to_dict(), f)
+        path = self.path(template.name)
+        os.replace(tmp_path, path)
+        return path
+
+    def load(self, name: str) -> ExtractionTemplate:
+        with open(self.path(name)) as f:
+            return ExtractionTemplate.from_dict(json.load(f))
+
+    def templates(self) -> list[ExtractionTemplate]:
+        templates = []
+        for path in sorted(self.directory.glob('*.json')):
+            try:
+                with open(path) as f:
+                    templates.append(ExtractionTemplate.from_dict(json.load(f)))
+            except (OSError, ValueError, KeyError) as e:
+                self.logger.warning(f'Ignoring template {path.name} ({e}).')
+        return templates
+
+    def remove(self, name: str) -> None:
+        self.path(name).unlink(missing_ok=True)
+
+    def find(self, pdf_file: PDFFileWrapper, threshold: float = DEFAULT_MATCH_THRESHOLD) -> ExtractionTemplate | None:
+        """The template matching the most pages of the file (the most similar one on a tie)."""
+        layouts = [PDFReader.layout_fingerprint(p) for p in pdf_file.pages]
+
+        best, best_key = None, (0, 0.0)
+        for template in self.templates():
+            similarities = [
+                max((PDFReader.layout_similarity(layout, p.layout) for p in template.pages), default=0.0)
+                for layout in layouts
+            ]
+            matched = [s for s in similarities if s >= threshold]
+            key = (len(matched), sum(matched))
+            if key > best_key:
+                best, best_key = template, key
+
+        self.logger.debug(f'Template matching the file: {None if best is None else best.name}.')
+        return best
+
+
+@dataclass
+class TemplateExtractionResult:
+    """
+        - template: `ExtractionTemplate | None` - template applied; None if none matched the file
+        - page_indices: `list[int]` - pages the template has been applied to
+        - tables: `list[list[list[str | None]]]` - tables found on those pages
+    """
+    template: ExtractionTemplate | None
+    page_indices: list[int] = field(default_factory=list)
+    tables: list[list[list[str | None]]] = field(default_factory=list)
+
+
+def extract_with_template(
+    filepath: T_pdf_file_path,
+    template: ExtractionTemplate | None = None,
+    *,
+    library: TemplateLibrary | None = None,
+    password: str | None = None,
+    workers: int | None = None,
+    threshold: float = DEFAULT_MATCH_THRESHOLD
+) -> TemplateExtractionResult:
+    """Extract tables from the file with the given template or one found in the library, without
+    the GUI and without rendering any page. Pages matching the template are extracted together,
+    in `workers` processes if given (see `TableDetectorWorkspace.get_tables_text`).
+
+    Args:
+        - filepath (T_pdf_file_path): path to the PDF file
+        - template (ExtractionTemplate | None, optional): template to apply. Defaults to None.
+        - library (TemplateLibrary | None, optional): templates to pick from (see
+        `TemplateLibrary.find`) if `template` is not given. Defaults to None.
+        - password (str | None, optional): Defaults to None.
+        - workers (int | None, optional): see `TableDetectorWorkspace.get_tables_text`. Defaults to None.
+        - threshold (float, optional): see `ExtractionTemplate.match_page`. Defaults to DEFAULT_MATCH_THRESHOLD.
+
+    Returns:
+        TemplateExtractionResult: the template, pages it matched and their tables
+    """
+    if template is None and library is None:
+        raise ValueError('Either template or library have to be given.')
+
+    pdf_file = PDFReader.open(filepath, password)
+    if pdf_file is None:
+        raise ValueError(f'Could not open {filepath}.')
+
+    workspace = TableDetectorWorkspace(pdf_file)
+    try:
+        if template is None:
+            template = library.find(pdf_file, threshold)
+            if template is None:
+                return TemplateExtractionResult(template=None)
+
+        page_indices = template.apply(workspace, threshold=threshold)
+        return TemplateExtractionResult(
+            template=template,
+            page_indices=page_indices,
+            tables=workspace.get_tables_text(page_indices, workers=workers)
+        )
+    finally:
+        workspace.close()
@@ -0,0 +1,104 @@
+import json
+import logging
+import os
+from pathlib import Path
+import tempfile
+import threading
+
+from budgeting_app.utils.defaults import DEFAULT_PROFILE_DIR
+from budgeting_app.utils.logging import CustomLoggerAdapter
+from budgeting_app.pdf_table_reader.core.entities.models import PDFFileWrapper
+from budgeting_app.pdf_table_reader.core.usecases.pdf_reader import PDFReader
+
+
+DEFAULT_FINGERPRINT_DIR = DEFAULT_PROFILE_DIR / 'fingerprints'
+FINGERPRINT_INDEX_FORMAT_VERSION = 1
+
+
+class PageFingerprintIndex:
+    """Persistent index of fingerprints (see `PDFReader.fingerprint`) of pages already imported, one
+    JSON file per account under the profile directory.
+
+    Example:
+        ```
+        index = PageFingerprintIndex()
+        pdf_file = PDFReader.open(filepath)
+        skipped = index.skip_imported(pdf_file, account_uuid)
+        ... # detect tables and import transactions
+        index.mark_imported(pdf_file, account_uuid)
+        ```
+    """
+    directory: Path
+    logger: logging.LoggerAdapter
+
+    def __init__(self, directory: Path | str = DEFAULT_FINGERPRINT_DIR) -> None:
+        self.logger = CustomLoggerAdapter.getLogger('pdf_table_reader', className='PageFingerprintIndex')
+        self.directory = Path(directory)
+        self._fingerprints: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def path(self, account_uuid: str) -> Path:
+        return self.directory / f'{account_uuid}.json'
+
+    def load(self, account_uuid: str) -> set[str]:
+        if account_uuid not in self._fingerprints:
+            fingerprints = set()
+            try:
+                with open(self.path(account_uuid)) as f:
+                    data = json.load(f)
+                if data.get('version') == FINGERPRINT_INDEX_FORMAT_VERSION:
+                    fingerprints = set(data['fingerprints'])
+                else:
+                    self.logger.warning(f'Ignoring index of {account_uuid} in unknown format.')
+            except FileNotFoundError:
+                pass
+            self._fingerprints[account_uuid] = fingerprints
+        return self._fingerprints[account_uuid]
+
+    def _save(self, account_uuid: str) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump({
+                'version': FINGERPRINT_INDEX_FORMAT_VERSION,
+                'fingerprints': sorted(self._fingerprints[account_uuid])
+            }, f)
+        os.replace(tmp_path, self.path(account_uuid))
+
+    def contains(self, account_uuid: str, fingerprint: str) -> bool:
+        return fingerprint in self.load(account_uuid)
+
+    def add(self, account_uuid: str, fingerprints: list[str]) -> None:
+        with self._lock:
+            self.load(account_uuid).update(fingerprints)
+            self._save(account_uuid)
+
+    def skip_imported(self, pdf_file: PDFFileWrapper, account_uuid: str) -> int:
+        """Remove pages that have been imported to the account already, as well as repeated pages
+        of the file itself, from `pdf_file.pages`.
+
+        Returns:
+            int: number of skipped pages
+        """
+        imported = self.load(account_uuid)
+        seen = set()
+        pages = []
+        for p in pdf_file.pages:
+            fingerprint = PDFReader.fingerprint(p)
+            if fingerprint not in imported and fingerprint not in seen:
+                pages.append(p)
+            seen.add(fingerprint)
+
+        skipped = len(pdf_file.pages) - len(pages)
+        if skipped:
+            pdf_file.pages = pages
+        self.logger.info(f'Skipped {skipped} of {skipped + len(pages)} pages imported to {account_uuid} already.')
+        return skipped
+
+    def mark_imported(self, pdf_file: PDFFileWrapper, account_uuid: str) -> None:
+        self.add(account_uuid, [PDFReader.fingerprint(p) for p in pdf_file.pages])
+
+    def clear(self, account_uuid: str) -> None:
+        with self._lock:
+            self._fingerprints.pop(account_uuid, None)
+            self.path(account_uuid).unlink(missing_ok=True)
@@ -0,0 +1,229 @@
+from array import array
+import hashlib
+import logging
+import json
+from pathlib import Path
+import struct
+from typing import Any
+import zlib
+
+import pdfplumber
+from pdfplumber import page
+
+from budgeting_app.utils.defaults import DEFAULT_CACHE_DIR
+from budgeting_app.utils.types import T_pdf_file_path
+from budgeting_app.utils.logging import CustomLoggerAdapter
+from budgeting_app.pdf_table_reader.core.usecases.disk_cache import DiskLRUCache
+
+
+DEFAULT_LAYOUT_CACHE_DIR = DEFAULT_CACHE_DIR / 'layouts'
+DEFAULT_LAYOUT_CACHE_SIZE = 256 * 1024 ** 2
+LAYOUT_CACHE_FORMAT_VERSION = 2
+# length of the JSON header preceding the array bytes of an entry
+HEADER_SIZE = struct.Struct('<I')
+
+# values that refer to the open document (e.g. image streams) - stored as None
+UNCACHED_KEYS = ['stream']
+
+
+def file_sha256(filepath: T_pdf_file_path | Path) -> str:
+    sha = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 ** 2), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class _Unencodable(TypeError):
+    pass
+
+
+def _to_json(value: Any) -> Any:
+    """Value as JSON holds it - tuples are tagged, so that they come back as tuples."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, tuple):
+        return {'t': [_to_json(v) for v in value]}
+    if isinstance(value, list):
+        return [_to_json(v) for v in value]
+    raise _Unencodable(type(value).__name__)
+
+
+def _from_json(value: Any) -> Any:
+    if isinstance(value, dict):
+        return tuple(_from_json(v) for v in value['t'])
+    if isinstance(value, list):
+        return [_from_json(v) for v in value]
+    return value
+
+
+def _encode_column(values: list[Any], blob: bytearray) -> list[Any]:
+    """Pick the most compact representation of the column. Numbers go into typed arrays (appended
+    to `blob`, their offset and length are returned), strings are interned (table of unique values +
+    array of indices) and anything else is stored as JSON. Values JSON can't hold (e.g. colour
+    spaces given as PDF names) are stored as None.
+
+    Returns:
+        list[Any]: kind of the column followed by its data, JSON-serialisable
+    """
+    def put(data: bytes) -> list[int]:
+        blob.extend(data)
+        return [len(blob) - len(data), len(data)]
+
+    types = set(type(v) for v in values)
+
+    if types == {float}:
+        return ['f', put(array('d', values).tobytes())]
+    if types == {int} and all(-2 ** 63 <= v < 2 ** 63 for v in values):
+        return ['i', put(array('q', values).tobytes())]
+    if types == {bool}:
+        return ['b', put(bytes(values))]
+    if types <= {str, type(None)}:
+        table = list(dict.fromkeys(values))
+        lookup = {v: i for i, v in enumerate(table)}
+        return ['s', table, put(array('I', [lookup[v] for v in values]).tobytes())]
+
+    encoded = []
+    for v in values:
+        try:
+            encoded.append(_to_json(v))
+        except _Unencodable:
+            encoded.append(None)
+    return ['o', encoded]
+
+
+def _decode_column(column: list[Any], blob: bytes) -> list[Any]:
+    def get(offset_length: list[int]) -> bytes:
+        offset, length = offset_length
+        return blob[offset:offset + length]
+
+    kind = column[0]
+    if kind == 'f':
+        return array('d', get(column[1])).tolist()
+    if kind == 'i':
+        return array('q', get(column[1])).tolist()
+    if kind == 'b':
+        return [bool(v) for v in get(column[1])]
+    if kind == 's':
+        table = column[1]
+        return [table[i] for i in array('I', get(column[2]))]
+    if kind == 'o':
+        return [_from_json(v) for v in column[1]]
+    raise ValueError(f'Unknown column kind {kind!r}.')
+
+
+def encode_objects(objects: dict[str, list[dict[str, Any]]]) -> bytes:
+    """Serialise `page.Page.objects` column by column. Objects of one type are grouped by their
+    keys, so that each group forms a table; positions of group members are kept to restore
+    the original order.
+
+    The entry is a JSON header (keys and column descriptions) followed by the bytes of the typed
+    arrays - nothing in it is executed on load, unlike a pickle.
+    """
+    blob = bytearray()
+    encoded = {}
+    for object_type, objs in objects.items():
+        groups: dict[tuple[str, ...], list[int]] = {}
+        for i, obj in enumerate(objs):
+            groups.setdefault(tuple(obj.keys()), []).append(i)
+
+        encoded[object_type] = []
+        for keys, positions in groups.items():
+            columns = []
+            for key in keys:
+                values = [None if key in UNCACHED_KEYS else objs[i][key] for i in positions]
+                columns.append(_encode_column(values, blob))
+            encoded[object_type].append([list(keys), _encode_column(positions, blob), columns])
+
+    header = json.dumps({'version': LAYOUT_CACHE_FORMAT_VERSION, 'objects': encoded}).encode()
+    return zlib.compress(HEADER_SIZE.pack(len(header)) + header + blob, 1)
+
+
+def decode_objects(data: bytes) -> dict[str, list[dict[str, Any]]] | None:
+    data = zlib.decompress(data)
+    (header_size,) = HEADER_SIZE.unpack_from(data)
+    payload = json.loads(data[HEADER_SIZE.size:HEADER_SIZE.size + header_size])
+    if payload.get('version') != LAYOUT_CACHE_FORMAT_VERSION:
+        return None
+    blob = data[HEADER_SIZE.size + header_size:]
+
+    objects = {}
+    for object_type, groups in payload['objects'].items():
+        groups = [(keys, _decode_column(positions, blob), columns) for keys, positions, columns in groups]
+        objs: list[dict[str, Any] | None] = [None] * sum(len(positions) for _, positions, _ in groups)
+        for keys, positions, columns in groups:
+            decoded = [_decode_column(column, blob) for column in columns]
+            for row, i in enumerate(positions):
+                objs[i] = {k: decoded[c][row] for c, k in enumerate(keys)}
+        objects[object_type] = objs
+    return objects
+
+
+class PageLayoutCache:
+    """Persistent cache of parsed page layout objects (`page.Page.objects` - chars, lines, rects...)
+    kept under the profile directory. Entries are keyed by SHA-256 of the file, page index and
+    pdfplumber version; the cache is bounded by size with the least recently used entries evicted
+    first.
+
+    Example:
+        ```
+        cache = PageLayoutCache()
+        pdf_file = PDFReader.open(filepath, layout_cache=cache)
+        ...
+        cache.invalidate(filepath)
+        ```
+    """
+    disk_cache: DiskLRUCache
+    logger: logging.LoggerAdapter
+
+    def __init__(self, directory: Path | str = DEFAULT_LAYOUT_CACHE_DIR, max_bytes: int = DEFAULT_LAYOUT_CACHE_SIZE) -> None:
+        self.logger = CustomLoggerAdapter.getLogger('pdf_table_reader', className='PageLayoutCache')
+        self.disk_cache = DiskLRUCache(directory, max_bytes, suffix='.layout')
+
+    @classmethod
+    def key(cls, file_sha: str, page_index: int) -> str:
+        return f'{file_sha}_{page_index}_{pdfplumber.__version__}'
+
+    def load(self, file_sha: str, page_index: int) -> dict[str, list[dict[str, Any]]] | None:
+        data = self.disk_cache.get(self.key(file_sha, page_index))
+        if data is None:
+            return None
+        try:
+            return decode_objects(data)
+        except Exception as e:
+            self.logger.warning(f'Could not decode cached layout of page {page_index} ({e}).')
+            return None
+
+    def store(self, file_sha: str, page_index: int, objects: dict[str, list[dict[str, Any]]]) -> None:
+        self.disk_cache.put(self.key(file_sha, page_index), encode_objects(objects))
+
+    def hydrate(self, _page: page.Page, file_sha: str, page_index: int) -> bool:
+        """Set the page's objects from the cache or, on a miss, parse the page and cache them.
+
+        Returns:
+            bool: True if the objects came from the cache
+        """
+        objects = self.load(file_sha, page_index)
+
+        if objects is not None:
+            self.logger.debug(f'Cache hit for page {page_index} of {file_sha[:12]}.')
+            _page._objects = objects
+            return True
+
+        self.logger.debug(f'Cache miss for page {page_index} of {file_sha[:12]}.')
+        self.store(file_sha, page_index, _page.objects)
+        return False
+
+    def invalidate(self, filepath: T_pdf_file_path | Path | None = None, *, file_sha: str | None = None) -> int:
+        """Remove cached pages of the given file (by path or SHA-256) or all pages if neither is given.
+
+        Returns:
+            int: number of removed entries
+        """
+        if filepath is not None:
+            file_sha = file_sha256(filepath)
+
+        return self.disk_cache.invalidate(None if file_sha is None else f'{file_sha}_')
+
+    def clear(self) -> int:
+        return self.disk_cache.clear()
@@ -0,0 +1,215 @@
+import logging
+import math
+import threading
+from typing import Any
+
+import pypdfium2
+import pdfplumber
+from pdfplumber import page
+
+from budgeting_app.pdf_table_reader.core.entities.models import RawImage
+from budgeting_app.pdf_table_reader.core.usecases.render_cache import RenderCache
+from budgeting_app.utils.logging import CustomLoggerAdapter
+
+
+TILE_SIZE = 256
+PYRAMID_RESOLUTIONS = (50, 100, 200, 400)
+THUMBNAIL_RESOLUTION = 30
+DEFAULT_TILE_CACHE_SIZE = 128 * 1024 ** 2
+# a level is upscaled by up to that much before the next one is used - it's not noticeable
+MAX_LEVEL_UPSCALE = 1.05
+
+# (column, row) of a tile within its level
+T_tile = tuple[int, int]
+# (x0, top, x1, bottom) in pixels of a level
+T_rect = tuple[float, float, float, float]
+
+
+def open_pdfium_document(pdf: pdfplumber.PDF) -> pypdfium2.PdfDocument:
+    """Open the source pdfplumber renders pages of the PDF from (see pdfplumber.display.get_page_image)."""
+    return _open_pdfium_source(pdf.path, pdf.stream, pdf.password)
+
+
+def _open_pdfium_source(path: Any, stream: Any, password: str | None) -> pypdfium2.PdfDocument:
+    if path:
+        src = path
+    else:
+        stream.seek(0)
+        src = stream
+    return pypdfium2.PdfDocument(src, password=password)
+
+
+class PageTiles:
+    """Tile pyramid of a page - the page at each of `resolutions` cut into square tiles. A tile is
+    rendered on its first request, rasterising only its own area, and kept in `cache` afterwards.
+
+    pdfium must not be used from two threads at once, hence every render holds `lock` (the one of the
+    workspace the page belongs to, see `TableDetectorWorkspace.get_page_tiles`).
+
+    Only the size and number of the page and where its document comes from are kept, not the
+    pdfplumber page - it can be released (see `ResidentPages`) while its tiles are displayed.
+
+    Example:
+        ```
+        tiles = PageTiles(_page, threading.RLock(), RenderCache())
+        resolution = tiles.level(dpi=300)  # 400
+        for col, row in tiles.tiles_in_rect(resolution, (0, 0, 1000, 600)):
+            tile = tiles.get_tile(resolution, col, row)
+        ```
+    """
+    page_id: str
+    page_number: int
+    lock: threading.RLock
+    cache: RenderCache
+    resolutions: tuple[int, ...]
+    tile_size: int
+    antialias: bool
+    logger: logging.LoggerAdapter
+
+    def __init__(
+        self,
+        _page: page.Page,
+        lock: threading.RLock,
+        cache: RenderCache,
+        *,
+        pdfium_pdf: pypdfium2.PdfDocument | None = None,
+        page_id: str | None = None,
+        resolutions: tuple[int, ...] = PYRAMID_RESOLUTIONS,
+        tile_size: int = TILE_SIZE,
+        antialias: bool = False
+    ) -> None:
+        self.logger = CustomLoggerAdapter.getLogger('pdf_table_reader', className='PageTiles')
+        self._page_size = float(_page.width), float(_page.height)
+        self.page_number = _page.page_number
+        self._pdf_source = _page.pdf.path, _page.pdf.stream, _page.pdf.password
+        self.page_id = page_id if page_id is not None else str(id(_page))
+        self.lock = lock
+        self.cache = cache
+        self.resolutions = tuple(sorted(resolutions))
+        self.tile_size = tile_size
+        self.antialias = antialias
+        self._pdfium_page: pypdfium2.PdfPage | None = None
+        # document shared with other pages is closed by its owner
+        self._pdfium_pdf = pdfium_pdf
+        self._owns_pdfium_pdf = pdfium_pdf is None
+
+    @property
+    def page_size(self) -> tuple[float, float]:
+        """Width and height of the page in points."""
+        return self._page_size
+
+    def level(self, dpi: float) -> int:
+        """Resolution of the level to display the page at `dpi` - the lowest one that is not blurry."""
+        for resolution in self.resolutions:
+            if resolution * MAX_LEVEL_UPSCALE >= dpi:
+                return resolution
+        return self.resolutions[-1]
+
+    def level_size(self, resolution: int) -> tuple[int, int]:
+        """Size of the whole page in pixels at the level (as pdfplumber would render it)."""
+        return tuple(math.ceil(side * resolution / 72) for side in self.page_size)
+
+    def grid(self, resolution: int) -> tuple[int, int]:
+        """Number of columns and rows of tiles at the level."""
+        return tuple(math.ceil(side / self.tile_size) for side in self.level_size(resolution))
+
+    def tile_rect(self, resolution: int, col: int, row: int) -> T_rect:
+        """Area of the tile in pixels at the level. Tiles in the last column/row may be smaller."""
+        width, height = self.level_size(resolution)
+        return (
+            col * self.tile_size,
+            row * self.tile_size,
+            min((col + 1) * self.tile_size, width),
+            min((row + 1) * self.tile_size, height)
+        )
+
+    def tiles_in_rect(self, resolution: int, rect: T_rect) -> list[T_tile]:
+        """Tiles intersecting the area given in pixels at the level, row by row."""
+        cols, rows = self.grid(resolution)
+        x0, top, x1, bottom = rect
+        return [
+            (col, row)
+            for row in range(max(math.floor(top / self.tile_size), 0), min(math.ceil(bottom / self.tile_size), rows))
+            for col in range(max(math.floor(x0 / self.tile_size), 0), min(math.ceil(x1 / self.tile_size), cols))
+        ]
+
+    def _key(self, resolution: int, col: int, row: int) -> tuple:
+        return self.page_id, 'tile', resolution, self.antialias, col, row
+
+    def _page_key(self, resolution: int) -> tuple:
+        return self.page_id, 'page', resolution, self.antialias
+
+    def cached_tile(self, resolution: int, col: int, row: int) -> RawImage | None:
+        """The tile if it has been rendered already (and hasn't been evicted)."""
+        return self.cache.get(self._key(resolution, col, row))
+
+    def get_tile(self, resolution: int, col: int, row: int, *, blocking: bool = True) -> RawImage | None:
+        """The tile, rendered if needed.
+
+        Args:
+            - resolution (int): level of the pyramid
+            - col (int): column of the tile
+            - row (int): row of the tile
+            - blocking (bool, optional): When False and the lock is held by another thread (e.g. a page
+            is being rendered) None is returned instead of waiting. Defaults to True.
+
+        Returns:
+            RawImage | None: pixels of the tile
+        """
+        tile = self.cached_tile(resolution, col, row)
+        if tile is not None:
+            return tile
+
+        if not self.lock.acquire(blocking=blocking):
+            return None
+
+        try:
+            tile = self._render(resolution, self.tile_rect(resolution, col, row))
+        finally:
+            self.lock.release()
+
+        self.cache.put(self._key(resolution, col, row), tile)
+        return tile
+
+    def get_page(self, resolution: int) -> RawImage:
+        """The whole page at any resolution (e.g. `THUMBNAIL_RESOLUTION`), cached like the tiles."""
+        image = self.cache.get(self._page_key(resolution))
+        if image is None:
+            with self.lock:
+                image = self._render(resolution, (0, 0, *self.level_size(resolution)))
+            self.cache.put(self._page_key(resolution), image)
+        return image
+
+    def _get_pdfium_page(self) -> pypdfium2.PdfPage:
+        if self._pdfium_page is None:
+            if self._pdfium_pdf is None:
+                self._pdfium_pdf = _open_pdfium_source(*self._pdf_source)
+            self._pdfium_page = self._pdfium_pdf.get_page(self.page_number - 1)
+        return self._pdfium_page
+
+    def _render(self, resolution: int, rect: T_rect) -> RawImage:
+        """Render the area of the page given in pixels at the resolution."""
+        x0, top, x1, bottom = rect
+        width, height = self.level_size(resolution)
+        scale = resolution / 72
+
+        # crop is given as (left, bottom, right, top) margins in points cut off the page; pdfium rounds
+        # the size of the bitmap, so one pixel more is rendered and cut to the exact size of the area
+        img = self._get_pdfium_page().render(
+            scale=scale,
+            crop=(x0 / scale, max(height - bottom - 1, 0) / scale, max(width - x1 - 1, 0) / scale, top / scale),
+            no_smoothtext=not self.antialias,
+            no_smoothpath=not self.antialias,
+            no_smoothimage=not self.antialias,
+            prefer_bgrx=True
+        ).to_pil()
+
+        return RawImage.from_pil(img.crop((0, 0, int(x1 - x0), int(bottom - top))))
+
+    def close(self) -> None:
+        with self.lock:
+            if self._pdfium_page is not None:
+                self._pdfium_page.close()
+            if self._pdfium_pdf is not None and self._owns_pdfium_pdf:
+                self._pdfium_pdf.close()
+            self._pdfium_page = self._pdfium_pdf = None
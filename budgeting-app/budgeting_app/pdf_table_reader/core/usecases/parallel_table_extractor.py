@@ -0,0 +1,122 @@
+from concurrent.futures import ProcessPoolExecutor
+import logging
+import math
+import os
+from typing import Any
+
+from pdfplumber import table
+
+from budgeting_app.utils.types import T_pdf_file_path
+from budgeting_app.utils.logging import CustomLoggerAdapter
+from budgeting_app.pdf_table_reader.core.entities.models import T_table_finder_backend, table_finder_class
+from budgeting_app.pdf_table_reader.core.usecases.pdf_reader import PDFReader
+
+
+T_page_tables = list[list[list[str | None]]]
+
+
+# position of the task (in the pages asked for), page index and table settings
+T_task = tuple[int, int, dict[str, Any]]
+
+
+def _extract_pages_tables(
+    filepath: T_pdf_file_path,
+    password: str | None,
+    tasks: list[T_task],
+    table_finder_backend: T_table_finder_backend = 'python'
+) -> list[tuple[int, T_page_tables]]:
+    """Runs in a worker process. Reopens the file by its path and extracts tables from the given
+    pages with the settings that come along with each task. A page can come in more than one task
+    (e.g. with different settings); it's parsed once.
+
+    Args:
+        - filepath (T_pdf_file_path): path to the PDF file
+        - password (str | None): password to the PDF file
+        - tasks (list[T_task]): (position, page index, table settings)
+        - table_finder_backend (T_table_finder_backend, optional): see `table_finder_class`.
+        Defaults to 'python'.
+
+    Returns:
+        list[tuple[int, T_page_tables]]: (position, tables found on the page) pairs
+    """
+    page_tasks: dict[int, list[tuple[int, dict[str, Any]]]] = {}
+    for position, page_index, settings in tasks:
+        page_tasks.setdefault(page_index, []).append((position, settings))
+
+    finder_class = table_finder_class(table_finder_backend)
+    results = []
+    for page_wrapper in PDFReader.iter_pages(filepath, password, page_range=page_tasks.keys()):
+        for position, settings in page_tasks[page_wrapper.page_number]:
+            finder = finder_class(page_wrapper.page, settings)
+            results.append((position, [t.extract(**(finder.settings.text_settings or {})) for t in finder.tables]))
+    return results
+
+
+class ParallelTableExtractor:
+    """Extract tables from pages of a PDF file using a pool of processes. Pages are split into
+    contiguous ranges, one per worker, and each worker reopens the file by its path so that only
+    plain (picklable) table data cross the process boundary.
+    """
+    workers: int
+    logger: logging.LoggerAdapter
+
+    def __init__(self, workers: int | None = None) -> None:
+        self.logger = CustomLoggerAdapter.getLogger('pdf_table_reader', className='ParallelTableExtractor')
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+
+    def _split(self, tasks: list[T_task]) -> list[list[T_task]]:
+        chunk_size = math.ceil(len(tasks) / self.workers)
+        return [tasks[i:i + chunk_size] for i in range(0, len(tasks), chunk_size)]
+
+    def extract_tables(
+        self,
+        filepath: T_pdf_file_path,
+        page_indices: list[int],
+        table_settings: table.T_table_settings | list[table.T_table_settings],
+        password: str | None = None,
+        *,
+        table_finder_backend: T_table_finder_backend = 'python'
+    ) -> list[T_page_tables]:
+        """Extract tables from the given pages of the file.
+
+        Args:
+            - filepath (T_pdf_file_path): path to the PDF file
+            - page_indices (list[int]): indices of pages to extract tables from; the same page can
+            be given more than once (e.g. with different settings)
+            - table_settings (T_table_settings | list[T_table_settings]): settings applied to all
+            pages or a list of settings - one for each of `page_indices`
+            - password (str | None, optional): Defaults to None.
+            - table_finder_backend (T_table_finder_backend, optional): see `table_finder_class`.
+            Defaults to 'python'.
+
+        Returns:
+            list[T_page_tables]: tables found on each page, in the order of `page_indices`
+        """
+        if isinstance(table_settings, list):
+            if len(table_settings) != len(page_indices):
+                raise ValueError(f'Expected {len(page_indices)} table settings, got {len(table_settings)}.')
+            settings = [dict(ts) for ts in table_settings]
+        else:
+            settings = [dict(table_settings)] * len(page_indices)
+
+        # pages are processed in the document order; keep track of where each result goes
+        tasks = sorted(zip(range(len(page_indices)), page_indices, settings), key=lambda t: t[1])
+
+        self.logger.debug(f'Extracting tables from {len(tasks)} pages of {filepath} with {self.workers} workers.')
+
+        results: dict[int, T_page_tables] = {}
+        if self.workers <= 1 or len(tasks) <= 1:
+            results.update(_extract_pages_tables(filepath, password, tasks, table_finder_backend))
+        else:
+            chunks = self._split(tasks)
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(chunks))) as executor:
+                for chunk_results in executor.map(
+                    _extract_pages_tables,
+                    [filepath] * len(chunks),
+                    [password] * len(chunks),
+                    chunks,
+                    [table_finder_backend] * len(chunks)
+                ):
+                    results.update(chunk_results)
+
+        return [results[i] for i in range(len(page_indices))]
@@ -1,34 +1,400 @@
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from functools import partial
+import hashlib
+import os
+import re
+import threading
+from typing import Generator, Iterable
+import unicodedata
+
 import pdfplumber
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdftypes import resolve1
+from pdfplumber import page
 
 from budgeting_app.utils.types import T_pdf_file_path
 from budgeting_app.utils.validators import is_pdf_file_path
 from budgeting_app.utils.logging import CustomLoggerAdapter
 from budgeting_app.pdf_table_reader.core.entities.models import (
     PDFFileWrapper,
-    PDFPageWrapper
+    PDFPageWrapper,
+    get_page_image_size,
+    DEFAULT_MAX_RESIDENT_PAGES
 )
+from budgeting_app.pdf_table_reader.core.usecases.page_layout_cache import PageLayoutCache, file_sha256
+
+
+DEFAULT_MAX_WORKERS = min(4, os.cpu_count() or 1)
+DEFAULT_MAX_INFLIGHT_PAGES = 200
+
+# object types whose geometry goes into the page fingerprint
+FINGERPRINT_OBJECT_TYPES = ['line', 'rect', 'curve']
+
+# positions going into the layout fingerprint are rounded to that many points
+LAYOUT_GRID = 5
+# share of the page (from the top) whose words go into the layout fingerprint - headers stay the
+# same between statements while the transactions below don't
+LAYOUT_HEADER_SHARE = 0.25
+
+
+class _PageBudget:
+    """Counting semaphore over pages that lets a file take all of its pages at once, so that
+    workers holding parts of the budget cannot starve each other.
+    """
+    max_pages: int
+
+    def __init__(self, max_pages: int) -> None:
+        self.max_pages = max(1, max_pages)
+        self._available = self.max_pages
+        self._cancelled = False
+        self._condition = threading.Condition()
+
+    def acquire(self, pages: int) -> bool:
+        """Block until `pages` (capped at `max_pages`) are available. Returns False if the budget
+        got cancelled in the meantime.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._cancelled or self._available >= pages)
+            if self._cancelled:
+                return False
+            self._available -= pages
+            return True
+
+    def release(self, pages: int) -> None:
+        with self._condition:
+            self._available += pages
+            self._condition.notify_all()
+
+    def cancel(self) -> None:
+        with self._condition:
+            self._cancelled = True
+            self._condition.notify_all()
 
 
 class PDFReader:
-    
+
     @classmethod
-    def open(cls, filepath: T_pdf_file_path, password: str | None = None) -> PDFFileWrapper | None:
+    def open(
+        cls,
+        filepath: T_pdf_file_path,
+        password: str | None = None,
+        *,
+        pages: Iterable[int] | None = None,
+        layout_cache: PageLayoutCache | None = None,
+        max_resident_pages: int | None = DEFAULT_MAX_RESIDENT_PAGES
+    ) -> PDFFileWrapper | None:
+        """Open the PDF file and wrap each of its pages. Pages are not parsed nor rendered here -
+        `PDFPageWrapper.base_size` is derived from the page geometry and the pdfplumber page object
+        is created on first access of `PDFPageWrapper.page`. At most `max_resident_pages` pages
+        are kept parsed at a time (see `PDFFileWrapper`). The file stays open until
+        `PDFFileWrapper.close` is called or the wrapper is used as a context manager exits.
         
+        When `pages` (0-based indices) are given, only those pages are wrapped and the page tree is
+        not walked past the last of them. Wrappers keep the original numbers of the pages in
+        `PDFPageWrapper.page_number`.
+        
+        When `layout_cache` is given, layout objects of a page are loaded from it as the page gets
+        created. On a cache miss the page is parsed straight away and its objects are cached.
+        """
+
         logger = CustomLoggerAdapter.getLogger('pdf_table_reader', className='PDFReader')
 
         if is_pdf_file_path(filepath):
             logger.debug('Path to the PDF file is valid.')
-            
+
             pdf = pdfplumber.open(path_or_fp=filepath, password=password)
 
-            pdf_file = PDFFileWrapper(pages=[])
+            pages = None if pages is None else sorted(set(pages))
+            pdf_file = PDFFileWrapper(
+                pages=[*cls._iter_page_wrappers(pdf, pages, layout_cache=layout_cache)],
+                max_resident_pages=max_resident_pages,
+                sources=[pdf]
+            )
+            
+            if pages is not None and len(pdf_file.pages) < len(pages):
+                missing = sorted(set(pages) - set(p.page_number for p in pdf_file.pages))
+                logger.warning(f'Pages {missing} not found in the file.')
 
-            for page in pdf.pages:
-                pdf_file.pages.append(PDFPageWrapper(page))
-                
             logger.debug(f'Successfully created PDFFileWrapper with {len(pdf_file.pages)} pages.')
 
             return pdf_file
 
         else:
             logger.error('Given path is not a valid string pointing to a pdf file.')
+
+    @classmethod
+    def iter_pages(
+        cls,
+        filepath: T_pdf_file_path,
+        password: str | None = None,
+        page_range: Iterable[int] | None = None,
+        *,
+        layout_cache: PageLayoutCache | None = None
+    ) -> Generator[PDFPageWrapper, None, None]:
+        """Yield wrappers of the file's pages one at a time. Once the consumer asks for the next
+        page, the previous one is released (see `PDFPageWrapper.release`) so that memory use does
+        not grow with the page count. The file is closed when the generator is exhausted or closed.
+
+        Example:
+            ```
+            for page_wrapper in PDFReader.iter_pages(filepath):
+                tables += page_wrapper.page.extract_tables(table_settings)
+            ```
+
+        Args:
+            - filepath (T_pdf_file_path): path to the PDF file
+            - password (str | None, optional): Defaults to None.
+            - page_range (Iterable[int] | None, optional): Indices of pages to yield. All pages
+            are yielded if not given. Defaults to None.
+            - layout_cache (PageLayoutCache | None, optional): see `PDFReader.open`. Defaults to None.
+        """
+
+        logger = CustomLoggerAdapter.getLogger('pdf_table_reader', className='PDFReader')
+
+        if not is_pdf_file_path(filepath):
+            logger.error('Given path is not a valid string pointing to a pdf file.')
+            return
+
+        pdf = pdfplumber.open(path_or_fp=filepath, password=password)
+
+        try:
+            for page_wrapper in cls._iter_page_wrappers(pdf, page_range, layout_cache=layout_cache):
+                yield page_wrapper
+                page_wrapper.release()
+        finally:
+            pdf.close()
+            logger.debug(f'Closed {filepath}.')
+
+    @classmethod
+    def open_many(
+        cls,
+        paths: Iterable[T_pdf_file_path],
+        max_workers: int | None = None,
+        max_inflight_pages: int = DEFAULT_MAX_INFLIGHT_PAGES,
+        password: str | None = None,
+        *,
+        layout_cache: PageLayoutCache | None = None
+    ) -> Generator[PDFFileWrapper, None, None]:
+        """Open and pre-parse (see `PDFPageWrapper.page`) many files concurrently and yield their
+        wrappers in the order they finish. Parsed pages that were not handed over to the consumer
+        yet are limited to `max_inflight_pages` - a worker waits for the budget before it starts
+        parsing the next file. Pages of a file are released from the budget once the consumer asks
+        for the next one. Files that cannot be opened are logged and skipped. Files opened but not
+        handed over when the generator is closed are closed too - those still being parsed as soon
+        as they are done.
+
+        Example:
+            ```
+            for pdf_file in PDFReader.open_many(glob('statements/*.pdf'), max_workers=4):
+                queue.append(pdf_file)
+            ```
+
+        Args:
+            - paths (Iterable[T_pdf_file_path]): paths to the PDF files
+            - max_workers (int | None, optional): number of threads. Defaults to None
+            (`DEFAULT_MAX_WORKERS`).
+            - max_inflight_pages (int, optional): Defaults to `DEFAULT_MAX_INFLIGHT_PAGES`.
+            - password (str | None, optional): password used for all files. Defaults to None.
+            - layout_cache (PageLayoutCache | None, optional): see `PDFReader.open`. Defaults to None.
+        """
+
+        logger = CustomLoggerAdapter.getLogger('pdf_table_reader', className='PDFReader')
+
+        budget = _PageBudget(max_inflight_pages)
+        executor = ThreadPoolExecutor(max_workers=max_workers or DEFAULT_MAX_WORKERS, thread_name_prefix='PDFReader')
+
+        futures = {
+            executor.submit(cls._open_and_parse, filepath, password, budget, layout_cache): filepath
+            for filepath in paths
+        }
+        logger.debug(f'Opening {len(futures)} files.')
+
+        # futures whose files have been handed over (or failed to open)
+        consumed: set[Future] = set()
+        try:
+            for future in as_completed(futures):
+                consumed.add(future)
+                try:
+                    pdf_file, pages = future.result()
+                except Exception as e:
+                    logger.error(f'Could not open {futures[future]} ({e}).')
+                    continue
+
+                if pdf_file is None:
+                    continue
+
+                try:
+                    yield pdf_file
+                finally:
+                    budget.release(pages)
+        finally:
+            budget.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+            for future in futures:
+                if future not in consumed:
+                    # called straight away if done, by the worker once it's done otherwise
+                    future.add_done_callback(cls._close_unconsumed)
+
+    @staticmethod
+    def _close_unconsumed(future: Future) -> None:
+        if future.cancelled() or future.exception() is not None:
+            return
+        pdf_file, _ = future.result()
+        if pdf_file is not None:
+            pdf_file.close()
+
+    @classmethod
+    def _open_and_parse(
+        cls,
+        filepath: T_pdf_file_path,
+        password: str | None,
+        budget: _PageBudget,
+        layout_cache: PageLayoutCache | None = None
+    ) -> tuple[PDFFileWrapper | None, int]:
+        """Open the file and parse its pages (as many as it keeps resident) once the budget allows.
+
+        Returns:
+            tuple[PDFFileWrapper | None, int]: the wrapper and number of pages taken from the budget
+        """
+        pdf_file = cls.open(filepath, password, layout_cache=layout_cache)
+        if pdf_file is None:
+            return None, 0
+
+        page_wrappers = pdf_file.pages[:pdf_file.max_resident_pages]
+        pages = min(len(page_wrappers), budget.max_pages)
+        if not budget.acquire(pages):
+            pdf_file.close()
+            return None, 0
+
+        try:
+            for page_wrapper in page_wrappers:
+                page_wrapper.page.objects
+        except BaseException:
+            budget.release(pages)
+            pdf_file.close()
+            raise
+
+        return pdf_file, pages
+
+    @classmethod
+    def fingerprint(cls, page_wrapper: PDFPageWrapper) -> str:
+        """Hash of the page's normalised text and geometry of its ruling objects (lines, rects and
+        curves rounded to 1pt, in no particular order) - the same page exported twice gets the
+        same fingerprint. Only parsed objects are used, the page is not rendered. The result is
+        kept in `PDFPageWrapper.fingerprint`.
+
+        Returns:
+            str: hex digest
+        """
+        if page_wrapper.fingerprint is not None:
+            return page_wrapper.fingerprint
+
+        _page = page_wrapper.page
+        objects = _page.objects
+        sha = hashlib.blake2b(digest_size=16)
+
+        text = ''.join(c['text'] for c in objects.get('char', []))
+        sha.update(f'{round(_page.width)}x{round(_page.height)}'.encode())
+        sha.update(re.sub(r'\s+', ' ', unicodedata.normalize('NFKC', text)).strip().encode())
+
+        for object_type in FINGERPRINT_OBJECT_TYPES:
+            geometry = sorted(
+                (round(o['x0']), round(o['top']), round(o['x1']), round(o['bottom']))
+                for o in objects.get(object_type, [])
+            )
+            sha.update(f'{object_type}:{geometry}'.encode())
+
+        page_wrapper.fingerprint = sha.hexdigest()
+        return page_wrapper.fingerprint
+
+    @classmethod
+    def layout_fingerprint(cls, page_wrapper: PDFPageWrapper) -> list[str]:
+        """Features of the page's layout that pages of statements of one bank share, unlike their
+        text - page size, positions of vertical ruling edges, extents of horizontal ones and words
+        of the header along with their positions (rounded to `LAYOUT_GRID`). Only parsed objects are
+        used, the page is not rendered. Compare with `layout_similarity`.
+
+        Returns:
+            list[str]: sorted features
+        """
+        _page = page_wrapper.page
+        features = {f'size:{round(_page.width)}x{round(_page.height)}'}
+
+        for edge in _page.edges:
+            if edge['orientation'] == 'v':
+                features.add(f"v:{round(edge['x0'] / LAYOUT_GRID)}")
+            else:
+                features.add(f"h:{round(edge['x0'] / LAYOUT_GRID)}-{round(edge['x1'] / LAYOUT_GRID)}")
+
+        header_bbox = (_page.bbox[0], _page.bbox[1], _page.bbox[2], _page.bbox[1] + _page.height * LAYOUT_HEADER_SHARE)
+        for word in page_wrapper.spatial_index.words_in_bbox(header_bbox):
+            if word['text'].isalpha():
+                features.add(f"w:{word['text'].lower()}@{round(word['x0'] / LAYOUT_GRID)}")
+
+        return sorted(features)
+
+    @staticmethod
+    def layout_similarity(a: list[str], b: list[str]) -> float:
+        """Jaccard similarity of two layout fingerprints, in range [0, 1]."""
+        a, b = set(a), set(b)
+        return len(a & b) / len(a | b) if a or b else 1.0
+
+    @classmethod
+    def _iter_page_wrappers(
+        cls,
+        pdf: pdfplumber.PDF,
+        page_indices: Iterable[int] | None = None,
+        *,
+        layout_cache: PageLayoutCache | None = None
+    ) -> Generator[PDFPageWrapper, None, None]:
+        """Wrap pages of the document lazily, in the document order. The page tree is walked only
+        as far as the last requested page.
+        """
+        if layout_cache is not None and pdf.path is None:
+            # nothing to key the cache with
+            layout_cache = None
+        file_sha = None if layout_cache is None else file_sha256(pdf.path)
+        
+        wanted = None if page_indices is None else set(page_indices)
+        last_wanted = None if wanted is None else max(wanted, default=-1)
+
+        doctop = 0
+        for i, page_obj in enumerate(PDFPage.create_pages(pdf.doc)):
+            if last_wanted is not None and i > last_wanted:
+                break
+
+            if wanted is None or i in wanted:
+                yield PDFPageWrapper(
+                    base_size=get_page_image_size(page_obj),
+                    page_number=i,
+                    page_loader=partial(cls._load_page, pdf, page_obj, i, doctop, layout_cache, file_sha)
+                )
+
+            doctop += cls._get_page_height(page_obj)
+
+    @classmethod
+    def _load_page(
+        cls,
+        pdf: pdfplumber.PDF,
+        page_obj: PDFPage,
+        page_index: int,
+        initial_doctop: int | float,
+        layout_cache: PageLayoutCache | None = None,
+        file_sha: str | None = None
+    ) -> page.Page:
+        _page = page.Page(pdf, page_obj, page_number=page_index + 1, initial_doctop=initial_doctop)
+        
+        if layout_cache is not None:
+            layout_cache.hydrate(_page, file_sha, page_index)
+        
+        return _page
+
+    @classmethod
+    def _get_page_height(cls, page_obj: PDFPage) -> int | float:
+        """Height of the page as pdfplumber sees it (see `page.Page.height`) - needed to work out
+        `doctop` of the following pages without creating page objects.
+        """
+        m = [resolve1(v) for v in page_obj.mediabox]
+        if page_obj.rotate in [90, 270]:
+            return abs(m[2] - m[0])
+        return abs(m[3] - m[1])
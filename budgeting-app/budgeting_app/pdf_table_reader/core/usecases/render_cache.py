@@ -0,0 +1,121 @@
+from collections import OrderedDict
+import logging
+import threading
+from typing import Any, Hashable
+
+from budgeting_app.pdf_table_reader.core.entities.models import RawImage, table_settings_hash
+from budgeting_app.utils.logging import CustomLoggerAdapter
+
+
+DEFAULT_RENDER_CACHE_SIZE = 64 * 1024 ** 2
+
+
+def _nbytes(image: bytes | RawImage) -> int:
+    return image.nbytes if isinstance(image, RawImage) else len(image)
+
+
+class RenderCache:
+    """In-memory LRU cache of rendered page images bounded by their total size in bytes.
+
+    Example:
+        ```
+        key = RenderCache.key(page_wrapper.uuid, resolution, antialias, _format, page_wrapper.table_settings)
+        image_bytes = cache.get(key)
+        if image_bytes is None:
+            image_bytes = render(...)
+            cache.put(key, image_bytes)
+        ```
+    """
+    max_bytes: int
+    hits: int
+    misses: int
+    evictions: int
+    logger: logging.LoggerAdapter
+
+    def __init__(self, max_bytes: int = DEFAULT_RENDER_CACHE_SIZE) -> None:
+        self.logger = CustomLoggerAdapter.getLogger('pdf_table_reader', className='RenderCache')
+        self.max_bytes = max_bytes
+        self.hits = self.misses = self.evictions = 0
+        self._entries: OrderedDict[Hashable, bytes | RawImage] = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def key(
+        cls,
+        page_id: str,
+        resolution: int,
+        antialias: bool,
+        _format: str,
+        table_settings: dict[str, Any] | None
+    ) -> tuple[str, int, bool, str, str]:
+        """`table_settings` are None for a bare page raster (no tables drawn)."""
+        settings_hash = '' if table_settings is None else table_settings_hash(table_settings)
+        return page_id, resolution, antialias, _format.upper(), settings_hash
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def get(self, key: Hashable) -> bytes | RawImage | None:
+        with self._lock:
+            image_bytes = self._entries.get(key)
+            if image_bytes is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return image_bytes
+
+    def put(self, key: Hashable, image_bytes: bytes | RawImage) -> None:
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total_bytes -= _nbytes(old)
+
+            if _nbytes(image_bytes) > self.max_bytes:
+                # would evict everything else and still not fit
+                self.logger.debug(f'Image of {_nbytes(image_bytes)} bytes exceeds the cache size, not cached.')
+                return
+
+            self._entries[key] = image_bytes
+            self._total_bytes += _nbytes(image_bytes)
+
+            while self._total_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= _nbytes(evicted)
+                self.evictions += 1
+
+    def invalidate_page(self, page_id: str) -> int:
+        """Remove all images of the page.
+
+        Returns:
+            int: number of removed entries
+        """
+        with self._lock:
+            keys = [k for k in self._entries if isinstance(k, tuple) and k[0] == page_id]
+            for k in keys:
+                self._total_bytes -= _nbytes(self._entries.pop(k))
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> dict[str, int | float]:
+        """Counters for diagnostics."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'total_bytes': self._total_bytes,
+            'max_bytes': self.max_bytes
+        }
@@ -1,15 +1,49 @@
 from dataclasses import asdict, dataclass
 import enum
+import functools
 import io
 import logging
-from typing import Any, Literal
+import threading
+from typing import Any, Callable, Literal
 from uuid import uuid4
 from budgeting_app.utils.logging import CustomLoggerAdapter
 from budgeting_app.utils.types import TypedObservableDict
 
-from pdfplumber import table, page, _typing, display
+import pdfplumber
+from pdfplumber import table, page, _typing, display, utils
+import pypdfium2
 
-from budgeting_app.pdf_table_reader.core.entities.models import ExplicitLineData, PDFFileWrapper, PDFPageWrapper, ImageWrapper, BASE_IMAGE_RESOLUTION
+from budgeting_app.pdf_table_reader.core.entities.models import (
+    ExplicitLineData,
+    ExplicitTableData,
+    PDFFileWrapper,
+    PDFPageWrapper,
+    ImageWrapper,
+    RawImage,
+    TableOverlay,
+    BASE_IMAGE_RESOLUTION,
+    RAW_IMAGE_FORMAT,
+    T_table_finder_backend,
+    table_finder_class
+)
+from budgeting_app.pdf_table_reader.core.entities.spatial_index import T_bbox
+from budgeting_app.pdf_table_reader.core.usecases.parallel_table_extractor import ParallelTableExtractor
+from budgeting_app.pdf_table_reader.core.usecases.table_prescan import prescan_page
+from budgeting_app.pdf_table_reader.core.usecases.table_settings_tuner import (
+    TableSettingsTuner,
+    TuningResult,
+    T_progress_callback,
+    DEFAULT_TUNING_TIME_BUDGET
+)
+from budgeting_app.pdf_table_reader.core.usecases.render_cache import RenderCache
+from budgeting_app.pdf_table_reader.core.usecases.disk_render_cache import DiskRenderCache
+from budgeting_app.pdf_table_reader.core.usecases.page_layout_cache import file_sha256
+from budgeting_app.pdf_table_reader.core.usecases.page_tiles import (
+    PageTiles,
+    open_pdfium_document,
+    DEFAULT_TILE_CACHE_SIZE,
+    THUMBNAIL_RESOLUTION
+)
 
 
 DEFAULT_TABLE_SETTINGS = {
@@ -34,6 +68,15 @@ DEFAULT_TABLE_SETTINGS = {
     "intersection_y_tolerance": 3,
 }
 
+def _with_pages_lock(method: Callable) -> Callable:
+    """Run the method of `TableDetectorWorkspace` holding its `pages_lock`."""
+    @functools.wraps(method)
+    def wrapper(self: 'TableDetectorWorkspace', *args, **kwargs):
+        with self.pages_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class TableDetectorWorkspace:
     """
     Detect tabular data based on given settings (or/and elements such as lines/squares
@@ -47,17 +90,49 @@ class TableDetectorWorkspace:
         REPLACE = 3
         
     pdf_file: PDFFileWrapper
+    # pages scoring below are skipped when extracting tables (see `table_prescan.prescan_page`)
+    table_score_threshold: float | None
+    # rendered page images, see `_get_pages_images_bytes`
+    render_cache: RenderCache
+    # rendered page images kept across sessions, see `_get_pages_images_bytes`; not used if None
+    disk_render_cache: DiskRenderCache | None
+    # tiles of the pages for zooming in, see `get_page_tiles`
+    tile_cache: RenderCache
+    # held while pages are parsed, rendered, searched, added, removed or their elements changed, so
+    # that pages can be rendered in a background thread - public methods touching pages take it
+    # (see `_with_pages_lock`), code accessing `pdf_file.pages[i].page` directly must hold it
+    pages_lock: threading.RLock
     logger: logging.LoggerAdapter
     
-    def __init__(self, pdf_file: PDFFileWrapper, default_table_settings: table.T_table_settings = DEFAULT_TABLE_SETTINGS) -> None:
+    def __init__(
+        self,
+        pdf_file: PDFFileWrapper,
+        default_table_settings: table.T_table_settings = DEFAULT_TABLE_SETTINGS,
+        *,
+        table_score_threshold: float | None = None,
+        render_cache: RenderCache | None = None,
+        disk_render_cache: DiskRenderCache | None = None,
+        table_finder_backend: T_table_finder_backend = 'python'
+    ) -> None:
         
         self.logger = CustomLoggerAdapter.getLogger('pdf_table_reader', className='TableDetectorWorkspace')
         self.logger.debug('Inititalising TableDetectorWorkspace.')
         
         self.pdf_file = pdf_file
+        self.table_score_threshold = table_score_threshold
+        self.render_cache = RenderCache() if render_cache is None else render_cache
+        self.disk_render_cache = disk_render_cache
+        # path -> SHA-256 of the source files, see `_disk_render_cache_key`
+        self._file_shas: dict[str, str] = {}
+        self.pages_lock = threading.RLock()
+        self.tile_cache = RenderCache(DEFAULT_TILE_CACHE_SIZE)
+        self._page_tiles: dict[str, PageTiles] = {}
+        # pdfium documents shared by tiles of the pages of each source PDF
+        self._pdfium_pdfs: dict[int, Any] = {}
         
         for p in self.pdf_file.pages:
             p.table_settings = TypedObservableDict(default_table_settings)
+            p.table_finder_backend = table_finder_backend
 
     ###########################
     #        ADD PAGES        #
@@ -90,6 +165,7 @@ class TableDetectorWorkspace:
             
         return True, None
     
+    @_with_pages_lock
     def add_page(
         self, 
         page: PDFPageWrapper,
@@ -121,7 +197,7 @@ class TableDetectorWorkspace:
             
         elif add_page_mode == self.AddPageMode.AT_END:
             # add at the end
-            self.pdf_file.pages.append(page)
+            self.pdf_file.pages = [*self.pdf_file.pages, page]
             
         elif add_page_mode == self.AddPageMode.INSERT_AFTER:
             
@@ -157,6 +233,7 @@ class TableDetectorWorkspace:
         
         return self
     
+    @_with_pages_lock
     def add_pages(
         self,
         pages: list[PDFPageWrapper],
@@ -229,6 +306,7 @@ class TableDetectorWorkspace:
                 
         return self
            
+    @_with_pages_lock
     def add_pages_from_file(
         self,
         pdf_file: PDFFileWrapper,
@@ -236,14 +314,15 @@ class TableDetectorWorkspace:
         add_pages_numbers: list[int] | Literal['all'] = 'all',
         add_page_mode: AddPageMode = AddPageMode.AT_END,
         insert_after_page_number: int = -1,
-        replace_page_numbers: list[int] = []
+        replace_page_numbers: list[int] = [],
+        source_page_numbers: list[int] | None = None
     ) -> 'TableDetectorWorkspace':
         """Allows to add all or selected pages from PDFFileWrapper object.
 
         Args:
             - pdf_file (PDFFileWrapper): to pull the pages from
-            - add_pages_numbers (list[int] | Literal[&#39;all&#39;], optional): Which pages to add.
-            Defaults to 'all'.
+            - add_pages_numbers (list[int] | Literal[&#39;all&#39;], optional): Which pages to add - indices
+            of the pages in `pdf_file.pages`. Defaults to 'all'.
             - add_page_mode (AddPageMode, optional): Configure where pages are to be added. Defaults
             to `AddPageMode.AT_END`.
             - insert_after_page_number (int, optional): Required when `add_page_mode` is set to
@@ -252,20 +331,36 @@ class TableDetectorWorkspace:
             - replace_page_numbers (list[int], optional): Required when `add_page_mode` is set to
             `AddPageMode.REPLACE`. List of page indices that need to be replaced with the given ones.
             Must represent a list of consecutive indices. Defaults to [].
+            - source_page_numbers (list[int] | None, optional): Which pages to add - numbers of the
+            pages in the source document (see `PDFPageWrapper.page_number`), so that a file opened
+            partially (`PDFReader.open(..., pages=...)`) is indexed as the whole one would be. Can't
+            be given along with `add_pages_numbers`. Defaults to None.
 
         Returns:
             TableDetectorWorkspace: instance of self
         """
         
-        if add_pages_numbers == 'all':
+        if source_page_numbers is not None:
+            if add_pages_numbers != 'all':
+                raise ValueError('Only one of add_pages_numbers and source_page_numbers can be given.')
+            
+            pages = []
+            for n in source_page_numbers:
+                matching = [p for p in pdf_file.pages if p.page_number == n]
+                if len(matching) != 1:
+                    raise ValueError(
+                        f'Required: source_page_numbers of exactly one page each, got {len(matching)} pages '
+                        f'with source page number {n}.'
+                    )
+                pages += matching
+        elif add_pages_numbers == 'all':
             pages = pdf_file.pages
         else:
             # then we assume add_pages_numbers is a list of indices
-            
             if all(map(lambda i: 0 <= i < len(pdf_file.pages), add_pages_numbers)):
                 pages = [pdf_file.pages[i] for i in add_pages_numbers]
             else:
-                raise ValueError(f'Required: 0 <= add_pages_numbers < {len(self.pdf_file.pages)}, got add_pages_numbers={add_pages_numbers}')
+                raise ValueError(f'Required: 0 <= add_pages_numbers < {len(pdf_file.pages)}, got add_pages_numbers={add_pages_numbers}')
             
         self.add_pages(
             pages,
@@ -274,27 +369,46 @@ class TableDetectorWorkspace:
             replace_page_numbers=replace_page_numbers
         )
         
+        # the pages need their documents for as long as this file is open
+        self.pdf_file.sources = [*self.pdf_file.sources, *[pdf for pdf in pdf_file.sources if pdf not in self.pdf_file.sources]]
+        
         return self
     
     ###########################
     #        GET PAGES        #
     ###########################
     
+    @_with_pages_lock
     def get_page_object(self, page_number: int) -> page.Page:
         return self.pdf_file.pages[page_number].page
     
     def get_page_wrapper(self, page_number: int) -> PDFPageWrapper:
         return self.pdf_file.pages[page_number]
     
+    def get_source_page_numbers(self) -> list[int | None]:
+        """Numbers of the workspace's pages in their source documents (see `PDFPageWrapper.page_number`)."""
+        return [p.page_number for p in self.pdf_file.pages]
+    
+    def get_page_index(self, source_page_number: int) -> int | None:
+        """Index of the page in the workspace given its number in the source document. The first
+        match is returned if pages from several documents share the number.
+        """
+        for i, p in enumerate(self.pdf_file.pages):
+            if p.page_number == source_page_number:
+                return i
+    
+    @_with_pages_lock
     def get_page_text(self, page_number: int) -> str:
         return self.pdf_file.pages[page_number].page.extract_text()
     
+    @_with_pages_lock
     def get_pages_objects(self, page_numbers: list[int]) -> list[page.Page]:
         return [self.pdf_file.pages[i].page for i in page_numbers]
     
     def get_pages_wrappers(self, page_numbers: list[int]) -> list[PDFPageWrapper]:
         return [self.pdf_file.pages[i] for i in page_numbers]
     
+    @_with_pages_lock
     def get_pages_text(self, page_numbers: list[int], *, merge: bool = False, delimiter: str = '\n') -> list[str] | str:
         txt_list = [self.pdf_file.pages[i].page.extract_text() for i in page_numbers]
         if merge:
@@ -304,8 +418,10 @@ class TableDetectorWorkspace:
     
     @property
     def all_pages_objects(self) -> list[page.Page]:
-        return [p.page for p in self.pdf_file.pages]
+        with self.pages_lock:
+            return [p.page for p in self.pdf_file.pages]
     
+    @_with_pages_lock
     def get_all_pages_text(self, *, merge: bool = False, delimiter: str = '\n') -> list[str] | str:
         txt_list = [p.page.extract_text() for p in self.pdf_file.pages]
         if merge:
@@ -317,27 +433,69 @@ class TableDetectorWorkspace:
     def pdf_file_wrapper(self) -> PDFFileWrapper:
         return self.pdf_file
     
+    def close(self) -> None:
+        """Close the underlying PDF file(s). See `PDFFileWrapper.close`."""
+        self.logger.debug(f'Closing the PDF file. Render cache: {self.render_cache.stats()}.')
+        with self.pages_lock:
+            for page_tiles in self._page_tiles.values():
+                page_tiles.close()
+            self._page_tiles.clear()
+            for pdfium_pdf in self._pdfium_pdfs.values():
+                pdfium_pdf.close()
+            self._pdfium_pdfs.clear()
+            self.pdf_file.close()
+        self.render_cache.clear()
+        self.tile_cache.clear()
+    
     ###########################
     #      IMAGE WRAPPER      #
     ###########################
     
+    def _disk_render_cache_key(
+        self,
+        page_index: int,
+        resolution: int,
+        antialias: bool,
+        _format: str,
+        table_settings: dict[str, Any] | None
+    ) -> str | None:
+        """Key of the page image in `disk_render_cache` or None if it can't be cached there."""
+        page_wrapper = self.pdf_file.pages[page_index]
+        if self.disk_render_cache is None or page_wrapper.page_number is None:
+            return None
+        
+        path = page_wrapper.page.pdf.path
+        if path is None:
+            # opened from a stream - nothing to key the cache with
+            return None
+        
+        path = str(path)
+        if path not in self._file_shas:
+            self._file_shas[path] = file_sha256(path)
+        
+        return DiskRenderCache.key(self._file_shas[path], page_wrapper.page_number, resolution, antialias, _format, table_settings)
+    
     def _get_pages_images_bytes(
         self,
         page_indices: list[int],
         resolution: int,
         *,
         antialias: bool = False,
-        _format: str = 'PNG'
-    ) -> list[bytes]:
+        _format: str = 'PNG',
+        overlay: bool = False
+    ) -> list[bytes | RawImage]:
         """
         Args:
             `page_indices (list[int])`: Indices of pages to extract the images from\n
             `resolution (int)`: resolution of the image extracted from the page.\n
             `antialias (bool, optional)`: Defaults to False.\n
-            `_format (str, optional)`: Image formatting. Defaults to 'PNG'.\n
+            `_format (str, optional)`: Image formatting, `RAW_IMAGE_FORMAT` for uncompressed pixels
+            (see `RawImage`). Defaults to 'PNG'.\n
+            `overlay (bool, optional)`: Render bare pages, without the tables (see `get_page_overlay`).
+            Defaults to False.\n
 
         Returns:
-            `list[bytes]`: List of byte arrays - one for each image.
+            `list[bytes | RawImage]`: List of byte arrays (or raw images) - one for each image.
         """
         if isinstance(page_indices, list):
             if not all(map(lambda i: isinstance(i, int), page_indices)):
@@ -348,13 +506,38 @@ class TableDetectorWorkspace:
         
         img_bytes = []
         for i in page_indices:
-            image_bytes_io = io.BytesIO()
-            img = self.pdf_file.pages[i].page.to_image(resolution, antialias=antialias).debug_tablefinder(self.pdf_file.pages[i].table_settings)
+            # the same page with the same settings renders the same - even if the settings changed in between
+            table_settings = None if overlay else self.pdf_file.pages[i].table_settings
+            key = RenderCache.key(self.pdf_file.pages[i].uuid, resolution, antialias, _format, table_settings)
+            cached = self.render_cache.get(key)
+            if cached is not None:
+                img_bytes.append(cached)
+                continue
+            
+            # rendered in one of the previous sessions
+            disk_key = self._disk_render_cache_key(i, resolution, antialias, _format, table_settings)
+            if disk_key is not None:
+                cached = self.disk_render_cache.load(disk_key, _format)
+                if cached is not None:
+                    self.render_cache.put(key, cached)
+                    img_bytes.append(cached)
+                    continue
             
-            # quantize set to False cause otherwise it changes mode from RGB to P
-            img.save(image_bytes_io, format=_format, quantize=False)
+            img = self.pdf_file.pages[i].page.to_image(resolution, antialias=antialias)
+            if not overlay:
+                img = img.debug_tablefinder(self.pdf_file.pages[i].table_finder)
+            
+            if _format.upper() == RAW_IMAGE_FORMAT:
+                img_bytes.append(RawImage.from_pil(img.annotated))
+            else:
+                image_bytes_io = io.BytesIO()
+                # quantize set to False cause otherwise it changes mode from RGB to P
+                img.save(image_bytes_io, format=_format, quantize=False)
+                img_bytes.append(image_bytes_io.getvalue())
             
-            img_bytes.append(image_bytes_io.getvalue())
+            self.render_cache.put(key, img_bytes[-1])
+            if disk_key is not None:
+                self.disk_render_cache.store(disk_key, img_bytes[-1])
             
         return img_bytes
     
@@ -364,55 +547,141 @@ class TableDetectorWorkspace:
         resolution: int = BASE_IMAGE_RESOLUTION,
         antialias: bool = False,
         _format: str = 'PNG',
+        overlay: bool = False,
+        lazy: bool = False
     ) -> 'TableDetectorWorkspace':
+        """Render the pages. With `overlay` the images do not depend on the table settings, so they are
+        rendered once and the tables found are drawn from `get_page_overlay` instead. With `lazy` only
+        the rendering parameters are set and each page is rendered on its first `get_page_image`.
+        """
+        self.logger.debug(f'Rendering images for {page_indices} pages with {resolution} px/in resolution, antialias {"on" if antialias else "off"}, format set to {_format} and overlay {"on" if overlay else "off"}.')
         
-        self.logger.debug(f'Rendering images for {page_indices} pages with {resolution} px/in resolution, antialias {"on" if antialias else "off"} and format set to {_format}.')
+        _page_indices = [*range(len(self.pdf_file.pages))] if page_indices == 'all' else page_indices
         
         self.pdf_file.image = ImageWrapper(
-            image_bytes=self._get_pages_images_bytes(
-                [*range(len(self.pdf_file.pages))] if page_indices == 'all' else page_indices,
+            image_bytes=[] if lazy else self._get_pages_images_bytes(
+                _page_indices,
                 resolution,
                 antialias=antialias,
-                _format=_format
+                _format=_format,
+                overlay=overlay
             ),
             page_indices=page_indices,
             resolution=resolution,
             _format=_format,
-            antialias=antialias
+            antialias=antialias,
+            overlay=overlay
         )
+        
+        # images of all other pages were rendered with different parameters
+        for p in self.pdf_file.pages:
+            p.image_bytes, p.image_dirty = None, True
+        for i, img_bytes in zip(_page_indices, self.pdf_file.image.image_bytes):
+            self.pdf_file.pages[i].image_bytes, self.pdf_file.pages[i].image_dirty = img_bytes, False
+        
         return self
     
-    @property
-    def image_bytes(self) -> list[bytes]:
+    def get_page_image(self, page_index: int) -> bytes | RawImage:
+        """Image of the page with the tables found using its settings. The page is re-rendered only
+        if its `table_settings` or `explicit_lines` changed since the last time (see
+        `PDFPageWrapper.image_dirty`), otherwise the image is served from memory. Rendering parameters
+        are taken from `pdf_file.image` (see `set_pdf_file_image`).
+        """
+        page_wrapper = self.pdf_file.pages[page_index]
         
-        self.logger.debug('Applying pages\' settings to corresponding images.')
+        # bare raster does not change with the settings
+        is_stale = page_wrapper.image_dirty and not self.pdf_file.image.overlay
         
-        # 'refresh' the image
-        self.pdf_file.image.image_bytes=self._get_pages_images_bytes(
-            page_indices=[*range(len(self.pdf_file.pages))] if self.pdf_file.image.page_indices == 'all' else self.pdf_file.image.page_indices,
-            resolution=self.pdf_file.image.resolution,
-            antialias=self.pdf_file.image.antialias,
-            _format=self.pdf_file.image._format
-        )
+        if is_stale or page_wrapper.image_bytes is None:
+            with self.pages_lock:
+                self.logger.debug(f'Rendering page {page_index}.')
+                page_wrapper.image_bytes = self._get_pages_images_bytes(
+                    [page_index],
+                    self.pdf_file.image.resolution,
+                    antialias=self.pdf_file.image.antialias,
+                    _format=self.pdf_file.image._format,
+                    overlay=self.pdf_file.image.overlay
+                )[0]
+                page_wrapper.image_dirty = False
+        
+        return page_wrapper.image_bytes
+    
+    @property
+    def image_bytes(self) -> list[bytes | RawImage]:
         
-        self.logger.debug(f'{self.pdf_file.image.page_indices} pages were affected.')
+        self.logger.debug('Applying pages\' settings to corresponding images.')
         
+        # 'refresh' the image - only pages which settings changed are rendered again
+        self.pdf_file.image.image_bytes = [
+            self.get_page_image(i)
+            for i in ([*range(len(self.pdf_file.pages))] if self.pdf_file.image.page_indices == 'all' else self.pdf_file.image.page_indices)
+        ]
+
         return self.pdf_file.image.image_bytes
+
+    def _get_pdfium_pdf(self, pdf: pdfplumber.PDF) -> pypdfium2.PdfDocument:
+        """The source document opened with pdfium, shared by the pages from it. Call with `pages_lock` held."""
+        if id(pdf) not in self._pdfium_pdfs:
+            self._pdfium_pdfs[id(pdf)] = open_pdfium_document(pdf)
+        return self._pdfium_pdfs[id(pdf)]
     
+    @_with_pages_lock
+    def get_page_tiles(self, page_index: int) -> PageTiles:
+        """Tile pyramid of the page, to display it sharp at any zoom. Tiles of all pages share
+        `tile_cache`.
+        """
+        page_wrapper = self.pdf_file.pages[page_index]
+        if page_wrapper.uuid not in self._page_tiles:
+            self._page_tiles[page_wrapper.uuid] = PageTiles(
+                page_wrapper.page,
+                self.pages_lock,
+                self.tile_cache,
+                pdfium_pdf=self._get_pdfium_pdf(page_wrapper.page.pdf),
+                page_id=page_wrapper.uuid,
+                antialias=self.pdf_file.image.antialias if self.pdf_file.image is not None else False
+            )
+        return self._page_tiles[page_wrapper.uuid]
+    
+    def get_page_thumbnail(self, page_index: int, resolution: int = THUMBNAIL_RESOLUTION) -> RawImage:
+        """Small image of the page, rendered in a fraction of the time of `get_page_image`."""
+        return self.get_page_tiles(page_index).get_page(resolution)
+    
+    @_with_pages_lock
+    def get_page_overlay(self, page_index: int) -> TableOverlay:
+        """Edges, intersections and cells the table finder detects on the page with its settings,
+        for drawing over the bare page image (see `set_pdf_file_image` with `overlay`). That takes
+        just one table finder pass, shared with `get_tables_text` (see `PDFPageWrapper.table_finder`) -
+        nothing is rasterised or encoded.
+        """
+        page_wrapper = self.pdf_file.pages[page_index]
+        finder = page_wrapper.table_finder
+        x0, top, _, _ = page_wrapper.page.bbox
+
+        return TableOverlay(
+            page_size=(float(page_wrapper.page.width), float(page_wrapper.page.height)),
+            page_origin=(float(x0), float(top)),
+            edges=[(float(e['x0']), float(e['top']), float(e['x1']), float(e['bottom'])) for e in finder.edges],
+            intersections=[(float(x), float(top)) for x, top in finder.intersections.keys()],
+            cells=[tuple(map(float, cell)) for table in finder.tables for cell in table.cells]
+        )
+
     ###########################
     #      REMOVE PAGES       #
     ###########################
     
+    @_with_pages_lock
     def remove_page(self, page_number: int) -> 'TableDetectorWorkspace':
         self.pdf_file.pages.pop(page_number)
         return self
     
+    @_with_pages_lock
     def remove_pages(self, page_numbers: list[int]) -> 'TableDetectorWorkspace':
         pages_to_remove = [self.pdf_file.pages[i] for i in page_numbers]
         for p in pages_to_remove:
             self.pdf_file.pages.remove(p)
         return self
     
+    @_with_pages_lock
     def remove_all_pages(self) -> 'TableDetectorWorkspace':
         self.pdf_file.pages = []
         return self
@@ -425,6 +694,15 @@ class TableDetectorWorkspace:
         ratio = BASE_IMAGE_RESOLUTION / self.pdf_file.image.resolution
         return pos * ratio
     
+    def _set_explicit_lines(self, page_index: int, orientation: Literal['vertical', 'horizontal']) -> None:
+        """Put positions of the page's explicit lines of the orientation into its table settings."""
+        self.set_table_settings_val(
+            page_index,
+            f'explicit_{orientation}_lines',
+            list(set([p.value for p in self.pdf_file.pages[page_index].explicit_lines if p.orientation == orientation]))
+        )
+    
+    @_with_pages_lock
     def add_line(
         self,
         pos: _typing.T_num,
@@ -440,7 +718,7 @@ class TableDetectorWorkspace:
             normalised_pos = self._normalise_position(pos)
             line = ExplicitLineData(normalised_pos, orientation)
             self.pdf_file.pages[page_index].explicit_lines.append(line)
-            self.set_table_settings_val(page_index, f'explicit_{orientation}_lines', list(set([p.value for p in self.pdf_file.pages[page_index].explicit_lines])))
+            self._set_explicit_lines(page_index, orientation)
             
             return self, line.uuid
             
@@ -448,6 +726,7 @@ class TableDetectorWorkspace:
             raise ValueError('Image has not been set, therefore, the element cannot be added. ' \
                 'Use set_table_settings() method to add the element instead.')
             
+    @_with_pages_lock
     def update_line_pos(
         self,
         uuid: str,
@@ -459,12 +738,13 @@ class TableDetectorWorkspace:
             line_index, line = [(i, p) for i, p in enumerate(self.pdf_file.pages[page_index].explicit_lines) if p.uuid == uuid][0]
             line.value = self._normalise_position(pos)
             self.pdf_file.pages[page_index].explicit_lines[line_index] = line
-            self.set_table_settings_val(page_index, f'explicit_{line.orientation}_lines', list(set([p.value for p in self.pdf_file.pages[page_index].explicit_lines])))
+            self._set_explicit_lines(page_index, line.orientation)
             
         else:
             raise ValueError('Image has not been set, therefore, the element cannot be removed. ' \
                 'Use set_table_settings() method to add the element instead.')
             
+    @_with_pages_lock
     def remove_line(
         self,
         uuid: str,
@@ -474,12 +754,13 @@ class TableDetectorWorkspace:
             
             line = [p for p in self.pdf_file.pages[page_index].explicit_lines if p.uuid == uuid][0]
             self.pdf_file.pages[page_index].explicit_lines.remove(line)
-            self.set_table_settings_val(page_index, f'explicit_{line.orientation}_lines', list(set([p.value for p in self.pdf_file.pages[page_index].explicit_lines])))
+            self._set_explicit_lines(page_index, line.orientation)
             
         else:
             raise ValueError('Image has not been set, therefore, the element cannot be removed. ' \
                 'Use set_table_settings() method to add the element instead.')
                 
+    @_with_pages_lock
     def add_lines(
         self,
         pos: list[_typing.T_num],
@@ -493,17 +774,23 @@ class TableDetectorWorkspace:
         
         return self, uuids
     
+    @_with_pages_lock
     def remove_lines(
         self,
         pos: list[_typing.T_num],
         orientation: Literal['vertical', 'horizontal'],
         page_index: int
     ) -> 'TableDetectorWorkspace':
-        for p in pos:
-            self.remove_line(p, orientation, page_index)
+        normalised_pos = [self._normalise_position(p) for p in pos]
+        for line in [
+            line for line in self.pdf_file.pages[page_index].explicit_lines
+            if line.orientation == orientation and line.value in normalised_pos
+        ]:
+            self.remove_line(line.uuid, page_index)
         
         return self
     
+    @_with_pages_lock
     def add_table(
         self,
         top_left: tuple[_typing.T_num, _typing.T_num],
@@ -521,11 +808,31 @@ class TableDetectorWorkspace:
         ]
         
         for line in self.pdf_file.pages[page_index].explicit_lines:
-            for line.uuid in uuids:
+            if line.uuid in uuids:
                 line.is_part_of_table = True
         
+        # text of the table is extracted from its area only, see `get_tables_text`
+        self.pdf_file.pages[page_index].explicit_tables.append(self._get_explicit_table(top_left, bottom_right, vlines, hlines, uuids))
+        
         return self, uuids
     
+    def _get_explicit_table(
+        self,
+        top_left: tuple[_typing.T_num, _typing.T_num],
+        bottom_right: tuple[_typing.T_num, _typing.T_num],
+        vlines: list[_typing.T_num],
+        hlines: list[_typing.T_num],
+        line_uuids: list[str] | None = None
+    ) -> ExplicitTableData:
+        (x0, y0), (x1, y1) = top_left, bottom_right
+        return ExplicitTableData(
+            bbox=tuple(self._normalise_position(pos) for pos in (min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))),
+            vlines=[self._normalise_position(pos) for pos in vlines],
+            hlines=[self._normalise_position(pos) for pos in hlines],
+            line_uuids=[] if line_uuids is None else line_uuids
+        )
+    
+    @_with_pages_lock
     def remove_table(
         self,
         top_left: tuple[_typing.T_num, _typing.T_num],
@@ -535,15 +842,29 @@ class TableDetectorWorkspace:
         page_index: int
     ) -> 'TableDetectorWorkspace':
         
-        (x0, y0), (x1, y1) = top_left, bottom_right
-        self.remove_lines([x0, x1, *vlines], 'vertical', page_index)
-        self.remove_lines([y0, y1, *hlines], 'horizontal', page_index)
+        if self.pdf_file.image is None:
+            raise ValueError('Image has not been set, therefore, the table cannot be removed.')
+        
+        page_wrapper = self.pdf_file.pages[page_index]
+        explicit_table = self._get_explicit_table(top_left, bottom_right, vlines, hlines)
+        
+        if explicit_table in page_wrapper.explicit_tables:
+            explicit_table = page_wrapper.explicit_tables.pop(page_wrapper.explicit_tables.index(explicit_table))
+            for uuid in explicit_table.line_uuids:
+                if uuid in [line.uuid for line in page_wrapper.explicit_lines]:
+                    self.remove_line(uuid, page_index)
+        else:
+            (x0, y0), (x1, y1) = top_left, bottom_right
+            self.remove_lines([x0, x1, *vlines], 'vertical', page_index)
+            self.remove_lines([y0, y1, *hlines], 'horizontal', page_index)
         
         return self
     
+    @_with_pages_lock
     def remove_all_elements(self, page_index: int) -> 'TableDetectorWorkspace':
         
         self.pdf_file.pages[page_index].explicit_lines = []
+        self.pdf_file.pages[page_index].explicit_tables = []
         
         self.set_table_settings_val(page_index, f'explicit_vertical_lines', [])
         self.set_table_settings_val(page_index, f'explicit_horizontal_lines', [])
@@ -554,6 +875,7 @@ class TableDetectorWorkspace:
     #    SET & GET SETTINGS   #
     ###########################
     
+    @_with_pages_lock
     def set_table_settings_val(self, page_index: int | list[int] | Literal['all'], key: str, val: Any) -> 'TableDetectorWorkspace':
 
         if isinstance(page_index, int):
@@ -594,16 +916,260 @@ class TableDetectorWorkspace:
         
     def get_table_settings(self, page_index: int) -> TypedObservableDict:
         return self.pdf_file.pages[page_index].table_settings
+
+    def auto_tune_table_settings(
+        self,
+        page_numbers: list[int],
+        *,
+        time_budget: float = DEFAULT_TUNING_TIME_BUDGET,
+        workers: int | None = None,
+        progress_callback: T_progress_callback | None = None
+    ) -> TuningResult:
+        """Search settings that extract transaction-like tables from the given pages (see
+        `TableSettingsTuner`), starting with the settings of the first one, and write the best
+        settings found into each page's `table_settings`. Explicit lines are left as they are.
+
+        Args:
+            - page_numbers (list[int]): indices of pages to tune the settings on
+            - time_budget (float, optional): seconds to search for. Defaults to DEFAULT_TUNING_TIME_BUDGET.
+            - workers (int | None, optional): number of processes evaluating the candidates; all
+            CPUs if not given. Pages not coming from one file on disk are evaluated in this process.
+            Defaults to None.
+            - progress_callback (T_progress_callback | None, optional): see `TableSettingsTuner.tune`.
+            Defaults to None.
+
+        Returns:
+            TuningResult: the best settings and their score
+        """
+        if not page_numbers:
+            raise ValueError('At least one page is required to tune table settings.')
+
+        with self.pages_lock:
+            # candidates are evaluated with the finder of the first page
+            tuner = TableSettingsTuner(workers, table_finder_backend=self.pdf_file.pages[page_numbers[0]].table_finder_backend)
+            pages = [self.pdf_file.pages[i].page for i in page_numbers]
+            settings = dict(self.get_table_settings(page_numbers[0]))
+            source_page_indices = [p.page_number - 1 for p in pages]
+
+            # worker processes reopen the file by its path, so all pages have to come from one
+            files = {(p.pdf.path, p.pdf.password) for p in pages}
+            path, password = files.pop() if len(files) == 1 else (None, None)
+        if path is not None:
+            result = tuner.tune(path, source_page_indices, settings, password, time_budget=time_budget, progress_callback=progress_callback)
+        else:
+            with self.pages_lock:
+                result = tuner.tune(None, source_page_indices, settings, pages=pages, time_budget=time_budget, progress_callback=progress_callback)
+
+        with self.pages_lock:
+            for i in page_numbers:
+                ts = self.get_table_settings(i)
+                for key, val in result.settings.items():
+                    if key not in ['explicit_vertical_lines', 'explicit_horizontal_lines'] and ts.get(key) != val:
+                        ts[key] = val
+
+        self.logger.debug(f'Tuned table settings of pages {page_numbers} (score {result.score:.2f}).')
+        return result
+
+    ###########################
+    #    TABLE PRESENCE SCAN  #
+    ###########################
+    
+    @_with_pages_lock
+    def get_table_score(self, page_index: int) -> float:
+        """Table likelihood of the page in range [0, 1]. The page is scanned on first call only."""
+        page_wrapper = self.pdf_file.pages[page_index]
+        if page_wrapper.table_score is None:
+            _page = page_wrapper.page
+            pdfium_page = self._get_pdfium_pdf(_page.pdf)[_page.page_number - 1]
+            try:
+                page_wrapper.table_score = prescan_page(_page, pdfium_page).score
+            finally:
+                pdfium_page.close()
+        return page_wrapper.table_score
+    
+    @_with_pages_lock
+    def get_table_scores(self, page_numbers: list[int] | None = None) -> list[float]:
+        if page_numbers is None:
+            page_numbers = [*range(len(self.pdf_file.pages))]
+        return [self.get_table_score(i) for i in page_numbers]
+    
+    @_with_pages_lock
+    def get_pages_by_table_score(self, page_numbers: list[int] | None = None) -> list[int]:
+        """Page indices ordered from the most to the least likely to contain a table."""
+        if page_numbers is None:
+            page_numbers = [*range(len(self.pdf_file.pages))]
+        return sorted(page_numbers, key=self.get_table_score, reverse=True)
+    
+    def is_table_page(self, page_index: int) -> bool:
+        """Whether the page passes `table_score_threshold`. Pages with explicit lines (e.g. drawn by
+        the user) are never skipped.
+        """
+        if self.table_score_threshold is None:
+            return True
+        
+        table_settings = self.pdf_file.pages[page_index].table_settings
+        if 'explicit' in [table_settings.get('vertical_strategy'), table_settings.get('horizontal_strategy')] \
+                or table_settings.get('explicit_vertical_lines') or table_settings.get('explicit_horizontal_lines'):
+            return True
+        
+        return self.get_table_score(page_index) >= self.table_score_threshold
     
     ###########################
     #   GET TABLE TEXT DATA   #
     ###########################
     
-    def get_tables_text(self, page_numbers: list[int]) -> list[list[list[str | None]]]:
+    def get_tables_text(self, page_numbers: list[int], *, workers: int | None = None) -> list[list[list[str | None]]]:
+        """Extract text of all tables found on the given pages. Pages scoring below
+        `table_score_threshold` are skipped. On pages with tables drawn by the user (see `add_table`)
+        only those tables are extracted, see `_get_explicit_tables_text`.
+
+        Args:
+            - page_numbers (list[int]): indices of pages to extract tables from
+            - workers (int | None, optional): When greater than 1, pages are parsed in that many
+            processes (see `ParallelTableExtractor`). Defaults to None.
+
+        Returns:
+            list[list[list[str | None]]]: tables in the order of `page_numbers`
+        """
+        table_page_numbers = [i for i in page_numbers if self.is_table_page(i)]
+        if len(table_page_numbers) < len(page_numbers):
+            self.logger.debug(f'Skipping pages {sorted(set(page_numbers) - set(table_page_numbers))} scoring below {self.table_score_threshold}.')
+        page_numbers = table_page_numbers
+        
+        pages_tables: dict[int, list[list[list[str | None]]]] = {}
+        with self.pages_lock:
+            for i in page_numbers:
+                if self.pdf_file.pages[i].explicit_tables:
+                    pages_tables[i] = self._get_explicit_tables_text(i)
+        
+        detect_page_numbers = [i for i in page_numbers if i not in pages_tables]
+        if workers is not None and workers > 1:
+            pages_tables.update(zip(detect_page_numbers, self._get_pages_tables_in_parallel(detect_page_numbers, workers)))
+        else:
+            with self.pages_lock:
+                pages_tables.update({i: self.pdf_file.pages[i].extract_tables() for i in detect_page_numbers})
+        
         tables_text = []
         for i in page_numbers:
-            tables_text += self.pdf_file.pages[i].page.extract_tables(self.pdf_file.pages[i].table_settings)
+            tables_text += pages_tables[i]
         return tables_text
     
-    def get_all_tables_text(self) -> list[list[list[str | None]]]:
-        return self.get_tables_text([i for i in range(len(self.pdf_file.pages))])
+    def _get_explicit_tables_text(self, page_index: int) -> list[list[list[str | None]]]:
+        """Text of the tables drawn on the page. Each table is found on the page cropped to its bbox,
+        with the page's settings but only the table's own lines - so it takes time proportional to
+        the table's area and text around it (headers, footers...) can't make up cells.
+        """
+        page_wrapper = self.pdf_file.pages[page_index]
+        _page = page_wrapper.page
+        p_x0, p_top, p_x1, p_bottom = _page.bbox
+        
+        tables = []
+        for explicit_table in page_wrapper.explicit_tables:
+            x0, top, x1, bottom = explicit_table.bbox
+            bbox = (max(x0, p_x0), max(top, p_top), min(x1, p_x1), min(bottom, p_bottom))
+            if bbox[0] >= bbox[2] or bbox[1] >= bbox[3]:
+                self.logger.debug(f'Table {explicit_table.bbox} is outside of page {page_index}.')
+                continue
+            
+            finder = table_finder_class(page_wrapper.table_finder_backend)(_page.crop(bbox), {
+                **page_wrapper.table_settings,
+                'explicit_vertical_lines': [x0, *explicit_table.vlines, x1],
+                'explicit_horizontal_lines': [top, *explicit_table.hlines, bottom]
+            })
+            tables += [t.extract(**(finder.settings.text_settings or {})) for t in finder.tables]
+        
+        return tables
+    
+    def get_all_tables_text(self, *, workers: int | None = None) -> list[list[list[str | None]]]:
+        return self.get_tables_text([i for i in range(len(self.pdf_file.pages))], workers=workers)
+    
+    @_with_pages_lock
+    def get_words_in_bbox(self, page_index: int, bbox: T_bbox, *, strict: bool = True) -> list[dict[str, Any]]:
+        """Words of the page within the bbox (x0, top, x1, bottom) given in PDF points."""
+        return self.pdf_file.pages[page_index].spatial_index.words_in_bbox(bbox, strict=strict)
+    
+    @_with_pages_lock
+    def get_cells_text(self, page_index: int, vlines: list[_typing.T_num], hlines: list[_typing.T_num]) -> list[list[str]]:
+        """Text of cells of a table made of the given lines (positions in PDF points). Like in
+        pdfplumber, a character belongs to the cell its centre is in. Only the characters within
+        each cell are looked up (see `PDFPageWrapper.spatial_index`), so the page is not rescanned
+        for every cell.
+
+        Returns:
+            list[list[str]]: rows of cells' text
+        """
+        spatial_index = self.pdf_file.pages[page_index].spatial_index
+        xs, ys = sorted(vlines), sorted(hlines)
+        
+        return [
+            [
+                utils.extract_text(spatial_index.chars_in_bbox((x0, top, x1, bottom), strict=False))
+                for x0, x1 in zip(xs, xs[1:])
+            ]
+            for top, bottom in zip(ys, ys[1:])
+        ]
+    
+    @_with_pages_lock
+    def get_text_gaps(
+        self,
+        page_index: int,
+        bbox: T_bbox,
+        orientation: Literal['vertical', 'horizontal'],
+        min_gap: _typing.T_num = 2
+    ) -> list[float]:
+        """Centres of gaps between columns (vertical) or rows (horizontal) of text within the bbox
+        - positions where a table line can be snapped to without cutting through text.
+
+        Args:
+            - page_index (int): index of the page
+            - bbox (T_bbox): region of the page in PDF points
+            - orientation (Literal['vertical', 'horizontal']): orientation of the lines
+            - min_gap (T_num, optional): gaps narrower than that (in points) are ignored. Defaults to 2.
+
+        Returns:
+            list[float]: positions (in PDF points) of the gaps' centres
+        """
+        spatial_index = self.pdf_file.pages[page_index].spatial_index
+        if orientation == 'vertical':
+            origin, projection = bbox[0], spatial_index.column_projection(bbox)
+        else:
+            origin, projection = bbox[1], spatial_index.row_projection(bbox)
+        
+        gaps, start = [], None
+        for i, count in enumerate([*projection, 1]):
+            if count == 0 and start is None:
+                start = i
+            elif count != 0 and start is not None:
+                if i - start >= min_gap and start > 0 and i < len(projection):
+                    gaps.append(origin + (start + i) / 2)
+                start = None
+        return gaps
+    
+    def _get_pages_tables_in_parallel(self, page_numbers: list[int], workers: int) -> list[list[list[list[str | None]]]]:
+        """Pages are grouped by the file they come from and each group is handed over to
+        `ParallelTableExtractor`. Pages not backed by a file on disk are processed in this process.
+        """
+        pages_tables: dict[int, list[list[list[str | None]]]] = {}
+        
+        # (path, password, backend) -> [(index in workspace, index in the source file, settings)]
+        files: dict[tuple[str, str | None, T_table_finder_backend], list[tuple[int, int, dict]]] = {}
+        with self.pages_lock:
+            for i in page_numbers:
+                p = self.pdf_file.pages[i]
+                if p.page.pdf.path is None:
+                    pages_tables[i] = p.extract_tables()
+                else:
+                    files.setdefault(
+                        (str(p.page.pdf.path), p.page.pdf.password, p.table_finder_backend), []
+                    ).append((i, p.page.page_number - 1, dict(p.table_settings)))
+        
+        extractor = ParallelTableExtractor(workers)
+        for (path, password, backend), tasks in files.items():
+            self.logger.debug(f'Extracting tables from {len(tasks)} pages of {path} in parallel.')
+            for (i, _, _), page_tables in zip(
+                tasks,
+                extractor.extract_tables(path, [t[1] for t in tasks], [t[2] for t in tasks], password, table_finder_backend=backend)
+            ):
+                pages_tables[i] = page_tables
+        
+        return [pages_tables[i] for i in page_numbers]
@@ -0,0 +1,156 @@
+from collections import Counter
+import ctypes
+from dataclasses import dataclass
+import re
+from typing import Generator
+
+from pdfplumber import page
+import pypdfium2
+import pypdfium2.raw as pdfium_c
+
+from budgeting_app.pdf_table_reader.core.usecases.page_tiles import open_pdfium_document
+
+
+DEFAULT_TABLE_SCORE_THRESHOLD = 0.2
+
+# number of ruling objects (lines, rects) / aligned numeric words at which the score saturates
+RULING_SATURATION = 20
+NUMERIC_SATURATION = 15
+
+# a numeric word belongs to a column if at least that many numeric words share its right edge
+MIN_COLUMN_SIZE = 3
+COLUMN_X_TOLERANCE = 3
+
+# nesting of form XObjects the ruling is looked for in
+MAX_FORM_DEPTH = 15
+
+# (left, bottom, right, top) in PDF coordinates
+T_bbox = tuple[float, float, float, float]
+
+NUMERIC_WORD_PATTERN = re.compile(r'^[-+(]?[£$€]?\d[\d,]*(\.\d+)?\)?(CR|DR)?$')
+
+
+@dataclass
+class TablePrescanResult:
+    """
+        - score: `float` - table likelihood in range [0, 1]
+        - line_count: `int` - number of line objects on the page
+        - rect_count: `int` - number of rect objects on the page
+        - numeric_word_count: `int` - number of words that look like numbers or amounts
+        - aligned_numeric_word_count: `int` - numeric words that line up in columns
+    """
+    score: float
+    line_count: int
+    rect_count: int
+    numeric_word_count: int
+    aligned_numeric_word_count: int
+
+
+def _path_shape(path: pypdfium2.PdfObject) -> tuple[str | None, T_bbox]:
+    """What pdfminer makes of the path - 'line' or 'rect' (see `LTLine`, `LTRect`) or None for
+    curves, and its bbox (pdfium's bounds take the line width in).
+    """
+    matrix = path.get_matrix()
+    points, is_curve = [], False
+    for i in range(pdfium_c.FPDFPath_CountSegments(path.raw)):
+        segment = pdfium_c.FPDFPath_GetPathSegment(path.raw, i)
+        is_curve |= pdfium_c.FPDFPathSegment_GetType(segment) == pdfium_c.FPDF_SEGMENT_BEZIERTO
+        x, y = ctypes.c_float(), ctypes.c_float()
+        pdfium_c.FPDFPathSegment_GetPoint(segment, x, y)
+        points.append(matrix.on_point(x.value, y.value))
+
+    xs, ys = [x for x, _ in points] or [0], [y for _, y in points] or [0]
+    bbox = min(xs), min(ys), max(xs), max(ys)
+
+    if is_curve:
+        return None, bbox
+    if len(points) == 2:
+        return 'line', bbox
+    if len(points) in [4, 5] and all(abs(a[0] - b[0]) < 1e-3 or abs(a[1] - b[1]) < 1e-3 for a, b in zip(points, points[1:] + points[:1])):
+        return 'rect', bbox
+    return None, bbox
+
+
+def _iter_words(textpage: pypdfium2.PdfTextPage) -> Generator[tuple[str, T_bbox], None, None]:
+    """Words of the page as pdfium separates them (it inserts spaces and line breaks between
+    characters that are apart), which is a lot cheaper than `page.Page.extract_words`.
+
+    Yields:
+        tuple[str, T_bbox]: text of the word and its (left, bottom, right, top) in PDF coordinates
+    """
+    text = textpage.get_text_range()
+    if len(text) != textpage.count_chars():
+        # characters outside of the BMP take two places in the text - there's no telling which
+        # character a position belongs to
+        return
+
+    for match in re.finditer(r'\S+', text):
+        left, bottom, _, top = textpage.get_charbox(match.start())
+        _, last_bottom, right, last_top = textpage.get_charbox(match.end() - 1)
+        yield match.group(), (left, min(bottom, last_bottom), right, max(top, last_top))
+
+
+def prescan_page(_page: page.Page, pdfium_page: pypdfium2.PdfPage | None = None) -> TablePrescanResult:
+    """Score the page for table likelihood from its raw objects only - ruling (lines and rects)
+    and numeric words aligned in columns, such as amounts and balances on a statement. Either
+    of the two makes a table likely, so the score is their probabilistic sum.
+
+    The objects are read by pdfium - parsing them with pdfminer (`_page.objects`) would take about
+    as long as finding the tables, i.e. nothing would be saved on the pages that are skipped. Only
+    objects within the bbox of the page count (e.g. of a cropped one).
+
+    Args:
+        - _page (page.Page): pdfplumber page
+        - pdfium_page (pypdfium2.PdfPage | None, optional): the same page opened with pdfium (e.g.
+        from a document shared with `PageTiles`); opened from `_page.pdf` if not given. Defaults to None.
+
+    Returns:
+        TablePrescanResult: the score and the counts it has been derived from
+    """
+    if pdfium_page is None:
+        pdfium_pdf = open_pdfium_document(_page.pdf)
+        try:
+            return prescan_page(_page, pdfium_pdf[_page.page_number - 1])
+        finally:
+            pdfium_pdf.close()
+
+    # pdfplumber measures from the top left corner of the mediabox, pdfium from the bottom left
+    mediabox_left, _, _, mediabox_top = pdfium_page.get_mediabox()
+    x0, top, x1, bottom = _page.bbox
+
+    def within_page(bbox: T_bbox) -> bool:
+        left, _bottom, right, _top = bbox
+        return left - mediabox_left <= x1 and right - mediabox_left >= x0 \
+            and mediabox_top - _top <= bottom and mediabox_top - _bottom >= top
+
+    path_kinds = Counter(
+        kind
+        for kind, bbox in map(_path_shape, pdfium_page.get_objects(filter=[pdfium_c.FPDF_PAGEOBJ_PATH], max_depth=MAX_FORM_DEPTH))
+        if within_page(bbox)
+    )
+    line_count = path_kinds['line']
+    rect_count = path_kinds['rect']
+
+    textpage = pdfium_page.get_textpage()
+    try:
+        numeric_words_x1 = [
+            bbox[2] - mediabox_left
+            for text, bbox in _iter_words(textpage)
+            if NUMERIC_WORD_PATTERN.match(text) and within_page(bbox)
+        ]
+    finally:
+        textpage.close()
+
+    columns = Counter(round(x1 / COLUMN_X_TOLERANCE) for x1 in numeric_words_x1)
+    aligned_numeric_word_count = sum(n for n in columns.values() if n >= MIN_COLUMN_SIZE)
+
+    ruling = min(1.0, (line_count + rect_count) / RULING_SATURATION)
+    numeric = min(1.0, aligned_numeric_word_count / NUMERIC_SATURATION)
+
+    return TablePrescanResult(
+        score=1 - (1 - ruling) * (1 - numeric),
+        line_count=line_count,
+        rect_count=rect_count,
+        numeric_word_count=len(numeric_words_x1),
+        aligned_numeric_word_count=aligned_numeric_word_count
+    )
@@ -0,0 +1,357 @@
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+import logging
+import os
+import re
+import time
+from typing import Any, Callable
+
+import pdfplumber
+from pdfplumber import page, table
+
+from budgeting_app.utils.types import T_pdf_file_path
+from budgeting_app.utils.logging import CustomLoggerAdapter
+from budgeting_app.pdf_table_reader.core.entities.models import T_table_finder_backend, table_finder_class, table_settings_hash
+from budgeting_app.pdf_table_reader.core.entities.table_finder import T_base_edges, base_edges_key
+from budgeting_app.pdf_table_reader.core.usecases.table_prescan import NUMERIC_WORD_PATTERN
+
+
+DEFAULT_TUNING_TIME_BUDGET = 30.0
+
+# '03 MAY', '18 JUL 2023', '18/07/2023', '18-07-23', '2023-07-18'
+DATE_PATTERN = re.compile(
+    r'^(\d{1,2} ?[A-Za-z]{3,9}( ?\d{2,4})?|\d{1,2}[/.-]\d{1,2}[/.-]\d{2,4}|\d{4}-\d{2}-\d{2})$'
+)
+
+# tables with fewer non-empty rows don't count
+MIN_TABLE_ROWS = 2
+
+# tolerances tuned together with their x/y variants
+TOLERANCE_PREFIXES = ['snap', 'join', 'intersection', 'text']
+STRATEGIES = [('lines', 'lines'), ('lines', 'text'), ('text', 'lines'), ('text', 'text')]
+COARSE_TOLERANCES = [1, 3, 6]
+
+# values visited by the local refinement, from one to its neighbours
+REFINED_VALUES = {
+    **{prefix + '_tolerance': [0.5, 1, 2, 3, 4, 6, 8] for prefix in TOLERANCE_PREFIXES},
+    'edge_min_length': [1, 3, 6, 10, 20],
+    'min_words_vertical': [1, 2, 3, 4, 6],
+    'min_words_horizontal': [1, 2, 3]
+}
+# parameters that don't matter unless words are used to find edges
+TEXT_STRATEGY_PARAMETERS = ['min_words_vertical', 'min_words_horizontal']
+
+
+T_settings = dict[str, Any]
+T_progress_callback = Callable[[int, float, float], None]
+
+
+def _normalise_cell(cell: str | None) -> str:
+    return ' '.join((cell or '').split())
+
+
+def score_transaction_tables(tables: list[list[list[str | None]]]) -> float:
+    """Score tables by how well they fit transaction rows - a column of dates, amounts in each row
+    and the same number of filled cells in most rows. Each table contributes its number of rows with
+    an amount scaled by the share of dates among the filled cells of its best date column (dates are
+    often given only for the first transaction of a day) and the share of rows with the most common
+    number of filled cells - so it is roughly the number of rows that look like transactions. Rows
+    merged into one (several lines per cell) don't parse as dates or amounts and so score nothing.
+
+    Args:
+        - tables (list[list[list[str | None]]]): extracted tables
+
+    Returns:
+        float: the score; higher is better
+    """
+    score = 0.0
+    for _table in tables:
+        rows = [[_normalise_cell(cell) for cell in row] for row in _table]
+        rows = [row for row in rows if any(row)]
+        if len(rows) < MIN_TABLE_ROWS:
+            continue
+
+        column_count = max(len(row) for row in rows)
+        date_counts, filled_counts = [0] * column_count, [0] * column_count
+        amount_rows = 0
+        for row in rows:
+            for i, cell in enumerate(row):
+                filled_counts[i] += bool(cell)
+                # a date split into day and month columns counts for the first one
+                if DATE_PATTERN.match(cell) or (i + 1 < len(row) and DATE_PATTERN.match(f'{cell} {row[i + 1]}')):
+                    date_counts[i] += 1
+            if any(NUMERIC_WORD_PATTERN.match(cell) for cell in row):
+                amount_rows += 1
+
+        date_column = max(range(column_count), key=lambda i: date_counts[i])
+        if date_counts[date_column] == 0:
+            continue
+        row_lengths = Counter(sum(1 for cell in row if cell) for row in rows)
+
+        score += amount_rows \
+            * date_counts[date_column] / filled_counts[date_column] \
+            * row_lengths.most_common(1)[0][1] / len(rows)
+    return score
+
+
+def _extract_tables(
+    _page: page.Page,
+    settings: T_settings,
+    base_edges: dict[str, T_base_edges],
+    table_finder_backend: T_table_finder_backend = 'python'
+) -> list[list[list[str | None]]]:
+    """Find tables reusing edges derived from the page by previous candidates with the same
+    strategies and text settings (see `IncrementalTableFinder`).
+    """
+    key = base_edges_key(table.TableSettings.resolve(settings))
+    finder = table_finder_class(table_finder_backend)(_page, settings, base_edges.get(key))
+    base_edges[key] = finder.base_edges
+    return [t.extract(**(finder.settings.text_settings or {})) for t in finder.tables]
+
+
+####################################
+#          WORKER PROCESS          #
+####################################
+
+# the file opened in a worker process along with the edges found on its pages
+_worker_pdf: pdfplumber.PDF | None = None
+_worker_base_edges: dict[int, dict[str, T_base_edges]] = {}
+_worker_table_finder_backend: T_table_finder_backend = 'python'
+
+
+def _init_worker(filepath: T_pdf_file_path, password: str | None, table_finder_backend: T_table_finder_backend = 'python') -> None:
+    global _worker_pdf, _worker_table_finder_backend
+    _worker_pdf = pdfplumber.open(filepath, password=password)
+    _worker_table_finder_backend = table_finder_backend
+    _worker_base_edges.clear()
+
+
+def _score_page(page_index: int, settings: T_settings) -> float:
+    """Runs in a worker process. Extract tables from the page of the file opened by `_init_worker`
+    and score them (see `score_transaction_tables`).
+    """
+    tables = _extract_tables(
+        _worker_pdf.pages[page_index],
+        settings,
+        _worker_base_edges.setdefault(page_index, {}),
+        _worker_table_finder_backend
+    )
+    return score_transaction_tables(tables)
+
+
+def _terminate_workers(executor: ProcessPoolExecutor) -> None:
+    """Shut the pool down without waiting for the evaluations still running - they are of no use
+    once out of time - and kill its processes, so that they don't keep the CPUs busy after the
+    budget. (`ProcessPoolExecutor.terminate_workers` is there only from Python 3.14.)
+    """
+    processes = list((executor._processes or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+
+
+####################################
+#              TUNER               #
+####################################
+
+@dataclass
+class TuningResult:
+    """
+        - settings: `dict[str, Any]` - best table settings found
+        - score: `float` - sum of scores of the pages (see `score_transaction_tables`)
+        - evaluated: `int` - number of candidate settings evaluated on all pages
+        - elapsed: `float` - time taken in seconds
+    """
+    settings: T_settings
+    score: float
+    evaluated: int
+    elapsed: float
+
+
+class TableSettingsTuner:
+    """Search table settings that extract transaction-like tables from the given pages (see
+    `score_transaction_tables`). Starts with the given settings and a coarse grid of strategies and
+    tolerances, then refines the best candidate one parameter at a time - all neighbouring values
+    (see `REFINED_VALUES`) are tried and the best improvement is taken, until none improves the score
+    or the time budget runs out. Each candidate is evaluated on every page, one page per task in a
+    pool of processes; each worker opens the file once and reuses the edges it derived from a page
+    for candidates with the same strategies. Tables are found with the finder of
+    `table_finder_backend` (see `table_finder_class`).
+
+    Example:
+        ```
+        tuner = TableSettingsTuner()
+        result = tuner.tune(filepath, [1, 2], page_wrapper.table_settings, time_budget=10)
+        ```
+    """
+    workers: int
+    table_finder_backend: T_table_finder_backend
+    logger: logging.LoggerAdapter
+
+    def __init__(self, workers: int | None = None, *, table_finder_backend: T_table_finder_backend = 'python') -> None:
+        self.logger = CustomLoggerAdapter.getLogger('pdf_table_reader', className='TableSettingsTuner')
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.table_finder_backend = table_finder_backend
+
+    @staticmethod
+    def _with(settings: T_settings, key: str, val: Any) -> T_settings:
+        """Copy of the settings with the value set; tolerances are set along with their x/y variants."""
+        settings = dict(settings)
+        settings[key] = val
+        if key[:-len('_tolerance')] in TOLERANCE_PREFIXES:
+            settings[key.replace('_tolerance', '_x_tolerance')] = val
+            settings[key.replace('_tolerance', '_y_tolerance')] = val
+        return settings
+
+    @classmethod
+    def coarse_candidates(cls, settings: T_settings) -> list[T_settings]:
+        candidates = [dict(settings)]
+        for vertical_strategy, horizontal_strategy in STRATEGIES:
+            for tolerance in COARSE_TOLERANCES:
+                candidate = {**settings, 'vertical_strategy': vertical_strategy, 'horizontal_strategy': horizontal_strategy}
+                for prefix in TOLERANCE_PREFIXES:
+                    candidate = cls._with(candidate, prefix + '_tolerance', tolerance)
+                candidates.append(candidate)
+        return candidates
+
+    @classmethod
+    def neighbour_candidates(cls, settings: T_settings) -> list[T_settings]:
+        uses_text = 'text' in (settings.get('vertical_strategy'), settings.get('horizontal_strategy'))
+
+        candidates = []
+        for key, values in REFINED_VALUES.items():
+            if key in TEXT_STRATEGY_PARAMETERS and not uses_text:
+                continue
+
+            # position of the current value on the ladder (or the closest one)
+            current = settings.get(key, values[0])
+            i = min(range(len(values)), key=lambda j: abs(values[j] - current))
+            for j in [i - 1, i, i + 1]:
+                if 0 <= j < len(values) and values[j] != current:
+                    candidates.append(cls._with(settings, key, values[j]))
+        return candidates
+
+    def tune(
+        self,
+        filepath: T_pdf_file_path | None,
+        page_indices: list[int],
+        table_settings: T_settings,
+        password: str | None = None,
+        *,
+        pages: list[page.Page] | None = None,
+        time_budget: float = DEFAULT_TUNING_TIME_BUDGET,
+        progress_callback: T_progress_callback | None = None
+    ) -> TuningResult:
+        """Find the best settings for the given pages of the file.
+
+        Args:
+            - filepath (T_pdf_file_path | None): path to the PDF file; the pages are reopened by
+            the worker processes
+            - page_indices (list[int]): indices of pages (in the file) to tune the settings on
+            - table_settings (T_settings): settings to start with; explicit lines are kept
+            - password (str | None, optional): Defaults to None.
+            - pages (list[page.Page] | None, optional): pages to evaluate in this process instead,
+            one for each of `page_indices` - e.g. if the file is not on disk. Defaults to None.
+            - time_budget (float, optional): seconds after which the best settings found so far
+            are returned; worker processes still evaluating candidates are terminated then.
+            Defaults to DEFAULT_TUNING_TIME_BUDGET.
+            - progress_callback (T_progress_callback | None, optional): called with the number of
+            evaluated candidates, the share of the time budget used and the best score so far after
+            each candidate. Defaults to None.
+
+        Returns:
+            TuningResult: the best settings; the given ones if nothing scored higher
+        """
+        start = time.monotonic()
+        deadline = start + time_budget
+        settings = {**table_settings}
+
+        if pages is None and filepath is None:
+            raise ValueError('Either filepath or pages have to be given.')
+
+        self.logger.debug(f'Tuning table settings on {len(page_indices)} pages with {self.workers} workers.')
+
+        executor, _pdf = None, None
+        if pages is None and self.workers > 1:
+            executor = ProcessPoolExecutor(
+                max_workers=min(self.workers, len(page_indices)),
+                initializer=_init_worker,
+                initargs=(filepath, password, self.table_finder_backend)
+            )
+        elif pages is None:
+            _pdf = pdfplumber.open(filepath, password=password)
+            pages = [_pdf.pages[i] for i in page_indices]
+        local_base_edges: list[dict[str, T_base_edges]] = [{} for _ in page_indices]
+
+        best, best_score, evaluated = settings, -1.0, 0
+        seen: set[str] = set()
+
+        def evaluate(candidates: list[T_settings]) -> bool:
+            """Score the candidates not seen before. Returns False once out of time."""
+            nonlocal best, best_score, evaluated
+            candidates = [c for c in candidates if table_settings_hash(c) not in seen]
+            seen.update(table_settings_hash(c) for c in candidates)
+
+            scores = [0.0] * len(candidates)
+            remaining = [len(page_indices)] * len(candidates)
+
+            def done(k: int) -> None:
+                nonlocal best, best_score, evaluated
+                evaluated += 1
+                # ties are resolved in favour of the earlier candidate (closer to the given settings)
+                if scores[k] > best_score:
+                    best, best_score = candidates[k], scores[k]
+                if progress_callback is not None:
+                    progress_callback(evaluated, min(1.0, (time.monotonic() - start) / time_budget), best_score)
+
+            if executor is None:
+                for k, candidate in enumerate(candidates):
+                    for p, _page in enumerate(pages):
+                        if time.monotonic() > deadline:
+                            return False
+                        scores[k] += score_transaction_tables(
+                            _extract_tables(_page, candidate, local_base_edges[p], self.table_finder_backend)
+                        )
+                    done(k)
+                return True
+
+            futures: dict[Future, int] = {
+                executor.submit(_score_page, page_index, candidate): k
+                for k, candidate in enumerate(candidates)
+                for page_index in page_indices
+            }
+            pending = set(futures)
+            while pending:
+                finished, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    k = futures[future]
+                    scores[k] += future.result()
+                    remaining[k] -= 1
+                    if remaining[k] == 0:
+                        done(k)
+                if pending and time.monotonic() > deadline:
+                    for future in pending:
+                        future.cancel()
+                    return False
+            return True
+
+        in_time = False
+        try:
+            in_time = evaluate(self.coarse_candidates(settings))
+            while in_time:
+                previous_best = best
+                in_time = evaluate(self.neighbour_candidates(best))
+                if best is previous_best:
+                    break
+        finally:
+            if executor is not None and in_time:
+                executor.shutdown(wait=False)
+            elif executor is not None:
+                _terminate_workers(executor)
+            if _pdf is not None:
+                _pdf.close()
+
+        elapsed = time.monotonic() - start
+        self.logger.debug(f'Evaluated {evaluated} candidates in {elapsed:.1f}s, best score {best_score:.2f}.')
+        return TuningResult(settings=best, score=max(best_score, 0.0), evaluated=evaluated, elapsed=elapsed)
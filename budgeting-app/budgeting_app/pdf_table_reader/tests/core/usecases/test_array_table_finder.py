@@ -0,0 +1,84 @@
+import importlib.util
+from pathlib import Path
+import unittest
+
+from pdfplumber import open as pdf_open
+
+from budgeting_app.pdf_table_reader.core.entities.models import table_finder_class
+from budgeting_app.pdf_table_reader.core.usecases.table_detector_workspace import DEFAULT_TABLE_SETTINGS
+
+
+@unittest.skipUnless(importlib.util.find_spec('numpy'), 'requires NumPy')
+class TestArrayTableFinder(unittest.TestCase):
+    def setUp(self) -> None:
+        self.test_data_path = Path(__file__).resolve().parent.parent.parent / 'data'
+        self.ArrayTableFinder = table_finder_class('numpy')
+
+    def assertSameTables(self, expected, actual) -> None:
+        # edges from the page carry more than their geometry, explicit ones lack either width or height
+        def geometry(edges):
+            return [{k: e[k] for k in ['x0', 'top', 'x1', 'bottom', 'width', 'height', 'orientation'] if k in e} for e in edges]
+
+        self.assertEqual(geometry(expected.edges), [{k: a[k] for k in e} for e, a in zip(geometry(expected.edges), actual.edges)])
+        self.assertEqual(len(expected.edges), len(actual.edges))
+        self.assertEqual(list(expected.intersections), list(actual.intersections))
+        self.assertEqual(expected.cells, actual.cells)
+        self.assertEqual([t.extract() for t in expected.tables], [t.extract() for t in actual.tables])
+
+    def test_same_as_table_finder(self) -> None:
+        strategies = [('lines', 'lines'), ('text', 'text'), ('lines', 'text'), ('explicit', 'lines')]
+        for path in sorted(self.test_data_path.glob('*.pdf')):
+            with pdf_open(path) as pdf:
+                for _page in pdf.pages:
+                    for (vertical_strategy, horizontal_strategy), snap_tolerance in zip(strategies * 2, [3] * 4 + [0] * 4):
+                        settings = {
+                            **DEFAULT_TABLE_SETTINGS,
+                            'vertical_strategy': vertical_strategy,
+                            'horizontal_strategy': horizontal_strategy,
+                            'snap_tolerance': snap_tolerance,
+                            'explicit_vertical_lines': [100, 300.5],
+                            'explicit_horizontal_lines': [200, 201.5]
+                        }
+                        with self.subTest(path=path.name, page=_page.page_number, settings=settings):
+                            self.assertSameTables(_page.debug_tablefinder(settings), self.ArrayTableFinder(_page, settings))
+
+    def test_edges_of_one_orientation(self) -> None:
+        with pdf_open(self.test_data_path / 'single_page_sample.pdf') as pdf:
+            _page = pdf.pages[0]
+            band = _page.crop((0, 0, _page.width, 20))
+            cases = [
+                (band, {'vertical_strategy': 'explicit', 'explicit_vertical_lines': [100, 200, 300], 'horizontal_strategy': 'lines'}),
+                (_page.crop((60, 325, 100, 340)), {'vertical_strategy': 'lines', 'horizontal_strategy': 'lines'}),
+                (band, {'vertical_strategy': 'lines', 'horizontal_strategy': 'explicit', 'explicit_horizontal_lines': [5, 10]})
+            ]
+            for _p, settings in cases:
+                settings = {**DEFAULT_TABLE_SETTINGS, **settings}
+                with self.subTest(settings=settings):
+                    expected = _p.debug_tablefinder(settings)
+                    self.assertEqual(1, len({e['orientation'] for e in expected.edges}))
+                    self.assertSameTables(expected, self.ArrayTableFinder(_p, settings))
+
+    def test_many_segments(self) -> None:
+        # ruling made of short dashes, each line snapped and joined from dozens of segments
+        with pdf_open(self.test_data_path / 'single_page_sample.pdf') as pdf:
+            _page = pdf.pages[0]
+            settings = {
+                **DEFAULT_TABLE_SETTINGS,
+                'vertical_strategy': 'explicit',
+                'horizontal_strategy': 'explicit',
+                'explicit_vertical_lines': [
+                    {'x0': x + (i % 3) * 0.5, 'x1': x + (i % 3) * 0.5, 'top': 100 + i * 4, 'bottom': 103 + i * 4, 'width': 0, 'height': 3, 'object_type': 'line'}
+                    for x in range(50, 550, 50) for i in range(100)
+                ],
+                'explicit_horizontal_lines': [
+                    {'x0': 50 + i * 5, 'x1': 54 + i * 5, 'top': y - (i % 2), 'bottom': y - (i % 2), 'width': 4, 'height': 0, 'object_type': 'line'}
+                    for y in range(100, 500, 20) for i in range(100)
+                ]
+            }
+            expected = _page.debug_tablefinder(settings)
+            self.assertGreater(len(expected.cells), 100)
+            self.assertSameTables(expected, self.ArrayTableFinder(_page, settings))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import mmap
+from pathlib import Path
+import tempfile
+import unittest
+from unittest import mock
+
+from budgeting_app.pdf_table_reader.core.entities.models import RawImage, RAW_IMAGE_FORMAT
+from budgeting_app.pdf_table_reader.core.usecases.pdf_reader import PDFReader
+from budgeting_app.pdf_table_reader.core.usecases.disk_render_cache import DiskRenderCache, map_raw_image
+from budgeting_app.pdf_table_reader.core.usecases.table_detector_workspace import TableDetectorWorkspace
+
+
+class TestDiskRenderCache(unittest.TestCase):
+    def setUp(self) -> None:
+        test_data_path = Path(__file__).resolve().parent.parent.parent / 'data'
+        self.multiple_pages_sample_pdf_filepath = str(test_data_path / 'multiple_pages_sample.pdf')
+
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.disk_render_cache = DiskRenderCache(self.cache_dir.name)
+
+    def tearDown(self) -> None:
+        self.cache_dir.cleanup()
+
+    def open_workspace(self, _format: str) -> TableDetectorWorkspace:
+        workspace = TableDetectorWorkspace(
+            PDFReader.open(self.multiple_pages_sample_pdf_filepath),
+            disk_render_cache=self.disk_render_cache
+        )
+        workspace.set_pdf_file_image(lazy=True, _format=_format)
+        return workspace
+
+    def test_raw_image_mapped(self) -> None:
+        image = RawImage(data=bytes(range(24)), size=(2, 4), stride=6)
+        key = DiskRenderCache.key('sha', 0, 100, False, RAW_IMAGE_FORMAT, None)
+        self.disk_render_cache.store(key, image)
+
+        cached = self.disk_render_cache.load(key, RAW_IMAGE_FORMAT)
+        self.assertIsInstance(cached.data, memoryview)
+        self.assertEqual(image, cached)
+        self.assertIsNone(self.disk_render_cache.load(DiskRenderCache.key('sha', 1, 100, False, RAW_IMAGE_FORMAT, None), RAW_IMAGE_FORMAT))
+
+    def test_invalid_raw_image_unmapped(self) -> None:
+        path = Path(self.cache_dir.name) / 'invalid.raster'
+        path.write_bytes(b'BRAW' + bytes(40))
+
+        mappings, real_mmap = [], mmap.mmap
+        def mmap_spy(*args, **kwargs):
+            mappings.append(real_mmap(*args, **kwargs))
+            return mappings[-1]
+
+        with mock.patch('budgeting_app.pdf_table_reader.core.usecases.disk_render_cache.mmap.mmap', side_effect=mmap_spy):
+            self.assertIsNone(map_raw_image(path, copy=False))
+        self.assertTrue(mappings[0].closed)
+
+    def test_raw_image_copied(self) -> None:
+        image = RawImage(data=bytes(range(24)), size=(2, 4), stride=6)
+        key = DiskRenderCache.key('sha', 0, 100, False, RAW_IMAGE_FORMAT, None)
+        self.disk_render_cache.store(key, image)
+
+        with mock.patch('budgeting_app.pdf_table_reader.core.usecases.disk_render_cache.MAP_RAW_IMAGES', False), \
+                mock.patch('budgeting_app.pdf_table_reader.core.usecases.disk_render_cache.mmap.mmap') as mmap_mock:
+            cached = self.disk_render_cache.load(key, RAW_IMAGE_FORMAT)
+        mmap_mock.assert_not_called()
+        self.assertEqual(image, cached)
+
+        # nothing holds the file
+        self.assertEqual(1, self.disk_render_cache.clear())
+
+    def test_key_depends_on_settings(self) -> None:
+        self.assertNotEqual(
+            DiskRenderCache.key('sha', 0, 100, False, 'PNG', {'snap_tolerance': 3}),
+            DiskRenderCache.key('sha', 0, 100, False, 'PNG', {'snap_tolerance': 4})
+        )
+        self.assertEqual(
+            DiskRenderCache.key('sha', 0, 100, False, 'png', {'snap_tolerance': 3, 'join_tolerance': 3}),
+            DiskRenderCache.key('sha', 0, 100, False, 'PNG', {'join_tolerance': 3, 'snap_tolerance': 3})
+        )
+
+    def test_not_rendered_in_next_session(self) -> None:
+        for _format in ['PNG', RAW_IMAGE_FORMAT]:
+            with self.subTest(_format=_format):
+                workspace = self.open_workspace(_format)
+                expected = workspace.get_page_image(1)
+                workspace.close()
+
+                workspace = self.open_workspace(_format)
+                with mock.patch('pdfplumber.page.Page.to_image') as to_image:
+                    actual = workspace.get_page_image(1)
+                to_image.assert_not_called()
+                self.assertEqual(expected, actual)
+                workspace.close()
+
+    def test_invalidate(self) -> None:
+        workspace = self.open_workspace('PNG')
+        workspace.get_page_image(0)
+        workspace.get_page_image(1)
+        file_sha = next(iter(workspace._file_shas.values()))
+        workspace.close()
+
+        self.assertEqual(0, self.disk_render_cache.invalidate(file_sha='other'))
+        self.assertEqual(2, self.disk_render_cache.invalidate(file_sha=file_sha))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+from pathlib import Path
+import tempfile
+import unittest
+from unittest import mock
+
+from budgeting_app.pdf_table_reader.core.entities.models import PDFFileWrapper, PDFPageWrapper
+from budgeting_app.pdf_table_reader.core.usecases.pdf_reader import PDFReader
+from budgeting_app.pdf_table_reader.core.usecases.table_detector_workspace import TableDetectorWorkspace
+from budgeting_app.pdf_table_reader.core.usecases.extraction_template import (
+    ExtractionTemplate,
+    TemplateLibrary,
+    extract_with_template,
+    DEFAULT_MATCH_THRESHOLD
+)
+
+
+class TestExtractionTemplate(unittest.TestCase):
+    def setUp(self) -> None:
+        test_data_path = Path(__file__).resolve().parent.parent.parent / 'data'
+        self.multiple_pages_sample_pdf_filepath = str(test_data_path / 'multiple_pages_sample.pdf')
+        self.two_tables_pdf_filepath = str(test_data_path / '2_tables_1_page.pdf')
+
+        self.templates_dir = tempfile.TemporaryDirectory()
+        self.library = TemplateLibrary(self.templates_dir.name)
+
+    def tearDown(self) -> None:
+        self.templates_dir.cleanup()
+
+    def save_templates(self) -> None:
+        workspace = TableDetectorWorkspace(PDFReader.open(self.two_tables_pdf_filepath))
+        workspace.set_pdf_file_image(lazy=True)
+        workspace.add_table((318, 435), (530, 605), [394.15, 457.9], [490.03, 547.03], 0)
+        self.library.save(ExtractionTemplate.from_workspace(workspace, 'drawn table', ['a', 'b', 'c']))
+        workspace.close()
+
+        workspace = TableDetectorWorkspace(PDFReader.open(self.multiple_pages_sample_pdf_filepath))
+        workspace.set_table_settings_val(1, 'vertical_strategy', 'text')
+        self.library.save(ExtractionTemplate.from_workspace(workspace, 'statement', ['date', 'description'], [1]))
+        workspace.close()
+
+    def test_layout_similarity(self) -> None:
+        pdf_file = PDFReader.open(self.multiple_pages_sample_pdf_filepath)
+        summary, transactions0, transactions1 = [PDFReader.layout_fingerprint(p) for p in pdf_file.pages[:3]]
+        pdf_file.close()
+
+        self.assertGreaterEqual(PDFReader.layout_similarity(transactions0, transactions1), DEFAULT_MATCH_THRESHOLD)
+        self.assertLess(PDFReader.layout_similarity(summary, transactions0), DEFAULT_MATCH_THRESHOLD)
+
+    def test_save_load(self) -> None:
+        self.save_templates()
+
+        template = self.library.load('drawn table')
+        self.assertEqual(['a', 'b', 'c'], template.column_schema)
+        self.assertEqual(8, len(template.pages[0].explicit_lines))
+        x0, top, x1, bottom = template.pages[0].explicit_tables[0]['bbox']
+        self.assertTrue(0 < x0 < x1 < 1 and 0 < top < bottom < 1)
+        self.assertEqual(['drawn table', 'statement'], [t.name for t in self.library.templates()])
+
+    def test_extract_with_template(self) -> None:
+        self.save_templates()
+
+        with mock.patch('pdfplumber.page.Page.to_image') as to_image:
+            actual = extract_with_template(self.two_tables_pdf_filepath, library=self.library)
+        to_image.assert_not_called()
+
+        self.assertEqual('drawn table', actual.template.name)
+        self.assertEqual([0], actual.page_indices)
+        self.assertEqual([[['1', '2', '3'], ['4', '5', '6'], ['7', '8', '9']]], actual.tables)
+
+    def test_apply_matching_pages_only(self) -> None:
+        self.save_templates()
+
+        workspace = TableDetectorWorkspace(PDFReader.open(self.multiple_pages_sample_pdf_filepath))
+        template = self.library.find(workspace.pdf_file)
+        self.assertEqual('statement', template.name)
+
+        applied = template.apply(workspace)
+        self.assertNotIn(0, applied)
+        self.assertIn(2, applied)
+        self.assertEqual('text', workspace.get_table_settings(2)['vertical_strategy'])
+        self.assertEqual('lines', workspace.get_table_settings(0)['vertical_strategy'])
+        workspace.close()
+
+    def test_cropped_page(self) -> None:
+        pdf_file = PDFReader.open(self.two_tables_pdf_filepath)
+        page = pdf_file.pages[0].page
+        # the drawn table is (318, 435, 530, 605)
+        crop_box = (300, 400, page.width, page.height)
+
+        workspace = TableDetectorWorkspace(PDFFileWrapper([PDFPageWrapper(page.crop(crop_box))]))
+        workspace.set_pdf_file_image(lazy=True)
+        workspace.add_table((318, 435), (530, 605), [394.15, 457.9], [490.03, 547.03], 0)
+        expected = workspace.get_all_tables_text()
+        template = ExtractionTemplate.from_workspace(workspace, 'drawn table', ['a', 'b', 'c'])
+
+        x0, top, x1, bottom = template.pages[0].explicit_tables[0]['bbox']
+        self.assertAlmostEqual(18 / (page.width - 300), x0)
+        self.assertAlmostEqual(35 / (page.height - 400), top)
+        self.assertTrue(0 < x0 < x1 < 1 and 0 < top < bottom < 1)
+
+        workspace = TableDetectorWorkspace(PDFFileWrapper([PDFPageWrapper(page.crop(crop_box))]))
+        template.pages[0].apply(workspace.pdf_file.pages[0])
+        for actual, bbox in zip(workspace.pdf_file.pages[0].explicit_tables[0].bbox, (318, 435, 530, 605)):
+            self.assertAlmostEqual(bbox, actual)
+        self.assertEqual([[['1', '2', '3'], ['4', '5', '6'], ['7', '8', '9']]], expected)
+        self.assertEqual(expected, workspace.get_all_tables_text())
+        pdf_file.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+from pathlib import Path
+import tempfile
+import unittest
+from uuid import uuid4
+
+from budgeting_app.pdf_table_reader.core.usecases.pdf_reader import PDFReader
+from budgeting_app.pdf_table_reader.core.usecases.fingerprint_index import PageFingerprintIndex
+
+
+class TestPageFingerprintIndex(unittest.TestCase):
+    def setUp(self) -> None:
+
+        self.test_data_path = Path(__file__).resolve().parent.parent.parent / 'data'
+
+        self.multiple_pages_sample_pdf_filepath = str(self.test_data_path / 'multiple_pages_sample.pdf')
+        self.single_page_sample_pdf_filepath = str(self.test_data_path / 'single_page_sample.pdf')
+
+        self.index_dir = tempfile.TemporaryDirectory()
+        self.fingerprint_index = PageFingerprintIndex(self.index_dir.name)
+        self.account_uuid = str(uuid4())
+
+    def tearDown(self) -> None:
+        self.index_dir.cleanup()
+
+    def test_fingerprint(self) -> None:
+        with PDFReader.open(self.multiple_pages_sample_pdf_filepath) as pdf_file0, \
+                PDFReader.open(self.single_page_sample_pdf_filepath) as pdf_file1:
+            fingerprints = [PDFReader.fingerprint(p) for p in pdf_file0.pages]
+
+            # the single page sample is the first page of the multiple pages one
+            self.assertEqual(fingerprints[0], PDFReader.fingerprint(pdf_file1.pages[0]))
+            self.assertEqual(len(fingerprints), len(set(fingerprints)))
+            self.assertEqual(fingerprints[1], pdf_file0.pages[1].fingerprint)
+
+    def test_skip_imported(self) -> None:
+        with PDFReader.open(self.single_page_sample_pdf_filepath) as pdf_file:
+            self.assertEqual(0, self.fingerprint_index.skip_imported(pdf_file, self.account_uuid))
+            self.fingerprint_index.mark_imported(pdf_file, self.account_uuid)
+
+        # index is read back from the disk
+        fingerprint_index = PageFingerprintIndex(self.index_dir.name)
+        with PDFReader.open(self.multiple_pages_sample_pdf_filepath) as pdf_file:
+            self.assertEqual(1, fingerprint_index.skip_imported(pdf_file, self.account_uuid))
+            self.assertEqual([1, 2, 3], [p.page_number for p in pdf_file.pages])
+
+            # other accounts are not affected
+            self.assertEqual(0, fingerprint_index.skip_imported(pdf_file, str(uuid4())))
+
+    def test_skip_repeated_pages_of_file(self) -> None:
+        pdf_file = PDFReader.open(self.multiple_pages_sample_pdf_filepath, pages=[0, 1])
+        pdf_file.pages = [*pdf_file.pages, *PDFReader.open(self.single_page_sample_pdf_filepath).pages]
+
+        self.assertEqual(1, self.fingerprint_index.skip_imported(pdf_file, self.account_uuid))
+        self.assertEqual(2, len(pdf_file.pages))
+
+    def test_clear(self) -> None:
+        self.fingerprint_index.add(self.account_uuid, ['abc'])
+        self.assertTrue(PageFingerprintIndex(self.index_dir.name).contains(self.account_uuid, 'abc'))
+
+        self.fingerprint_index.clear(self.account_uuid)
+        self.assertFalse(PageFingerprintIndex(self.index_dir.name).contains(self.account_uuid, 'abc'))
+
+
+if __name__ == "__main__":
+    unittest.main()
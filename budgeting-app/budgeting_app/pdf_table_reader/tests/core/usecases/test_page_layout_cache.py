@@ -0,0 +1,101 @@
+from pathlib import Path
+import tempfile
+import unittest
+
+from pdfplumber import open as pdf_open
+
+from budgeting_app.pdf_table_reader.core.usecases.pdf_reader import PDFReader
+from budgeting_app.pdf_table_reader.core.usecases.page_layout_cache import (
+    PageLayoutCache,
+    encode_objects,
+    decode_objects,
+    file_sha256
+)
+
+
+class TestPageLayoutCache(unittest.TestCase):
+    def setUp(self) -> None:
+
+        self.test_data_path = Path(__file__).resolve().parent.parent.parent / 'data'
+
+        self.multiple_pages_sample_pdf_filepath = str(self.test_data_path / 'multiple_pages_sample.pdf')
+        self.single_page_sample_pdf_filepath = str(self.test_data_path / 'single_page_sample.pdf')
+
+        self.multiple_pages_sample_pdf_file = pdf_open(self.multiple_pages_sample_pdf_filepath)
+
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.layout_cache = PageLayoutCache(self.cache_dir.name)
+
+    def tearDown(self) -> None:
+        self.multiple_pages_sample_pdf_file.close()
+        self.cache_dir.cleanup()
+
+    def test_encode_decode_objects(self) -> None:
+        expected = self.multiple_pages_sample_pdf_file.pages[0].objects
+        actual = decode_objects(encode_objects(expected))
+
+        self.assertEqual(expected.keys(), actual.keys())
+        for object_type in expected.keys() - {'image'}:
+            self.assertEqual(expected[object_type], actual[object_type])
+
+    def test_encode_decode_unencodable_values(self) -> None:
+        objects = {
+            'image': [
+                {'x0': 1.5, 'srcsize': (10, 20), 'colorspace': [object()], 'stream': object(), 'name': 'Im0'},
+                {'x0': 2.0, 'srcsize': (30, 40), 'colorspace': ['DeviceRGB'], 'stream': None, 'name': None}
+            ],
+            'rect': [{'pts': [(1.0, 2.0), (3.0, 4.0)], 'stroking_color': None, 'top': 7}]
+        }
+        expected = {
+            'image': [
+                {'x0': 1.5, 'srcsize': (10, 20), 'colorspace': None, 'stream': None, 'name': 'Im0'},
+                {'x0': 2.0, 'srcsize': (30, 40), 'colorspace': ['DeviceRGB'], 'stream': None, 'name': None}
+            ],
+            'rect': [{'pts': [(1.0, 2.0), (3.0, 4.0)], 'stroking_color': None, 'top': 7}]
+        }
+        self.assertEqual(expected, decode_objects(encode_objects(objects)))
+
+    def test_miss_then_hit(self) -> None:
+        pdf_file = PDFReader.open(self.multiple_pages_sample_pdf_filepath, layout_cache=self.layout_cache)
+        pdf_file.pages[0].page
+        self.assertEqual(1, len(self.layout_cache.disk_cache._entries()))
+
+        file_sha = file_sha256(self.multiple_pages_sample_pdf_filepath)
+        self.assertIsNotNone(self.layout_cache.load(file_sha, 0))
+        self.assertIsNone(self.layout_cache.load(file_sha, 1))
+
+        pdf_file = PDFReader.open(self.multiple_pages_sample_pdf_filepath, layout_cache=self.layout_cache)
+        self.assertEqual(
+            self.multiple_pages_sample_pdf_file.pages[0].extract_text(),
+            pdf_file.pages[0].page.extract_text()
+        )
+        self.assertEqual(
+            self.multiple_pages_sample_pdf_file.pages[0].extract_tables(),
+            pdf_file.pages[0].page.extract_tables()
+        )
+
+    def test_invalidate_file(self) -> None:
+        PDFReader.open(self.multiple_pages_sample_pdf_filepath, layout_cache=self.layout_cache).pages[0].page
+        PDFReader.open(self.single_page_sample_pdf_filepath, layout_cache=self.layout_cache).pages[0].page
+
+        self.assertEqual(1, self.layout_cache.invalidate(self.multiple_pages_sample_pdf_filepath))
+        self.assertEqual(1, len(self.layout_cache.disk_cache._entries()))
+        self.assertEqual(1, self.layout_cache.clear())
+
+    def test_lru_eviction(self) -> None:
+        file_sha = file_sha256(self.multiple_pages_sample_pdf_filepath)
+        objects = self.multiple_pages_sample_pdf_file.pages[0].objects
+        entry_size = len(encode_objects(objects))
+
+        layout_cache = PageLayoutCache(self.cache_dir.name, max_bytes=int(2.5 * entry_size))
+        for i in range(3):
+            layout_cache.store(file_sha, i, objects)
+
+        self.assertIsNone(layout_cache.load(file_sha, 0))
+        self.assertIsNotNone(layout_cache.load(file_sha, 1))
+        self.assertIsNotNone(layout_cache.load(file_sha, 2))
+        self.assertLessEqual(layout_cache.disk_cache.total_bytes, layout_cache.disk_cache.max_bytes)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+from pathlib import Path
+import threading
+import unittest
+
+from pdfplumber import open as pdf_open, page
+
+from budgeting_app.pdf_table_reader.core.usecases.page_tiles import PageTiles
+from budgeting_app.pdf_table_reader.core.usecases.render_cache import RenderCache
+
+
+class TestPageTiles(unittest.TestCase):
+    def setUp(self) -> None:
+        test_data_path = Path(__file__).resolve().parent.parent.parent / 'data'
+        self.pdf = pdf_open(test_data_path / 'multiple_pages_sample.pdf')
+        self.lock = threading.RLock()
+        self.page_tiles = PageTiles(self.pdf.pages[1], self.lock, RenderCache())
+
+    def tearDown(self) -> None:
+        self.page_tiles.close()
+        self.pdf.close()
+
+    def test_level(self) -> None:
+        self.assertEqual(50, self.page_tiles.level(20))
+        self.assertEqual(200, self.page_tiles.level(150))
+        # slightly above a level due to rounding
+        self.assertEqual(200, self.page_tiles.level(200.1))
+        self.assertEqual(400, self.page_tiles.level(1000))
+
+    def test_grid(self) -> None:
+        self.assertEqual((1654, 2339), self.page_tiles.level_size(200))
+        self.assertEqual((7, 10), self.page_tiles.grid(200))
+        self.assertEqual((1536, 2304, 1654, 2339), self.page_tiles.tile_rect(200, 6, 9))
+        self.assertEqual(
+            [(1, 0), (2, 0), (1, 1), (2, 1)],
+            self.page_tiles.tiles_in_rect(200, (300, 10, 520, 300))
+        )
+
+    def test_get_page(self) -> None:
+        thumbnail = self.page_tiles.get_page(30)
+        self.assertEqual(self.page_tiles.level_size(30), thumbnail.size)
+        # cached
+        self.assertIs(thumbnail, self.page_tiles.get_page(30))
+
+    def test_tiles_match_page_image(self) -> None:
+        page_image = self.pdf.pages[1].to_image(200).original
+
+        for col, row in [(0, 0), (3, 4), (6, 9)]:
+            rect = self.page_tiles.tile_rect(200, col, row)
+            tile = self.page_tiles.get_tile(200, col, row)
+            self.assertEqual(page_image.crop(rect).tobytes(), tile.to_pil().tobytes())
+
+        self.assertIs(tile, self.page_tiles.get_tile(200, 6, 9))
+        self.assertEqual(1, self.page_tiles.cache.hits)
+
+    def test_non_blocking_get_tile(self) -> None:
+        locked, release = threading.Event(), threading.Event()
+
+        def hold_lock() -> None:
+            with self.lock:
+                locked.set()
+                release.wait()
+
+        thread = threading.Thread(target=hold_lock)
+        thread.start()
+        locked.wait()
+        try:
+            self.assertIsNone(self.page_tiles.get_tile(100, 0, 0, blocking=False))
+        finally:
+            release.set()
+            thread.join()
+
+        self.assertIsNotNone(self.page_tiles.get_tile(100, 0, 0, blocking=False))
+
+    def test_page_not_kept(self) -> None:
+        # the page can be released while its tiles are displayed
+        _page = self.pdf.pages[2]
+        page_tiles = PageTiles(_page, self.lock, RenderCache())
+        page_image = _page.to_image(100).original
+
+        try:
+            self.assertEqual(page_image.crop(page_tiles.tile_rect(100, 1, 1)).tobytes(), page_tiles.get_tile(100, 1, 1).to_pil().tobytes())
+        finally:
+            page_tiles.close()
+        self.assertFalse(any(isinstance(v, page.Page) for v in vars(page_tiles).values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,218 @@
+import gc
+import os
+from pathlib import Path
+import time
+import unittest
+from unittest import mock
+
+from pdfplumber import open as pdf_open
+
+from budgeting_app.pdf_table_reader.core.usecases.pdf_reader import PDFReader
+from budgeting_app.pdf_table_reader.core.entities.models import PDFFileWrapper, PDFPageWrapper, BASE_IMAGE_RESOLUTION
+
+
+class TestPDFReader(unittest.TestCase):
+    def setUp(self) -> None:
+
+        self.test_data_path = Path(__file__).resolve().parent.parent.parent / 'data'
+
+        self.multiple_pages_sample_pdf_filepath = str(self.test_data_path / 'multiple_pages_sample.pdf')
+
+        self.multiple_pages_sample_pdf_file = pdf_open(self.multiple_pages_sample_pdf_filepath)
+
+    def tearDown(self) -> None:
+        self.multiple_pages_sample_pdf_file.close()
+
+    def test_open_invalid_path(self) -> None:
+        self.assertIsNone(PDFReader.open('sample.txt'))
+
+    def test_open(self) -> None:
+        actual = PDFReader.open(self.multiple_pages_sample_pdf_filepath)
+        self.assertTrue(isinstance(actual, PDFFileWrapper))
+        self.assertEqual(len(actual.pages), len(self.multiple_pages_sample_pdf_file.pages))
+        self.assertEqual([p.page_number for p in actual.pages], [*range(len(actual.pages))])
+
+    def test_open_page_range(self) -> None:
+        actual = PDFReader.open(self.multiple_pages_sample_pdf_filepath, pages=range(1, 3))
+        self.assertEqual([1, 2], [p.page_number for p in actual.pages])
+        for wrapper, expected in zip(actual.pages, self.multiple_pages_sample_pdf_file.pages[1:3]):
+            self.assertEqual(expected.initial_doctop, wrapper.page.initial_doctop)
+            self.assertEqual(expected.extract_text(), wrapper.page.extract_text())
+        actual.close()
+
+    def test_open_page_range_out_of_bounds(self) -> None:
+        actual = PDFReader.open(self.multiple_pages_sample_pdf_filepath, pages=[3, 100])
+        self.assertEqual([3], [p.page_number for p in actual.pages])
+        actual.close()
+
+    ####################################
+    #          LAZY PAGE LOAD          #
+    ####################################
+
+    def test_open_does_not_load_pages(self) -> None:
+        actual = PDFReader.open(self.multiple_pages_sample_pdf_filepath)
+        self.assertFalse(any(p.is_loaded for p in actual.pages))
+
+    def test_page_loaded_on_first_access(self) -> None:
+        actual = PDFReader.open(self.multiple_pages_sample_pdf_filepath)
+        page = actual.pages[1].page
+        self.assertTrue(actual.pages[1].is_loaded)
+        self.assertFalse(actual.pages[0].is_loaded)
+        self.assertIs(page, actual.pages[1].page)
+
+    def test_lazy_page_matches_pdfplumber_page(self) -> None:
+        actual = PDFReader.open(self.multiple_pages_sample_pdf_filepath)
+        for wrapper, expected in zip(actual.pages, self.multiple_pages_sample_pdf_file.pages):
+            self.assertEqual(expected.page_number, wrapper.page.page_number)
+            self.assertEqual(expected.bbox, wrapper.page.bbox)
+            self.assertEqual(expected.initial_doctop, wrapper.page.initial_doctop)
+            self.assertEqual(expected.extract_text(), wrapper.page.extract_text())
+
+    def test_base_size_matches_rendered_image(self) -> None:
+        actual = PDFReader.open(self.multiple_pages_sample_pdf_filepath)
+        for wrapper, expected in zip(actual.pages, self.multiple_pages_sample_pdf_file.pages):
+            self.assertEqual(expected.to_image(BASE_IMAGE_RESOLUTION).original.size, wrapper.base_size)
+
+    def test_base_size_of_page_given_explicitly(self) -> None:
+        expected = self.multiple_pages_sample_pdf_file.pages[0].to_image(BASE_IMAGE_RESOLUTION).original.size
+        actual = PDFPageWrapper(self.multiple_pages_sample_pdf_file.pages[0])
+        self.assertEqual(expected, actual.base_size)
+        self.assertEqual(0, actual.page_number)
+
+    ####################################
+    #            ITER PAGES            #
+    ####################################
+
+    def test_iter_pages(self) -> None:
+        expected = [p.extract_text() for p in self.multiple_pages_sample_pdf_file.pages]
+        actual = [p.page.extract_text() for p in PDFReader.iter_pages(self.multiple_pages_sample_pdf_filepath)]
+        self.assertEqual(expected, actual)
+
+    def test_iter_pages_page_range(self) -> None:
+        expected = [p.extract_text() for p in self.multiple_pages_sample_pdf_file.pages[1:3]]
+        actual = []
+        for page_wrapper in PDFReader.iter_pages(self.multiple_pages_sample_pdf_filepath, page_range=range(1, 3)):
+            actual.append(page_wrapper.page.extract_text())
+            self.assertIn(page_wrapper.page_number, [1, 2])
+        self.assertEqual(expected, actual)
+
+    def test_iter_pages_releases_previous_page(self) -> None:
+        pages = PDFReader.iter_pages(self.multiple_pages_sample_pdf_filepath)
+        first = next(pages)
+        first.page.chars
+        self.assertTrue(first.is_loaded)
+        next(pages)
+        self.assertFalse(first.is_loaded)
+        pages.close()
+
+    def test_iter_pages_invalid_path(self) -> None:
+        self.assertEqual([], [*PDFReader.iter_pages('sample.txt')])
+
+    ####################################
+    #            OPEN MANY             #
+    ####################################
+
+    def spy_open_and_parse(self) -> tuple[mock._patch, list[PDFFileWrapper]]:
+        """Patcher of `PDFReader._open_and_parse` and the list the files it opens go into."""
+        opened = []
+        open_and_parse = PDFReader._open_and_parse
+
+        def spy(*args):
+            pdf_file, pages = open_and_parse(*args)
+            if pdf_file is not None:
+                opened.append(pdf_file)
+            return pdf_file, pages
+
+        return mock.patch.object(PDFReader, '_open_and_parse', side_effect=spy), opened
+
+    def assert_closed(self, pdf_files: list[PDFFileWrapper]) -> None:
+        # files still being parsed are closed by the workers once done; closed files hold no sources
+        deadline = time.monotonic() + 5
+        while any(f.sources for f in pdf_files) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual([], [f for f in pdf_files if f.sources])
+
+    def test_open_many(self) -> None:
+        filepaths = [str(p) for p in sorted(self.test_data_path.glob('*.pdf'))]
+
+        actual = [*PDFReader.open_many(filepaths + ['sample.txt'], max_workers=2, max_inflight_pages=1)]
+
+        self.assertEqual(len(filepaths), len(actual))
+        self.assertCountEqual(filepaths, [str(f.pages[0].page.pdf.path) for f in actual])
+        for pdf_file in actual:
+            self.assertTrue(all(p.is_loaded for p in pdf_file.pages))
+            pdf_file.close()
+
+    def test_open_many_closed_early(self) -> None:
+        filepaths = [str(p) for p in sorted(self.test_data_path.glob('*.pdf'))]
+
+        for max_inflight_pages in [1, 1000]:
+            with self.subTest(max_inflight_pages=max_inflight_pages):
+                patcher, opened = self.spy_open_and_parse()
+                with patcher:
+                    pdf_files = PDFReader.open_many(filepaths, max_workers=2, max_inflight_pages=max_inflight_pages)
+                    taken = next(pdf_files)
+                    self.assertTrue(isinstance(taken, PDFFileWrapper))
+                    if max_inflight_pages > 1:
+                        # the other files are parsed but not handed over
+                        deadline = time.monotonic() + 10
+                        while len(opened) < len(filepaths) and time.monotonic() < deadline:
+                            time.sleep(0.01)
+                        self.assertEqual(len(filepaths), len(opened))
+                    pdf_files.close()
+
+                self.assertIn(taken, opened)
+                self.assertFalse(taken.sources[0].stream.closed)
+                self.assert_closed([f for f in opened if f is not taken])
+                taken.close()
+
+    ####################################
+    #       LIFECYCLE & EVICTION       #
+    ####################################
+
+    def test_least_recently_used_page_released(self) -> None:
+        actual = PDFReader.open(self.multiple_pages_sample_pdf_filepath, max_resident_pages=2)
+        actual.pages[0].page.chars
+        actual.pages[1].page.chars
+        actual.pages[0].page
+        actual.pages[2].page.chars
+
+        self.assertEqual([True, False, True], [p.is_loaded for p in actual.pages[:3]])
+        self.assertEqual(2, len(actual.resident_pages))
+        actual.close()
+
+    def test_context_manager_closes_file(self) -> None:
+        with PDFReader.open(self.multiple_pages_sample_pdf_filepath) as actual:
+            pdf = actual.sources[0]
+            actual.pages[0].page.chars
+
+        self.assertTrue(pdf.stream.closed)
+        self.assertFalse(actual.pages[0].is_loaded)
+        self.assertEqual(0, len(actual.resident_pages))
+
+    @unittest.skipUnless(os.path.exists('/proc/self/statm'), 'requires /proc')
+    def test_soak_open_close_rss_bounded(self) -> None:
+
+        def rss() -> int:
+            with open('/proc/self/statm') as f:
+                return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+        def open_and_read() -> None:
+            with PDFReader.open(str(self.test_data_path / '3_tables_2_pages.pdf'), max_resident_pages=1) as pdf_file:
+                for p in pdf_file.pages:
+                    p.page.extract_text()
+
+        for _ in range(20):
+            open_and_read()
+        gc.collect()
+        baseline = rss()
+
+        for _ in range(200):
+            open_and_read()
+        gc.collect()
+
+        self.assertLess(rss() - baseline, 32 * 1024 ** 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+
+from budgeting_app.pdf_table_reader.core.usecases.render_cache import RenderCache, table_settings_hash
+
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.settings = {'vertical_strategy': 'lines', 'horizontal_strategy': 'text', 'explicit_vertical_lines': [1, 2]}
+        self.render_cache = RenderCache(max_bytes=25)
+
+    def test_table_settings_hash_ignores_key_order(self) -> None:
+        reordered = dict(reversed(list(self.settings.items())))
+        self.assertEqual(table_settings_hash(self.settings), table_settings_hash(reordered))
+        self.assertNotEqual(
+            table_settings_hash(self.settings),
+            table_settings_hash({**self.settings, 'vertical_strategy': 'text'})
+        )
+
+    def test_hit_miss_counters(self) -> None:
+        key = RenderCache.key('page', 200, False, 'png', self.settings)
+        self.assertIsNone(self.render_cache.get(key))
+        self.render_cache.put(key, b'image')
+        self.assertEqual(b'image', self.render_cache.get(RenderCache.key('page', 200, False, 'PNG', dict(self.settings))))
+
+        stats = self.render_cache.stats()
+        self.assertEqual((1, 1, 0.5), (stats['hits'], stats['misses'], stats['hit_rate']))
+
+    def test_lru_eviction_by_size(self) -> None:
+        for i in range(3):
+            self.render_cache.put(i, b'x' * 10)
+        self.assertEqual(20, self.render_cache.total_bytes)
+        self.assertEqual(1, self.render_cache.evictions)
+        self.assertIsNone(self.render_cache.get(0))
+
+        # 1 used recently, so 2 goes first
+        self.render_cache.get(1)
+        self.render_cache.put(3, b'x' * 10)
+        self.assertIsNotNone(self.render_cache.get(1))
+        self.assertIsNone(self.render_cache.get(2))
+
+        # larger than the whole cache - not stored and nothing evicted
+        self.render_cache.put(4, b'x' * 30)
+        self.assertIsNone(self.render_cache.get(4))
+        self.assertEqual(2, len(self.render_cache))
+
+
+if __name__ == "__main__":
+    unittest.main()
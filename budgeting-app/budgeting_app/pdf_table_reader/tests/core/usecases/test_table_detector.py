@@ -1,12 +1,24 @@
+import importlib.util
 import io
 from pathlib import Path
 import unittest
+from unittest import mock
 
 from pdfplumber import open as pdf_open
 from PIL import Image
 
-from budgeting_app.pdf_table_reader.core.usecases.table_detector_workspace import TableDetectorWorkspace
-from budgeting_app.pdf_table_reader.core.entities.models import PDFFileWrapper, PDFPageWrapper, BASE_IMAGE_RESOLUTION, ExplicitLineData
+from budgeting_app.pdf_table_reader.core.usecases.table_detector_workspace import TableDetectorWorkspace, DEFAULT_TABLE_SETTINGS
+from budgeting_app.pdf_table_reader.core.usecases.parallel_table_extractor import ParallelTableExtractor
+from budgeting_app.pdf_table_reader.core.usecases.pdf_reader import PDFReader
+from budgeting_app.pdf_table_reader.core.entities.table_finder import IncrementalTableFinder
+from budgeting_app.pdf_table_reader.core.entities.models import (
+    PDFFileWrapper,
+    PDFPageWrapper,
+    BASE_IMAGE_RESOLUTION,
+    ExplicitLineData,
+    RawImage,
+    RAW_IMAGE_FORMAT
+)
 
 
 class TestTableDetectorWorkspace(unittest.TestCase):
@@ -312,6 +324,21 @@ class TestTableDetectorWorkspace(unittest.TestCase):
         for p in expected:
             self.assertIn(p, actual)
 
+    def test_add_pages_from_file_shared_sources(self) -> None:
+        source = PDFReader.open(str(self.single_page_sample_pdf_filepath))
+        pdf = source.sources[0]
+        workspace = TableDetectorWorkspace(PDFReader.open(str(self.multiple_pages_sample_pdf_filepath)))
+        workspace.add_pages_from_file(source)
+        
+        # the source file is still open - its document must stay open as well
+        workspace.close()
+        self.assertFalse(pdf.stream.closed)
+        source.pages[0].release()
+        self.assertTrue(source.pages[0].page.extract_text())
+        
+        source.close()
+        self.assertTrue(pdf.stream.closed)
+        
     ####################################
     #         GET PAGE OBJECTS         #
     ####################################
@@ -517,6 +544,145 @@ class TestTableDetectorWorkspace(unittest.TestCase):
         self.assertEqual(expected.size, actual_img.size)
         self.assertEqual(self.table_detector_workspace.pdf_file.image.resolution, 1000)
 
+    def test_get_page_image_renders_dirty_pages_only(self) -> None:
+        self.table_detector_workspace.set_pdf_file_image()
+        
+        with mock.patch.object(
+            self.table_detector_workspace,
+            '_get_pages_images_bytes',
+            wraps=self.table_detector_workspace._get_pages_images_bytes
+        ) as render:
+            # nothing changed - served from memory
+            image_bytes = self.table_detector_workspace.image_bytes
+            self.assertEqual(self.table_detector_workspace.pdf_file.image.image_bytes, image_bytes)
+            render.assert_not_called()
+            
+            self.table_detector_workspace.set_table_settings_val(1, 'snap_tolerance', 5)
+            self.assertTrue(self.table_detector_workspace.pdf_file.pages[1].image_dirty)
+            self.assertFalse(self.table_detector_workspace.pdf_file.pages[0].image_dirty)
+            
+            self.table_detector_workspace.image_bytes
+            render.assert_called_once_with([1], BASE_IMAGE_RESOLUTION, antialias=False, _format='PNG', overlay=False)
+            
+            self.table_detector_workspace.get_page_image(1)
+            render.assert_called_once()
+            
+            # replacing the settings makes the page dirty as well
+            self.table_detector_workspace.pdf_file.pages[2].table_settings = self.table_detector_workspace.get_table_settings(2)
+            self.table_detector_workspace.get_page_image(2)
+            self.assertEqual(2, render.call_count)
+
+    def test_render_cache_hit_after_settings_toggled_back(self) -> None:
+        self.table_detector_workspace.set_pdf_file_image()
+        expected = self.table_detector_workspace.get_page_image(0)
+        
+        with mock.patch.object(PDFPageWrapper, 'page') as page:
+            self.table_detector_workspace.set_table_settings_val(0, 'snap_tolerance', 5)
+            self.table_detector_workspace.set_table_settings_val(0, 'snap_tolerance', 3)
+            
+            # rendered before with the same settings - the page is not even touched
+            self.assertEqual(expected, self.table_detector_workspace.get_page_image(0))
+            page.to_image.assert_not_called()
+        
+        self.assertEqual(1, self.table_detector_workspace.render_cache.hits)
+
+    def test_overlay_mode_renders_page_once(self) -> None:
+        self.table_detector_workspace.set_pdf_file_image(overlay=True)
+        expected = self.table_detector_workspace.get_page_image(0)
+        
+        with mock.patch.object(
+            self.table_detector_workspace,
+            '_get_pages_images_bytes',
+            wraps=self.table_detector_workspace._get_pages_images_bytes
+        ) as render:
+            self.table_detector_workspace.set_table_settings_val(0, 'vertical_strategy', 'text')
+            self.assertEqual(expected, self.table_detector_workspace.get_page_image(0))
+            render.assert_not_called()
+            
+        # same as the page rendered without the tables
+        page_image = io.BytesIO()
+        self.page0.page.to_image(BASE_IMAGE_RESOLUTION).save(page_image, format='PNG', quantize=False)
+        self.assertEqual(page_image.getvalue(), expected)
+    
+    def test_lazy_pdf_file_image(self) -> None:
+        with mock.patch.object(
+            self.table_detector_workspace,
+            '_get_pages_images_bytes',
+            wraps=self.table_detector_workspace._get_pages_images_bytes
+        ) as render:
+            self.table_detector_workspace.set_pdf_file_image(overlay=True, lazy=True)
+            render.assert_not_called()
+            
+            self.table_detector_workspace.get_page_image(1)
+            render.assert_called_once_with([1], BASE_IMAGE_RESOLUTION, antialias=False, _format='PNG', overlay=True)
+        
+        self.assertIsNone(self.page0.image_bytes)
+        self.assertIsNotNone(self.page1.image_bytes)
+    
+    def test_raw_image_format(self) -> None:
+        png_image = Image.open(io.BytesIO(self.table_detector_workspace._get_pages_images_bytes([0], BASE_IMAGE_RESOLUTION)[0]))
+        raw_image = self.table_detector_workspace._get_pages_images_bytes([0], BASE_IMAGE_RESOLUTION, _format=RAW_IMAGE_FORMAT)[0]
+        
+        self.assertIsInstance(raw_image, RawImage)
+        self.assertEqual(png_image.size, raw_image.size)
+        self.assertEqual(3 * png_image.size[0] * png_image.size[1], raw_image.nbytes)
+        self.assertEqual(png_image.tobytes(), raw_image.to_pil().tobytes())
+        self.assertEqual(png_image.tobytes(), Image.open(io.BytesIO(raw_image.to_png())).tobytes())
+    
+    def test_get_page_overlay(self) -> None:
+        self.table_detector_workspace.set_table_settings_val(0, 'vertical_strategy', 'text')
+        finder = self.page0.page.debug_tablefinder(self.page0.table_settings)
+        
+        overlay = self.table_detector_workspace.get_page_overlay(0)
+        
+        self.assertEqual((self.page0.page.width, self.page0.page.height), overlay.page_size)
+        self.assertEqual((0.0, 0.0), overlay.page_origin)
+        self.assertEqual(len(finder.edges), len(overlay.edges))
+        self.assertEqual(len(finder.intersections), len(overlay.intersections))
+        self.assertEqual([c for t in finder.tables for c in t.cells], overlay.cells)
+
+    def test_get_page_overlay_cropped_page(self) -> None:
+        _page = self.multiple_pages_sample_pdf_file.pages[0]
+        cropped_page = _page.crop((100, 200, _page.width, _page.height))
+        workspace = TableDetectorWorkspace(PDFFileWrapper(pages=[PDFPageWrapper(page=cropped_page)]))
+        
+        overlay = workspace.get_page_overlay(0)
+        
+        self.assertEqual((100.0, 200.0), overlay.page_origin)
+        self.assertEqual((cropped_page.width, cropped_page.height), overlay.page_size)
+        self.assertTrue(all(x0 >= 100 and top >= 200 for x0, top, _, _ in overlay.cells))
+
+    def test_table_finder_shared(self) -> None:
+        self.table_detector_workspace.set_table_settings_val(0, 'vertical_strategy', 'text')
+        expected = self.page0.page.extract_tables(self.page0.table_settings)
+
+        with mock.patch(
+            'budgeting_app.pdf_table_reader.core.entities.models.IncrementalTableFinder',
+            wraps=IncrementalTableFinder
+        ) as table_finder:
+            self.table_detector_workspace.get_page_overlay(0)
+            self.assertEqual(expected, self.table_detector_workspace.get_tables_text([0]))
+            self.table_detector_workspace._get_pages_images_bytes([0], BASE_IMAGE_RESOLUTION)
+            self.assertEqual(1, table_finder.call_count)
+
+            # found again once the settings change
+            self.table_detector_workspace.set_table_settings_val(0, 'vertical_strategy', 'lines')
+            self.table_detector_workspace.get_page_overlay(0)
+            self.assertEqual(2, table_finder.call_count)
+    
+    def test_table_finder_reuses_page_edges(self) -> None:
+        self.table_detector_workspace.set_table_settings_val(0, 'vertical_strategy', 'text')
+        self.table_detector_workspace.get_page_overlay(0)
+        
+        # e.g. a table line dragged
+        self.table_detector_workspace.set_table_settings_val(0, 'explicit_vertical_lines', [120, 300])
+        with mock.patch.object(self.page0.page, 'extract_words') as extract_words:
+            overlay = self.table_detector_workspace.get_page_overlay(0)
+        extract_words.assert_not_called()
+        
+        finder = self.page0.page.debug_tablefinder(self.page0.table_settings)
+        self.assertEqual([c for t in finder.tables for c in t.cells], overlay.cells)
+
     ####################################
     #       ADD & REMOVE ELEMENTS      #
     ####################################
@@ -666,6 +832,25 @@ class TestTableDetectorWorkspace(unittest.TestCase):
         pdf_file.close()
         self.assertEqual(expected, actual)
 
+    def test_get_tables_text_drawn_table(self) -> None:
+        pdf_file = pdf_open(self.test_data_path / '2_tables_1_page.pdf')
+        page_wrapper = PDFPageWrapper(pdf_file.pages[0])
+        table_detector_workspace = TableDetectorWorkspace(PDFFileWrapper([page_wrapper]))
+        table_detector_workspace.set_pdf_file_image(lazy=True)
+
+        # the second table only, drawn slightly off its borders - the first one is not extracted
+        table_detector_workspace.add_table((318, 435), (530, 605), [394.15, 457.9], [490.03, 547.03], 0)
+        self.assertEqual(
+            [[['1', '2', '3'], ['4', '5', '6'], ['7', '8', '9']]],
+            table_detector_workspace.get_tables_text([0])
+        )
+
+        table_detector_workspace.remove_table((318, 435), (530, 605), [394.15, 457.9], [490.03, 547.03], 0)
+        pdf_file.close()
+        self.assertEqual([], page_wrapper.explicit_tables)
+        self.assertEqual([], page_wrapper.explicit_lines)
+        self.assertEqual([], page_wrapper.table_settings['explicit_vertical_lines'])
+
     def test_get_all_tables_text(self) -> None:
         pdf_file = pdf_open(self.test_data_path / '3_tables_2_pages.pdf')
         page0 = pdf_file.pages[0].debug_tablefinder().page
@@ -679,5 +864,148 @@ class TestTableDetectorWorkspace(unittest.TestCase):
         pdf_file.close()
         self.assertEqual(expected, actual)
 
+    def test_get_all_tables_text_in_parallel(self) -> None:
+        pdf_file_wrapper = PDFReader.open(str(self.test_data_path / '3_tables_2_pages.pdf'))
+        pdf_file_wrapper.pages.append(PDFReader.open(str(self.test_data_path / '1_table_1_page.pdf')).pages[0])
+        expected = [
+            [['A', 'B', 'C'], ['D', 'E', 'F'], ['G', 'H', 'I']],
+            [['1', '2', '3'], ['4', '5', '6'], ['7', '8', '9']],
+            [['X1', 'X2', 'X3'], ['X4', 'X5', 'X6'], ['X7', 'X8', 'X9']],
+            [['A', 'B', 'C'], ['D', 'E', 'F'], ['G', 'H', 'I']]
+        ]
+        actual = TableDetectorWorkspace(pdf_file_wrapper).get_all_tables_text(workers=2)
+        self.assertEqual(expected, actual)
+
+    def test_page_access_holds_pages_lock(self) -> None:
+        workspace = TableDetectorWorkspace(PDFReader.open(str(self.multiple_pages_sample_pdf_filepath)))
+        calls = [
+            lambda: workspace.get_table_score(0),
+            lambda: workspace.get_words_in_bbox(0, (0, 0, 100, 100)),
+            lambda: workspace.get_cells_text(0, [0, 100], [0, 100]),
+            lambda: workspace.set_table_settings_val(0, 'vertical_strategy', 'text'),
+            lambda: workspace.get_page_text(1)
+        ]
+        for call in calls:
+            with mock.patch.object(workspace, 'pages_lock') as pages_lock:
+                call()
+            pages_lock.__enter__.assert_called_once()
+        workspace.close()
+
+    def test_extract_tables_in_parallel_same_page_twice(self) -> None:
+        settings = [DEFAULT_TABLE_SETTINGS, {**DEFAULT_TABLE_SETTINGS, 'vertical_strategy': 'text', 'horizontal_strategy': 'text'}]
+        expected = [self.single_page_sample_pdf_file.pages[0].extract_tables(s) for s in settings]
+        self.assertNotEqual(expected[0], expected[1])
+        
+        for workers in [1, 2]:
+            with self.subTest(workers=workers):
+                actual = ParallelTableExtractor(workers).extract_tables(str(self.single_page_sample_pdf_filepath), [0, 0], settings)
+                self.assertEqual(expected, actual)
+
+    @unittest.skipUnless(importlib.util.find_spec('numpy'), 'requires NumPy')
+    def test_get_tables_text_in_parallel_with_backend(self) -> None:
+        workspace = TableDetectorWorkspace(PDFReader.open(str(self.multiple_pages_sample_pdf_filepath)), table_finder_backend='numpy')
+        expected = workspace.get_tables_text([0, 1])
+        
+        with mock.patch.object(
+            ParallelTableExtractor,
+            'extract_tables',
+            autospec=True,
+            side_effect=ParallelTableExtractor.extract_tables
+        ) as extract_tables:
+            actual = workspace.get_tables_text([0, 1], workers=2)
+        
+        self.assertEqual('numpy', extract_tables.call_args.kwargs['table_finder_backend'])
+        self.assertEqual(expected, actual)
+        workspace.close()
+
+    def test_add_pages_from_partially_opened_file(self) -> None:
+        pdf_file = PDFReader.open(str(self.multiple_pages_sample_pdf_filepath), pages=[3, 1])
+        table_detector_workspace = TableDetectorWorkspace(PDFFileWrapper(pages=[]))
+        table_detector_workspace.add_pages_from_file(pdf_file, source_page_numbers=[3])
+        
+        self.assertEqual([3], table_detector_workspace.get_source_page_numbers())
+        self.assertEqual(0, table_detector_workspace.get_page_index(3))
+        self.assertIsNone(table_detector_workspace.get_page_index(1))
+        self.assertEqual(
+            self.multiple_pages_sample_pdf_file.pages[3].extract_text(),
+            table_detector_workspace.get_page_text(0)
+        )
+        self.assertRaises(ValueError, table_detector_workspace.add_pages_from_file, pdf_file, source_page_numbers=[0])
+        self.assertRaises(ValueError, table_detector_workspace.add_pages_from_file, pdf_file, add_pages_numbers=[3])
+        self.assertRaises(ValueError, table_detector_workspace.add_pages_from_file, pdf_file, add_pages_numbers=[0], source_page_numbers=[3])
+        
+        # positions, whatever the source page numbers
+        table_detector_workspace.add_pages_from_file(pdf_file, add_pages_numbers=[1])
+        self.assertEqual([3, pdf_file.pages[1].page_number], table_detector_workspace.get_source_page_numbers())
+        pdf_file.close()
+        
+    def test_add_pages_from_file_ambiguous_source_page_numbers(self) -> None:
+        # both pages come from the first page of the same document
+        self.assertRaises(ValueError, self.table_detector_workspace.add_pages_from_file, self.pdf_file_wrapper1, source_page_numbers=[0])
+
+    ####################################
+    #          SPATIAL INDEX           #
+    ####################################
+
+    def test_spatial_index_matches_within_bbox(self) -> None:
+        page0 = self.multiple_pages_sample_pdf_file.pages[0]
+        spatial_index = PDFPageWrapper(page0).spatial_index
+        for bbox in [(0, 0, page0.width, page0.height), (50, 100, 300, 180), (400, 600, 401, 601)]:
+            self.assertEqual(page0.within_bbox(bbox).chars, spatial_index.chars_in_bbox(bbox))
+            self.assertEqual(page0.within_bbox(bbox).extract_words(), spatial_index.words_in_bbox(bbox))
+
+    def test_get_cells_text(self) -> None:
+        pdf_file = pdf_open(self.test_data_path / '1_table_1_page.pdf')
+        table_detector_workspace = TableDetectorWorkspace(PDFFileWrapper([PDFPageWrapper(pdf_file.pages[0])]))
+        expected = [['A', 'B', 'C'], ['D', 'E', 'F'], ['G', 'H', 'I']]
+        actual = table_detector_workspace.get_cells_text(0, [66.62, 220.61, 374.71, 528.82], [72.24, 157.34, 240.5, 323.69])
+        self.assertEqual(expected, actual)
+        self.assertEqual(['A'], [w['text'] for w in table_detector_workspace.get_words_in_bbox(0, (66.62, 72.24, 220.61, 157.34))])
+        pdf_file.close()
+
+    def test_get_text_gaps(self) -> None:
+        pdf_file = pdf_open(self.test_data_path / '1_table_1_page.pdf')
+        table_detector_workspace = TableDetectorWorkspace(PDFFileWrapper([PDFPageWrapper(pdf_file.pages[0])]))
+        bbox = (66.62, 72.24, 528.82, 323.69)
+        
+        vertical_gaps = table_detector_workspace.get_text_gaps(0, bbox, 'vertical')
+        horizontal_gaps = table_detector_workspace.get_text_gaps(0, bbox, 'horizontal')
+        
+        # one gap between each pair of neighbouring columns/rows
+        self.assertEqual(2, len(vertical_gaps))
+        self.assertEqual(2, len(horizontal_gaps))
+        self.assertEqual(
+            [['A', 'B', 'C'], ['D', 'E', 'F'], ['G', 'H', 'I']],
+            table_detector_workspace.get_cells_text(0, [bbox[0], *vertical_gaps, bbox[2]], [bbox[1], *horizontal_gaps, bbox[3]])
+        )
+        pdf_file.close()
+
+    ####################################
+    #       TABLE PRESENCE SCAN        #
+    ####################################
+
+    def test_get_all_tables_text_skips_low_score_pages(self) -> None:
+        pdf_file = pdf_open(self.test_data_path / '3_tables_2_pages.pdf')
+        page0 = pdf_file.pages[0]
+        # header of the statement - text only
+        page1 = self.multiple_pages_sample_pdf_file.pages[3].crop((0, 0, self.multiple_pages_sample_pdf_file.pages[3].width, 45))
+        table_detector_workspace = TableDetectorWorkspace(
+            PDFFileWrapper([PDFPageWrapper(page1), PDFPageWrapper(page0)]),
+            table_score_threshold=0.2
+        )
+        
+        self.assertEqual([0.0, 1.0], table_detector_workspace.get_table_scores())
+        self.assertEqual([1, 0], table_detector_workspace.get_pages_by_table_score())
+        self.assertEqual(
+            [[['A', 'B', 'C'], ['D', 'E', 'F'], ['G', 'H', 'I']]],
+            table_detector_workspace.get_all_tables_text()
+        )
+        
+        # pages with explicit settings are never skipped
+        table_detector_workspace.set_table_settings_val(0, 'vertical_strategy', 'explicit')
+        table_detector_workspace.set_table_settings_val(0, 'explicit_vertical_lines', [100, 200, 300])
+        self.assertTrue(table_detector_workspace.is_table_page(0))
+        pdf_file.close()
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,51 @@
+from pathlib import Path
+import unittest
+from unittest import mock
+
+from pdfplumber import open as pdf_open
+
+from budgeting_app.pdf_table_reader.core.entities.table_finder import IncrementalTableFinder
+from budgeting_app.pdf_table_reader.core.usecases.table_detector_workspace import DEFAULT_TABLE_SETTINGS
+
+
+class TestIncrementalTableFinder(unittest.TestCase):
+    def setUp(self) -> None:
+        test_data_path = Path(__file__).resolve().parent.parent.parent / 'data'
+        self.pdf = pdf_open(test_data_path / 'multiple_pages_sample.pdf')
+        self.page = self.pdf.pages[0]
+
+    def tearDown(self) -> None:
+        self.pdf.close()
+
+    def assertSameTables(self, expected, actual) -> None:
+        self.assertEqual(expected.edges, actual.edges)
+        self.assertEqual(expected.intersections, actual.intersections)
+        self.assertEqual(expected.cells, actual.cells)
+        self.assertEqual([t.extract() for t in expected.tables], [t.extract() for t in actual.tables])
+
+    def test_same_as_table_finder(self) -> None:
+        for vertical_strategy, horizontal_strategy in [('lines', 'lines'), ('text', 'text'), ('explicit', 'lines')]:
+            with self.subTest(vertical_strategy=vertical_strategy, horizontal_strategy=horizontal_strategy):
+                settings = {
+                    **DEFAULT_TABLE_SETTINGS,
+                    'vertical_strategy': vertical_strategy,
+                    'horizontal_strategy': horizontal_strategy,
+                    'explicit_vertical_lines': [100, 300.5],
+                    'explicit_horizontal_lines': [200]
+                }
+                self.assertSameTables(self.page.debug_tablefinder(settings), IncrementalTableFinder(self.page, settings))
+
+    def test_explicit_lines_moved(self) -> None:
+        settings = {**DEFAULT_TABLE_SETTINGS, 'vertical_strategy': 'text', 'explicit_vertical_lines': [100, 300]}
+        finder = IncrementalTableFinder(self.page, settings)
+
+        settings['explicit_vertical_lines'] = [100, 320]
+        with mock.patch.object(self.page, 'extract_words') as extract_words:
+            actual = IncrementalTableFinder(self.page, settings, finder.base_edges)
+        extract_words.assert_not_called()
+
+        self.assertSameTables(self.page.debug_tablefinder(settings), actual)
+
+
+if __name__ == "__main__":
+    unittest.main()
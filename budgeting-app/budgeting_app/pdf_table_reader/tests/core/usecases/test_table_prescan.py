@@ -0,0 +1,60 @@
+from pathlib import Path
+import unittest
+
+from pdfplumber import open as pdf_open
+import pypdfium2
+
+from budgeting_app.pdf_table_reader.core.usecases.table_prescan import prescan_page, _iter_words
+
+
+class TestTablePrescan(unittest.TestCase):
+    def setUp(self) -> None:
+
+        self.test_data_path = Path(__file__).resolve().parent.parent.parent / 'data'
+
+        self.single_page_sample_pdf_file = pdf_open(self.test_data_path / 'single_page_sample.pdf')
+        self.single_page_sample_page = self.single_page_sample_pdf_file.pages[0]
+
+    def tearDown(self) -> None:
+        self.single_page_sample_pdf_file.close()
+
+    def test_iter_words(self) -> None:
+        expected = [w['text'] for w in self.single_page_sample_page.extract_words() if w['text'].strip()][:12]
+        pdfium_pdf = pypdfium2.PdfDocument(self.test_data_path / 'single_page_sample.pdf')
+        try:
+            actual = [text for text, _ in _iter_words(pdfium_pdf[0].get_textpage())][:12]
+        finally:
+            pdfium_pdf.close()
+        self.assertEqual(expected, actual)
+
+    def test_prescan_statement_page(self) -> None:
+        actual = prescan_page(self.single_page_sample_page)
+        self.assertEqual(1.0, actual.score)
+        self.assertEqual(len(self.single_page_sample_page.lines), actual.line_count)
+        self.assertEqual(len(self.single_page_sample_page.rects), actual.rect_count)
+        self.assertGreater(actual.aligned_numeric_word_count, 0)
+        self.assertLessEqual(actual.aligned_numeric_word_count, actual.numeric_word_count)
+
+    def test_prescan_ruled_table_page(self) -> None:
+        with pdf_open(self.test_data_path / '1_table_1_page.pdf') as pdf_file:
+            actual = prescan_page(pdf_file.pages[0])
+        self.assertEqual(1.0, actual.score)
+        self.assertEqual(0, actual.numeric_word_count)
+        self.assertEqual(44, actual.rect_count)
+
+    def test_prescan_text_only_page(self) -> None:
+        header = self.single_page_sample_page.crop((0, 0, self.single_page_sample_page.width, 45))
+        actual = prescan_page(header)
+        self.assertEqual(0.0, actual.score)
+        self.assertEqual(0, actual.aligned_numeric_word_count)
+
+    def test_prescan_does_not_parse_page(self) -> None:
+        with pdf_open(self.test_data_path / 'multiple_pages_sample.pdf') as pdf_file:
+            _page = pdf_file.pages[1]
+            actual = prescan_page(_page)
+            self.assertNotIn('_objects', vars(_page))
+            self.assertEqual(len(_page.lines), actual.line_count)
+
+
+if __name__ == "__main__":
+    unittest.main()
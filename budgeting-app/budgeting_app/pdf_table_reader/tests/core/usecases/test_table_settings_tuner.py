@@ -0,0 +1,104 @@
+import importlib.util
+import multiprocessing
+from pathlib import Path
+import time
+import unittest
+from unittest import mock
+
+from budgeting_app.pdf_table_reader.core.entities.models import table_finder_class
+from budgeting_app.pdf_table_reader.core.usecases.pdf_reader import PDFReader
+from budgeting_app.pdf_table_reader.core.usecases.table_detector_workspace import TableDetectorWorkspace, DEFAULT_TABLE_SETTINGS
+from budgeting_app.pdf_table_reader.core.usecases.table_settings_tuner import TableSettingsTuner, score_transaction_tables
+
+
+def slow_score_page(page_index: int, settings: dict) -> float:
+    time.sleep(60)
+    return 0.0
+
+
+class TestTableSettingsTuner(unittest.TestCase):
+    def setUp(self) -> None:
+        test_data_path = Path(__file__).resolve().parent.parent.parent / 'data'
+        self.multiple_pages_sample_pdf_filepath = str(test_data_path / 'multiple_pages_sample.pdf')
+
+    def test_score_transaction_tables(self) -> None:
+        transactions = [
+            ['03', 'MAY', 'Automated Credit', '0.02', '', '2,189.25'],
+            ['03', 'MAY', 'Card Transaction', '', '18.00', '2,171.29'],
+            ['04', 'MAY', 'Card Transaction', '', '51.14', '2,120.15']
+        ]
+        merged = [
+            ['03 MAY\n\n04 MAY', 'Automated Credit\nCard Transaction', '0.02\n18.00\n51.14']
+        ]
+        self.assertEqual(3, score_transaction_tables([transactions]))
+        self.assertEqual(0, score_transaction_tables([merged]))
+        self.assertEqual(0, score_transaction_tables([[['Summary', None], ['Previous Balance', '£2,167.71']]]))
+        self.assertEqual(6, score_transaction_tables([transactions, transactions]))
+
+    def test_neighbour_candidates(self) -> None:
+        candidates = TableSettingsTuner.neighbour_candidates(DEFAULT_TABLE_SETTINGS)
+        snap_tolerances = [c['snap_tolerance'] for c in candidates if c['snap_tolerance'] != 3]
+        self.assertEqual([2, 4], snap_tolerances)
+        self.assertEqual(
+            [(2, 2), (4, 4)],
+            [(c['snap_x_tolerance'], c['snap_y_tolerance']) for c in candidates if c['snap_tolerance'] != 3]
+        )
+        # no text strategy - number of words does not matter
+        self.assertTrue(all(c['min_words_vertical'] == 3 for c in candidates))
+
+    def test_tune_out_of_time(self) -> None:
+        actual = TableSettingsTuner(1).tune(self.multiple_pages_sample_pdf_filepath, [1], DEFAULT_TABLE_SETTINGS, time_budget=0)
+        self.assertEqual(DEFAULT_TABLE_SETTINGS, actual.settings)
+        self.assertEqual(0, actual.evaluated)
+
+    def test_workers_terminated_out_of_time(self) -> None:
+        # workers are forked, they pick the patched function up
+        with mock.patch('budgeting_app.pdf_table_reader.core.usecases.table_settings_tuner._score_page', slow_score_page):
+            start = time.monotonic()
+            actual = TableSettingsTuner(2).tune(self.multiple_pages_sample_pdf_filepath, [1, 2], DEFAULT_TABLE_SETTINGS, time_budget=1)
+        self.assertLess(time.monotonic() - start, 10)
+        self.assertEqual(0, actual.evaluated)
+
+        deadline = time.monotonic() + 5
+        while multiprocessing.active_children() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertEqual([], multiprocessing.active_children())
+
+    @unittest.skipUnless(importlib.util.find_spec('numpy'), 'requires NumPy')
+    def test_tune_with_table_finder_backend(self) -> None:
+        with mock.patch(
+            'budgeting_app.pdf_table_reader.core.usecases.table_settings_tuner.table_finder_class',
+            wraps=table_finder_class
+        ) as finder_class:
+            actual = TableSettingsTuner(1, table_finder_backend='numpy').tune(
+                self.multiple_pages_sample_pdf_filepath, [1], DEFAULT_TABLE_SETTINGS, time_budget=1
+            )
+        self.assertGreater(actual.evaluated, 0)
+        self.assertEqual({('numpy',)}, {c.args for c in finder_class.call_args_list})
+
+    def test_auto_tune_table_settings(self) -> None:
+        for workers in [1, 2]:
+            with self.subTest(workers=workers):
+                workspace = TableDetectorWorkspace(PDFReader.open(self.multiple_pages_sample_pdf_filepath))
+                workspace.set_table_settings_val(1, 'explicit_vertical_lines', [10])
+                self.assertEqual([], workspace.get_tables_text([1]))
+
+                progress = []
+                actual = workspace.auto_tune_table_settings(
+                    [1],
+                    time_budget=3,
+                    workers=workers,
+                    progress_callback=lambda *args: progress.append(args)
+                )
+
+                self.assertGreater(actual.score, 0)
+                self.assertEqual(actual.evaluated, len(progress))
+                self.assertEqual(actual.score, progress[-1][2])
+                self.assertEqual({**actual.settings, 'explicit_vertical_lines': [10]}, dict(workspace.get_table_settings(1)))
+                self.assertEqual(DEFAULT_TABLE_SETTINGS, dict(workspace.get_table_settings(0)))
+                self.assertGreater(score_transaction_tables(workspace.get_tables_text([1])), 0)
+                workspace.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,6 @@
+import os
+from pathlib import Path
+
+# Per-user data (caches, indices etc.) live here. Can be moved with BUDGETHING_PROFILE_DIR.
+DEFAULT_PROFILE_DIR = Path(os.environ.get('BUDGETHING_PROFILE_DIR', Path.home() / '.budgething'))
+DEFAULT_CACHE_DIR = DEFAULT_PROFILE_DIR / 'cache'
@@ -38,6 +38,9 @@ class TypedObservableDict(dict):
         with self._lock:
             self._callbacks.append(callback)
 
+    def has_callback(self, callback: Callable[[str, Any], None]) -> bool:
+        return callback in self._callbacks
+
     def _notify_observers(self, key: str, value: Any):
         
         self.logger.debug(f'Notifying observes that {key} has been changes.')